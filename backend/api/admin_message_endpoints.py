@@ -2,7 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from typing import Optional
 import sqlite3
-from backend.api.dependencies import get_db
+from backend.api.dependencies import get_db, get_writer
+from backend.write_queue import WriteQueue
 
 router = APIRouter(prefix="/admin/messages", tags=["admin-messages"])
 
@@ -15,7 +16,7 @@ class SendMessageRequest(BaseModel):
     admin_user_id: int
 
 def send_message_to_user(db: sqlite3.Connection, user_id: int, sender_id: int, subject: str, message: str, message_type: str = 'general'):
-    """Helper function to insert a message to a specific user"""
+    """Helper function to insert a message to a specific user (called inside a queued write)"""
     try:
         db.execute("""
             INSERT INTO TeacherMessages (student_id, sender_id, subject, message, message_type, sent_at)
@@ -28,13 +29,12 @@ def send_message_to_user(db: sqlite3.Connection, user_id: int, sender_id: int, s
         # But we should log it.
 
 @router.post("/send")
-def send_admin_message(request: SendMessageRequest, db: sqlite3.Connection = Depends(get_db)):
+def send_admin_message(request: SendMessageRequest, db: sqlite3.Connection = Depends(get_db), writer: WriteQueue = Depends(get_writer)):
     """
     Send message from admin to user(s)
+    All messages of a broadcast are written by the writer queue in one transaction.
     """
     try:
-        messages_sent = 0
-        
         if request.recipient_type == 'user':
             # Send to single user
             if not request.recipient_id:
@@ -42,8 +42,7 @@ def send_admin_message(request: SendMessageRequest, db: sqlite3.Connection = Dep
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="recipient_id gerekli"
                 )
-            send_message_to_user(db, request.recipient_id, request.admin_user_id, request.subject, request.message, request.message_type)
-            messages_sent = 1
+            recipient_ids = [request.recipient_id]
             
         elif request.recipient_type == 'all_teachers':
             # Get all approved teachers
@@ -52,10 +51,7 @@ def send_admin_message(request: SendMessageRequest, db: sqlite3.Connection = Dep
                 WHERE account_type = 'teacher' 
                 AND approval_status = 'approved'
             """)
-            teachers = cursor.fetchall()
-            for (teacher_id,) in teachers:
-                send_message_to_user(db, teacher_id, request.admin_user_id, request.subject, request.message, request.message_type)
-                messages_sent += 1
+            recipient_ids = [teacher_id for (teacher_id,) in cursor.fetchall()]
                 
         elif request.recipient_type == 'all_students':
             # Get all students
@@ -63,10 +59,7 @@ def send_admin_message(request: SendMessageRequest, db: sqlite3.Connection = Dep
                 SELECT id FROM Users 
                 WHERE account_type = 'student'
             """)
-            students = cursor.fetchall()
-            for (student_id,) in students:
-                send_message_to_user(db, student_id, request.admin_user_id, request.subject, request.message, request.message_type)
-                messages_sent += 1
+            recipient_ids = [student_id for (student_id,) in cursor.fetchall()]
                 
         elif request.recipient_type == 'all_users':
             # Get all approved users
@@ -74,16 +67,20 @@ def send_admin_message(request: SendMessageRequest, db: sqlite3.Connection = Dep
                 SELECT id FROM Users 
                 WHERE approval_status = 'approved'
             """)
-            users = cursor.fetchall()
-            for (user_id,) in users:
-                send_message_to_user(db, user_id, request.admin_user_id, request.subject, request.message, request.message_type)
-                messages_sent += 1
+            recipient_ids = [user_id for (user_id,) in cursor.fetchall()]
         else:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Geçersiz recipient_type"
             )
         
+        def write(conn: sqlite3.Connection):
+            for recipient_id in recipient_ids:
+                send_message_to_user(conn, recipient_id, request.admin_user_id, request.subject, request.message, request.message_type)
+        
+        writer.run(write)
+        messages_sent = len(recipient_ids)
+        
         return {
             "status": "success",
             "message": f"{messages_sent} mesaj gönderildi",
@@ -93,7 +90,6 @@ def send_admin_message(request: SendMessageRequest, db: sqlite3.Connection = Dep
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.get("/users/list")
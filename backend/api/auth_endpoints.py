@@ -6,7 +6,8 @@ import sys
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from api.dependencies import get_db
+from api.dependencies import get_db, get_writer
+from backend.write_queue import WriteQueue
 from api.models import UserRegisterRequest, UserLoginRequest
 from api.security_utils import get_password_hash, verify_password, create_access_token
 
@@ -68,7 +69,7 @@ def register(user: UserRegisterRequest, db: sqlite3.Connection = Depends(get_db)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/login")
-def login(user: UserLoginRequest, db: sqlite3.Connection = Depends(get_db)):
+def login(user: UserLoginRequest, db: sqlite3.Connection = Depends(get_db), writer: WriteQueue = Depends(get_writer)):
     cursor = db.execute("""
         SELECT id, username, password_hash, account_type, approval_status, teacher_id 
         FROM Users WHERE username = ?
@@ -108,9 +109,8 @@ def login(user: UserLoginRequest, db: sqlite3.Connection = Depends(get_db)):
             detail="Kullanıcı adı veya şifre hatalı."
         )
 
-    # Update last login
-    db.execute("UPDATE Users SET last_login = datetime('now') WHERE id = ?", (user_id,))
-    db.commit()
+    # Update last login (group-committed with the rest of the class logging in)
+    writer.run(lambda conn: conn.execute("UPDATE Users SET last_login = datetime('now') WHERE id = ?", (user_id,)).rowcount)
 
     # Create JWT token
     token = create_access_token({"sub": str(user_id), "username": username})
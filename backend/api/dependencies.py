@@ -4,34 +4,52 @@ Provides SQLite connection via dependency injection
 """
 
 import sqlite3
-import os
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
-# Database path relative to backend directory
-DATABASE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "../englishbus.db")
+from backend.connection_pool import get_pool, DB_PATH
+from backend.write_queue import WriteQueue, get_write_queue
+from backend.async_db import AsyncConnection, connection as async_connection
+
+# Database path (project root) - kept for modules that build their own paths
+DATABASE_PATH = DB_PATH
 
 
 def get_db() -> Generator[sqlite3.Connection, None, None]:
     """
-    Dependency that provides database connection.
+    Dependency that provides a pooled database connection.
     
-    Usage in endpoints:
-    Dependency that provides a database connection.
-    Ensures connection is properly closed after request.
+    The connection is tuned once (WAL, cache, mmap) and reused across requests.
+    It is returned to the pool after the request; an unfinished transaction
+    is rolled back on release.
     
-    CRITICAL: check_same_thread=False required for FastAPI async
+    CRITICAL: check_same_thread=False (set by the pool) required for FastAPI
     """
-    # Normalize path
-    db_path = os.path.normpath(DATABASE_PATH)
-    
-    # Connect
-    conn = sqlite3.connect(db_path, check_same_thread=False)
-    conn.row_factory = sqlite3.Row  # Enable column access by name
+    pool = get_pool()
+    conn = pool.acquire()
     
     try:
         yield conn
     finally:
-        conn.close()
+        pool.release(conn)
+
+
+async def get_async_db() -> AsyncGenerator[AsyncConnection, None]:
+    """
+    get_db for async def endpoints: the same pooled connection, but every call
+    is awaited on the DB thread pool instead of blocking the event loop.
+    """
+    async with async_connection() as db:
+        yield db
+
+
+def get_writer() -> WriteQueue:
+    """
+    Dependency that provides the database's single-writer commit queue.
+    
+    Write endpoints submit their writes here instead of committing on the
+    request's connection; the writer thread group-commits them.
+    """
+    return get_write_queue()
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
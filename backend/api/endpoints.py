@@ -3,20 +3,29 @@ API endpoint handlers
 Implements API_CONTRACT.md v1.0.0
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Header, status
 import sqlite3
 import sys
 import os
 import uuid
+from typing import Optional
 
 # Add parent directory to path for session_manager import
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from api.models import *
-from api.dependencies import get_db
-from session_manager import complete_session, get_session_content
+from api.dependencies import get_db, get_async_db, get_writer
+from backend.curriculum import get_curriculum
+from backend.course_stats import get_course_stats, daily_new_count as get_daily_new_count
+from backend.idempotency import MAX_KEY_LENGTH, request_hash, get_stored_response, store_response
+from backend.session_cache import start_cache_key, get_cached_start, cache_start, forget_user
+from backend.async_db import AsyncConnection
+from backend.write_queue import WriteQueue
+from session_manager import (
+    complete_session, complete_session_journal, get_session_content, find_next_new_word, plan_session_steps
+)
 from api.security_dep import get_current_user
-from api.security_utils import verify_password
+from api.security_utils import verify_password, create_plan_token, decode_plan_token
 router = APIRouter()
 
 # Constants
@@ -66,7 +75,8 @@ def get_courses(db: sqlite3.Connection = Depends(get_db)):
 @router.post("/reset")
 async def reset_progress(
     request: ResetRequest,
-    db: sqlite3.Connection = Depends(get_db),
+    db: AsyncConnection = Depends(get_async_db),
+    writer: WriteQueue = Depends(get_writer),
     current_user: int = Depends(get_current_user)
 ):
     """
@@ -75,21 +85,23 @@ async def reset_progress(
     Deletes all UserProgress and UserCourseProgress for the user.
     """
     # Verify password
-    cursor = db.execute("SELECT password_hash FROM Users WHERE id = ?", (current_user,))
-    row = cursor.fetchone()
+    row = await db.fetchone("SELECT password_hash FROM Users WHERE id = ?", (current_user,))
     if not row or not row[0]:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or password not set")
     stored_hash = row[0]
     if not verify_password(request.password, stored_hash):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect password")
 
-    try:
-        db.execute("DELETE FROM UserProgress WHERE user_id = ?", (current_user,))
-        db.execute("DELETE FROM UserCourseProgress WHERE user_id = ? AND course_id = ?", 
-                   (current_user, request.course_id))
+    def write(conn: sqlite3.Connection):
+        conn.execute("DELETE FROM UserProgress WHERE user_id = ?", (current_user,))
+        conn.execute("DELETE FROM UserCourseProgress WHERE user_id = ? AND course_id = ?", 
+                     (current_user, request.course_id))
         # Clear learned words memory for sentence generator
-        db.execute("DELETE FROM UserWordProgress WHERE user_id = ?", (current_user,))
-        db.commit()
+        conn.execute("DELETE FROM UserWordProgress WHERE user_id = ?", (current_user,))
+    
+    try:
+        await writer.run_async(write)
+        forget_user(current_user)  # Cached /session/start payloads
         
         return {
             "status": "success",
@@ -104,7 +116,8 @@ async def reset_progress(
 @router.post("/session/start", response_model=SessionStartResponse)
 def start_session(
     request: SessionStartRequest,
-    db: sqlite3.Connection = Depends(get_db)
+    db: sqlite3.Connection = Depends(get_db),
+    writer: WriteQueue = Depends(get_writer)
 ):
     """
     Start a new learning session using Fibonacci-based spaced repetition.
@@ -113,9 +126,21 @@ def start_session(
     - 1-4-7-10 new word rule
     - Fibonacci review scheduling
     - Automatic empty step skipping
+    
+    With lookahead=N the next N steps are planned too (every card assumed
+    completed) and returned with a signed plan token, so the client can study
+    several steps without a round trip in between.
+    
+    A retried start at the same step (same progress state) is served from a
+    short-lived per-(user, course, step) cache.
     """
     try:
-        session_id = uuid.uuid4()
+        cached = get_cached_start(
+            start_cache_key(db, request.user_id, request.course_id, request.unit_id, request.lookahead)
+        )
+        if cached is not None:
+            return SessionStartResponse(**cached)
+        
         session_id = uuid.uuid4()
         print(f"🚀 START SESSION REQUEST: User={request.user_id}, Unit={request.unit_id} (Type: {type(request.unit_id)})")
         
@@ -125,7 +150,8 @@ def start_session(
             course_id=request.course_id,
             db=db,
             skip_count=0,
-            unit_id=request.unit_id
+            unit_id=request.unit_id,
+            writer=writer
         )
         
         # Get unit progress info for the study screen
@@ -161,6 +187,28 @@ def start_session(
         if unit_progress:
             response_data["unit_progress"] = unit_progress
         
+        # Lookahead: plan the following steps in memory (nothing is written)
+        if request.lookahead and result['items']:
+            lookahead_steps = plan_session_steps(
+                db, request.user_id, request.course_id,
+                result['current_step'], result['items'],
+                request.lookahead, request.unit_id
+            )
+            steps = [result] + lookahead_steps
+            response_data["lookahead_steps"] = lookahead_steps
+            response_data["plan_token"] = create_plan_token({
+                "uid": request.user_id,
+                "cid": request.course_id,
+                "unit": request.unit_id,
+                "steps": [[step['current_step'], [item['word_id'] for item in step['items']]] for step in steps]
+            })
+        
+        # Keyed by the state after this start (an empty-step jump moves it), which is what a retry sees
+        cache_start(
+            start_cache_key(db, request.user_id, request.course_id, request.unit_id, request.lookahead),
+            response_data
+        )
+        
         return SessionStartResponse(**response_data)
         
     except Exception as e:
@@ -171,30 +219,71 @@ def start_session(
     raise HTTPException(status_code=404, detail="No cards available in this course")
 
 
+def _replayed_response(db: sqlite3.Connection, user_id: int, key: Optional[str], fingerprint: str) -> Optional[dict]:
+    """Stored response of an earlier request with this Idempotency-Key, if any."""
+    if not key:
+        return None
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key longer than {MAX_KEY_LENGTH} characters")
+    stored = get_stored_response(db, user_id, key)
+    if stored is None:
+        return None
+    stored_fingerprint, response = stored
+    if stored_fingerprint != fingerprint:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+    return response
+
+
+def _store_or_replay(db: sqlite3.Connection, user_id: int, key: Optional[str], fingerprint: str, response: dict) -> dict:
+    """
+    Store the response under the key (same transaction as the writes) and commit.
+    If a concurrent retry committed first, our writes are rolled back and its response is returned.
+    On the writer's connection commit/rollback apply to this write only (see write_queue).
+    """
+    if key:
+        try:
+            store_response(db, user_id, key, fingerprint, response)
+        except sqlite3.IntegrityError:
+            db.rollback()
+            return _replayed_response(db, user_id, key, fingerprint)
+    db.commit()
+    return response
+
+
+def _valid_word_ids(word_ids) -> list:
+    """Numeric word IDs only (Sentence Mode sends dummy 'sent_X' IDs)"""
+    valid_ids = []
+    for wid in word_ids:
+        if isinstance(wid, int):
+            valid_ids.append(wid)
+        elif isinstance(wid, str) and wid.isdigit():
+            valid_ids.append(int(wid))
+    return valid_ids
+
+
 @router.post("/session/complete", response_model=SessionCompleteResponse)
 def complete_session_endpoint(
     request: SessionCompleteRequest,
-    db: sqlite3.Connection = Depends(get_db)
+    db: sqlite3.Connection = Depends(get_db),
+    writer: WriteQueue = Depends(get_writer),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """
     Complete a session and update progress atomically.
     
-    Uses atomic transaction from session_manager.
+    Uses atomic transaction from session_manager, run by the single-writer
+    queue (group-committed with other requests' writes).
+    With an Idempotency-Key header, a retried request gets the original
+    response back and UserProgress is not touched again.
     """
-    db.close()  # Close FastAPI's connection, session_manager will create its own
+    fingerprint = request_hash("session/complete", request.model_dump())
+    replayed = _replayed_response(db, request.user_id, idempotency_key, fingerprint)
+    if replayed is not None:
+        return SessionCompleteResponse(**replayed)
     
     try:
-        # Get correct DB path
-        db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "../englishbus.db")
-        db_path = os.path.normpath(db_path)
-        
         # Filter out Sentence Mode dummy IDs (strings or 'sent_')
-        valid_ids = []
-        for wid in request.completed_word_ids:
-            if isinstance(wid, int):
-                valid_ids.append(wid)
-            elif isinstance(wid, str) and wid.isdigit():
-                valid_ids.append(int(wid))
+        valid_ids = _valid_word_ids(request.completed_word_ids)
         
         # If no valid word IDs (pure sentence practice), just mock success
         if not valid_ids:
@@ -207,38 +296,27 @@ def complete_session_endpoint(
                 course_completed=False
             )
 
-        # Use session_manager's atomic implementation
-        result = complete_session(
-            user_id=request.user_id,
-            course_id=request.course_id,
-            completed_word_ids=valid_ids,
-            db_path=db_path
-        )
-        
-        
-        if result['status'] == 'success':
-            # Check if unit/course is completed
-            with sqlite3.connect(db_path) as check_db:
-                check_db.row_factory = sqlite3.Row
-                
-                # Count total words in course
-                cursor = check_db.execute(
-                    "SELECT COUNT(*) as total FROM Words WHERE course_id = ?",
-                    (request.course_id,)
-                )
-                total_words = cursor.fetchone()['total']
-                
-                # Count completed words for this user in this course
-                cursor = check_db.execute(
-                    "SELECT COUNT(DISTINCT word_id) as completed FROM UserProgress WHERE user_id = ? AND word_id IN (SELECT id FROM Words WHERE course_id = ?)",
-                    (request.user_id, request.course_id)
-                )
-                completed_words = cursor.fetchone()['completed']
-                
-                unit_completed = completed_words >= total_words
-                course_completed = unit_completed  # For now, course = unit
+        def write(conn: sqlite3.Connection):
+            # Use session_manager's atomic implementation, on the writer's connection:
+            # progress update and completion check share one transaction
+            result = complete_session(
+                user_id=request.user_id,
+                course_id=request.course_id,
+                completed_word_ids=valid_ids,
+                conn=conn
+            )
+            if result['status'] != 'success':
+                return result, None
             
-            return SessionCompleteResponse(
+            # Check if unit/course is completed (counters already include this write)
+            stats = get_course_stats(conn, request.user_id, request.course_id)
+            total_words = stats['total_words']
+            completed_words = stats['seen']
+            
+            unit_completed = completed_words >= total_words
+            course_completed = unit_completed  # For now, course = unit
+            
+            response = SessionCompleteResponse(
                 status="success",
                 new_step=result['new_step'],
                 words_updated=result['words_updated'],
@@ -246,45 +324,115 @@ def complete_session_endpoint(
                 unit_completed=unit_completed,
                 course_completed=course_completed
             )
+            return result, _store_or_replay(conn, request.user_id, idempotency_key, fingerprint, response.model_dump())
+        
+        result, response = writer.run(write)
+        
+        if result['status'] == 'success':
+            return SessionCompleteResponse(**response)
+        elif result['status'] == 'conflict':
+            # Same words completed concurrently (double tap / second tab): client restarts from current_step
+            raise HTTPException(status_code=409, detail=result['error'])
         else:
             raise HTTPException(
                 status_code=500,
                 detail=result.get('error', 'Unknown error')
             )
-            
+    
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Session complete failed: {str(e)}")
 
 
+@router.post("/session/complete-batch", response_model=SessionCompleteBatchResponse)
+def complete_session_batch_endpoint(
+    request: SessionCompleteBatchRequest,
+    db: sqlite3.Connection = Depends(get_db),
+    writer: WriteQueue = Depends(get_writer),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """
+    Replay an offline study journal (step + completed words, in order) in one transaction.
+    
+    Same progress logic as /session/complete (and the same writer queue),
+    one write instead of one per step. Steps already applied are skipped, so a retried upload is safe.
+    Step jumps (empty steps skipped offline) need the plan_token of the
+    /session/start?lookahead response the steps came from, and may only
+    land on the next planned step.
+    Idempotency-Key is honoured like on /session/complete.
+    """
+    fingerprint = request_hash("session/complete-batch", request.model_dump())
+    replayed = _replayed_response(db, request.user_id, idempotency_key, fingerprint)
+    if replayed is not None:
+        return SessionCompleteBatchResponse(**replayed)
+    
+    plan = None
+    if request.plan_token:
+        try:
+            payload = decode_plan_token(request.plan_token)
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid or expired plan token")
+        if payload.get("uid") != request.user_id or payload.get("cid") != request.course_id:
+            raise HTTPException(status_code=403, detail="Plan token belongs to another user or course")
+        plan = {step: set(word_ids) for step, word_ids in payload["steps"]}
+    
+    # Sentence Mode entries carry no word IDs: nothing to replay for them
+    journal = []
+    for entry in request.steps:
+        valid_ids = _valid_word_ids(entry.completed_word_ids)
+        if valid_ids:
+            journal.append((entry.step, valid_ids))
+    
+    def write(conn: sqlite3.Connection):
+        result = complete_session_journal(conn, request.user_id, request.course_id, journal, plan)
+        
+        if result['status'] == 'conflict':
+            raise HTTPException(status_code=409, detail=result['error'])
+        if result['status'] != 'success':
+            raise HTTPException(status_code=500, detail=result.get('error', 'Unknown error'))
+        
+        # Completion flags from the counters, in the same transaction
+        stats = get_course_stats(conn, request.user_id, request.course_id)
+        course_completed = stats['seen'] >= stats['total_words']
+        
+        response = SessionCompleteBatchResponse(
+            status="success",
+            new_step=result['new_step'],
+            steps_applied=result['steps_applied'],
+            steps_skipped=result['steps_skipped'],
+            words_updated=result['words_updated'],
+            daily_new_count=result['daily_new_count'],
+            unit_completed=course_completed,  # For now, course = unit (as /session/complete)
+            course_completed=course_completed
+        )
+        return _store_or_replay(conn, request.user_id, idempotency_key, fingerprint, response.model_dump())
+    
+    try:
+        return SessionCompleteBatchResponse(**writer.run(write))
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Session batch complete failed: {str(e)}")
+
+
 @router.get("/courses/{course_id}/progress")
 def get_course_progress(
     course_id: int,
     user_id: int,
-    db: sqlite3.Connection = Depends(get_db)
+    db: sqlite3.Connection = Depends(get_db),
+    writer: WriteQueue = Depends(get_writer)
 ):
     """
     Get user's progress in a course
     Returns: new_words_seen count and total_words
     """
     try:
-        # Count total words in course
-        cursor = db.execute(
-            "SELECT COUNT(*) as total FROM Words WHERE course_id = ?",
-            (course_id,)
-        )
-        total_words = cursor.fetchone()['total']
-        
-        # Count NEW words seen (words in UserProgress)
-        cursor = db.execute(
-            """
-            SELECT COUNT(DISTINCT word_id) as seen 
-            FROM UserProgress 
-            WHERE user_id = ? 
-            AND word_id IN (SELECT id FROM Words WHERE course_id = ?)
-            """,
-            (user_id, course_id)
-        )
-        new_words_seen = cursor.fetchone()['seen']
+        # Totals from the maintained counters (UserCourseStats)
+        stats = get_course_stats(db, user_id, course_id, writer)
+        total_words = stats['total_words']
+        new_words_seen = stats['seen']  # Words in UserProgress
         
         return {
             "new_words_seen": new_words_seen,
@@ -298,7 +446,8 @@ def get_course_progress(
 def get_course_repetition_stats(
     course_id: int,
     user_id: int,
-    db: sqlite3.Connection = Depends(get_db)
+    db: sqlite3.Connection = Depends(get_db),
+    writer: WriteQueue = Depends(get_writer)
 ):
     """
     Get repetition breakdown for statistics cards.
@@ -308,30 +457,14 @@ def get_course_repetition_stats(
     - Mastered: Repetition 7+
     """
     try:
-        # Get all words in course for this user
-        cursor = db.execute("""
-            SELECT repetition_count
-            FROM UserProgress P
-            JOIN Words W ON P.word_id = W.id
-            WHERE P.user_id = ? AND W.course_id = ? AND P.repetition_count > 0
-        """, (user_id, course_id))
-        
-        rows = cursor.fetchall()
+        # Buckets are maintained on write (UserCourseStats)
+        counters = get_course_stats(db, user_id, course_id, writer)
         
         stats = {
-            "new_seen": 0,    # 1-2
-            "mid_level": 0,   # 3-6
-            "mastered": 0     # 7+
+            "new_seen": counters["rep_1_2"],     # 1-2
+            "mid_level": counters["rep_3_6"],    # 3-6
+            "mastered": counters["rep_7_plus"]   # 7+
         }
-        
-        for row in rows:
-            rep = row[0]
-            if 1 <= rep <= 2:
-                stats["new_seen"] += 1
-            elif 3 <= rep <= 6:
-                stats["mid_level"] += 1
-            elif rep >= 7:
-                stats["mastered"] += 1
                 
         return stats
         
@@ -352,18 +485,6 @@ def get_course_units(
     Units unlock when previous unit is 80%+ complete
     """
     try:
-        # Get all units
-        cursor = db.execute(
-            """
-            SELECT id, name, order_number, word_count 
-            FROM Units 
-            WHERE course_id = ? 
-            ORDER BY order_number
-            """,
-            (course_id,)
-        )
-        units = cursor.fetchall()
-        
         # Get user's current global step
         cursor = db.execute(
             "SELECT current_step FROM UserCourseProgress WHERE user_id = ? AND course_id = ?",
@@ -376,31 +497,18 @@ def get_course_units(
         max_sent_order = ((current_step - 1) // 3) + 1
         
         # Calculate Daily New Words for Dashboard
-        cursor = db.execute("""
-            SELECT COUNT(*) 
-            FROM UserProgress 
-            WHERE user_id = ? 
-            AND date(first_learned_at) = date('now')
-        """, (user_id,))
-        daily_new_count = cursor.fetchone()[0]
+        daily_new_count = get_daily_new_count(db, user_id)
+
+        # Units and their word order ranges come from the shared curriculum map:
+        # the deterministic "seen" count per unit is a bisect, not a query
+        curriculum = get_curriculum(db, course_id)
 
         result = []
-        for unit in units:
-            unit_id = unit['id']
-            unit_order = unit['order_number']
-            total_words = unit['word_count']
-            
-            # Deterministic Progress Calculation
-            cursor = db.execute(
-                """
-                SELECT COUNT(*) as seen
-                FROM Words W
-                WHERE W.unit_id = ? 
-                AND W.order_number <= ?
-                """,
-                (unit_id, max_sent_order)
-            )
-            seen_count = cursor.fetchone()['seen']
+        for unit in curriculum.units:
+            unit_id = unit.unit_id
+            unit_order = unit.order_number
+            total_words = unit.word_count
+            seen_count = curriculum.words_up_to(unit, max_sent_order)
             
             progress_pct = round((seen_count / total_words * 100), 1) if total_words > 0 else 0
             
@@ -408,7 +516,7 @@ def get_course_units(
             # Always OPEN, Always Unlocked
             result.append({
                 "unit_id": unit_id,
-                "name": unit['name'],
+                "name": unit.name,
                 "order_number": unit_order,
                 "total_words": total_words,
                 "words_seen": seen_count,
@@ -486,31 +594,45 @@ def get_session_items(
         """, (user_id, course_id))
         
         row = cursor.fetchone()  # CRITICAL: Store result first
-        max_open = row[0] if row else 1  # Then use it
+        max_open = row[0] if row and row[0] is not None else 1  # Then use it
+        
+        # Single seek from the user's new-word cursor (no NOT IN over their history)
+        curriculum = get_curriculum(db, course_id)
+        word = find_next_new_word(
+            db, user_id, course_id, curriculum,
+            max_order=current_step, max_unit_order=max_open
+        )
         
-        new_words = db.execute("""
-            SELECT w.id, w.english, w.turkish, w.image_url, w.audio_en_url, w.audio_tr_url, w.order_number
-            FROM Words w
+        # A progress row never practiced (repetition_count NULL/0) still counts as new here,
+        # as it does in calc_units_progress; the cursor counts any row as seen
+        unpracticed = db.execute("""
+            SELECT w.id
+            FROM UserProgress up
+            JOIN Words w ON w.id = up.word_id
             JOIN Units u ON w.unit_id = u.id
-            LEFT JOIN UserProgress up ON w.id = up.word_id AND up.user_id = ?
-            WHERE w.course_id = ?
+            WHERE up.user_id = ?
+              AND (up.repetition_count IS NULL OR up.repetition_count = 0)
+              AND w.course_id = ?
               AND w.order_number <= ?
               AND u.order_number <= ?
-              AND (up.repetition_count IS NULL OR up.repetition_count = 0)
             ORDER BY w.order_number
             LIMIT 1
-        """, (user_id, course_id, current_step, max_open)).fetchall()
+        """, (user_id, course_id, current_step, max_open)).fetchone()
+        if unpracticed:
+            candidate = curriculum.word(unpracticed[0])
+            if candidate and (word is None or candidate.order_number < word.order_number):
+                word = candidate
         
-        for word in new_words:
+        if word:
             items.append(WordItem(
-                word_id=word[0],
-                english=word[1],
-                turkish=word[2],
+                word_id=word.word_id,
+                english=word.english,
+                turkish=word.turkish,
                 type="NEW", # Assuming new words are always type "NEW"
-                image_url=word[3],
-                audio_en_url=word[4],
-                audio_tr_url=word[5],
-                order_number=word[6]
+                image_url=word.image_url,
+                audio_en_url=word.audio_en_url,
+                audio_tr_url=word.audio_tr_url,
+                order_number=word.order_number
             ))
     
     # AVALANCHE GUARD: Cap at MAX_ITEMS_PER_SESSION (backend authority)
@@ -21,13 +21,15 @@ class SessionStartRequest(BaseModel):
     user_id: int = Field(..., gt=0, description="User ID")
     course_id: int = Field(..., gt=0, description="Course ID")
     unit_id: Optional[int] = Field(None, description="Optional: Limit session to specific unit")
+    lookahead: int = Field(0, ge=0, le=20, description="Optional: Also plan the next N steps (study offline, complete later)")
     
     class Config:
         json_schema_extra = {
             "example": {
                 "user_id": 1,
                 "course_id": 1,
-                "unit_id": 2
+                "unit_id": 2,
+                "lookahead": 5
             }
         }
 
@@ -52,6 +54,33 @@ class SessionCompleteRequest(BaseModel):
         }
 
 
+class JournalStep(BaseModel):
+    """One step studied offline: the step it was served at and the words completed"""
+    step: int = Field(..., gt=0)
+    completed_word_ids: List[Union[int, str]] = Field(..., description="IDs of completed words")
+
+
+class SessionCompleteBatchRequest(BaseModel):
+    """Replay an offline study journal (several steps) in one transaction"""
+    user_id: int = Field(..., gt=0)
+    course_id: int = Field(..., gt=0)
+    steps: List[JournalStep] = Field(..., min_length=1, max_length=100, description="In the order they were studied")
+    plan_token: Optional[str] = Field(None, description="From /session/start?lookahead, allows the planned step jumps")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "user_id": 1,
+                "course_id": 1,
+                "steps": [
+                    {"step": 12, "completed_word_ids": [4, 9]},
+                    {"step": 13, "completed_word_ids": [7]}
+                ],
+                "plan_token": "eyJ..."
+            }
+        }
+
+
 # ============================================
 # ADMIN MODELS
 # ============================================
@@ -134,6 +163,8 @@ class SessionStartResponse(BaseModel):
     total_count: int = Field(..., description="Total number of items in this session")
     has_more: bool = Field(False, description="True if avalanche guard triggered")
     unit_progress: Optional[dict] = Field(None, description="Progress info for current unit")
+    lookahead_steps: List[dict] = Field(default_factory=list, description="Planned next steps: {current_step, items, active_unit_id}")
+    plan_token: Optional[str] = Field(None, description="Signed plan (current + lookahead steps), only with lookahead")
     
     class Config:
         json_schema_extra = {
@@ -157,6 +188,18 @@ class SessionCompleteResponse(BaseModel):
     course_completed: bool = False  # True when entire course is done
 
 
+class SessionCompleteBatchResponse(BaseModel):
+    """Response for a journal replay"""
+    status: str = "success"
+    new_step: int
+    steps_applied: int
+    steps_skipped: int = Field(0, description="Steps already applied before (retried upload)")
+    words_updated: int
+    daily_new_count: int = 0
+    unit_completed: bool = False
+    course_completed: bool = False
+
+
 class HealthResponse(BaseModel):
     """Health check response"""
     status: str = "ok"
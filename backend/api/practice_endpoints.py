@@ -5,8 +5,12 @@ import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from api.dependencies import get_db
+from api.dependencies import get_db, get_writer
+from backend.curriculum import get_curriculum
+from backend.write_queue import WriteQueue
+from backend.translation_cache import translate_all, TRANSLATION_FAILED, TRANSLATION_PENDING
 from features.sentence_generator import sentence_engine
+from features.turkish_realizer import realize
 
 router = APIRouter()
 
@@ -15,8 +19,9 @@ def get_practice_sentences(
     user_id: int, 
     course_id: int, 
     word_count: int = Query(None, description="Simulated progress: Use only first N words"),
-    limit: int = 5,
-    db: sqlite3.Connection = Depends(get_db)
+    limit: int = Query(5, ge=1, le=500, description="Sentences to return"),
+    db: sqlite3.Connection = Depends(get_db),
+    writer: WriteQueue = Depends(get_writer)
 ):
     """
     Generate dynamic sentences based on the words the user has learned.
@@ -55,51 +60,54 @@ def get_practice_sentences(
     if not known_words:
         return {"sentences": [], "message": "No words found or limit is 0."}
 
-    # 3. Generate
-    raw_sentences = sentence_engine.generate(known_words, count=limit)
-    if not raw_sentences:
+    # 3. Generate (the sentence space is counted exactly: 0 means nothing can be built)
+    if sentence_engine.count(known_words) == 0:
         # No fallback. Return explicit status so frontend can handle it natively.
         return {
             "status": "insufficient_vocabulary", 
             "message": "Not enough words to generate meaningful sentences.",
             "sentences": []
         }
+    raw_sentences = sentence_engine.generate(known_words, count=limit, with_frames=True)
+    frames = [sent_obj.pop('frame') for sent_obj in raw_sentences]
     
-    # 4. Translate & Format with Audio Links
-    from googletrans import Translator
+    # 4. Translate (offline realizer; cache + translator only for what it can't build) & Format with Audio Links
     import urllib.parse
     
-    translator = Translator()
+    curriculum = get_curriculum(db, course_id)
     formatted_sentences = []
     
     # Phase 12 Debug Wrapper
     try:
-        for sent_obj in raw_sentences:
+        realized = [realize(frame, curriculum.turkish_for) for frame in frames]
+        translations = translate_all(db, writer, [sent_obj.get('text', '') for sent_obj in raw_sentences], realized=realized)
+        for sent_obj, tr_translation in zip(raw_sentences, translations):
             # Phase 12: sent_obj is now {'text': str, 'key_word': str}
             en_text = sent_obj.get('text', '')
             key_word = sent_obj.get('key_word')
-            
-            try:
-                # Translate to Turkish
-                tr_translation = translator.translate(en_text, src='en', dest='tr').text
-            except Exception as e:
-                print(f"Translation Error: {e}")
-                tr_translation = "(Çeviri oluşturulamadı)"
                 
             # Image Fetch based on Key Word
             image_url = None
             if key_word:
                 # Look up image_file for this key word (case-insensitive)
                 # We assume word is in DB if it came from generator, but casing might differ
-                cur_img = db.execute("SELECT image_url FROM Words WHERE english LIKE ? LIMIT 1", (key_word,))
-                row_img = cur_img.fetchone()
-                if row_img and row_img[0]:
-                    raw_path = row_img[0]
+                # Course words: in-memory curriculum map; anything else: DB fallback
+                raw_path = curriculum.image_for(key_word)
+                if not raw_path:
+                    cur_img = db.execute("SELECT image_url FROM Words WHERE english LIKE ? LIMIT 1", (key_word,))
+                    row_img = cur_img.fetchone()
+                    raw_path = row_img[0] if row_img else None
+                if raw_path:
                     if raw_path.startswith("/") or raw_path.startswith("http"):
                          image_url = raw_path
                     else:
                          image_url = f"/assets/images/{raw_path}"
 
+            # Placeholders (pending / failed translation) are not read aloud
+            audio_tr_url = None
+            if tr_translation not in (TRANSLATION_PENDING, TRANSLATION_FAILED):
+                audio_tr_url = f"/audio/tts?lang=tr&text={urllib.parse.quote(tr_translation)}"
+
             # Enhance Object
             formatted_sentences.append({
                 "english": en_text,
@@ -108,7 +116,7 @@ def get_practice_sentences(
                 "key_word": key_word,   # New Field (Debug/UI info)
                 # Link to our new dynamic TTS endpoint
                 "audio_en_url": f"/audio/tts?lang=en&text={urllib.parse.quote(en_text)}",
-                "audio_tr_url": f"/audio/tts?lang=tr&text={urllib.parse.quote(tr_translation)}",
+                "audio_tr_url": audio_tr_url,
                 "is_sentence": True
             })
     except Exception as e:
@@ -13,6 +13,8 @@ logger = logging.getLogger(__name__)
 SECRET_KEY = os.getenv("JWT_SECRET_KEY") or "qjFneqpLbX5bd1sT9WNi5v-vPzguDyjoL3gocD3dWxmiPtxw8BEnyKTeX6gFuEz1"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 1 day
+PLAN_TOKEN_EXPIRE_MINUTES = 60 * 24  # Offline window of a lookahead session plan
+PLAN_TOKEN_TYPE = "session_plan"
 
 # Security: Validate JWT secret key length
 # Minimum 32 bytes (256 bits) recommended for HMAC
@@ -58,3 +60,20 @@ def decode_access_token(token: str) -> dict:
         return payload
     except jwt.PyJWTError as e:
         raise e
+
+def create_plan_token(plan: dict) -> str:
+    """
+    Sign a lookahead session plan (user, course, steps and their word IDs) so a
+    later bulk completion can be checked without recomputing the plan.
+    Carries no "sub" claim, so it can't be used as an access token.
+    """
+    to_encode = plan.copy()
+    expire = datetime.datetime.utcnow() + datetime.timedelta(minutes=PLAN_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire, "typ": PLAN_TOKEN_TYPE})
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+def decode_plan_token(token: str) -> dict:
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    if payload.get("typ") != PLAN_TOKEN_TYPE:
+        raise jwt.InvalidTokenError("Not a session plan token")
+    return payload
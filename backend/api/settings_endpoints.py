@@ -8,9 +8,11 @@ from pydantic import BaseModel
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from backend.api.dependencies import get_db, get_current_user
+from backend.api.dependencies import get_db, get_writer, get_current_user
+from backend.write_queue import WriteQueue
 from backend.api.models import UserSettings, SettingsUpdateRequest
 from backend.api.security_utils import verify_password
+from backend.session_cache import forget_user
 
 router = APIRouter()
 
@@ -45,7 +47,7 @@ def get_user_settings(current_user: sqlite3.Row = Depends(get_current_user), db:
     return UserSettings(**valid_data)
 
 @router.patch("/user/settings")
-def update_user_settings(update: SettingsUpdateRequest, current_user: sqlite3.Row = Depends(get_current_user), db: sqlite3.Connection = Depends(get_db)):
+def update_user_settings(update: SettingsUpdateRequest, current_user: sqlite3.Row = Depends(get_current_user), writer: WriteQueue = Depends(get_writer)):
     """Update user settings - Expects FULL object"""
     user_id = current_user['id']
     
@@ -57,16 +59,17 @@ def update_user_settings(update: SettingsUpdateRequest, current_user: sqlite3.Ro
     if 'active_course_id' in settings_to_store:
         del settings_to_store['active_course_id']
     
-    try:
+    def write(conn: sqlite3.Connection):
         if active_course_id is not None:
-            db.execute("UPDATE Users SET settings_json = ?, active_course_id = ? WHERE id = ?", 
-                      (json.dumps(settings_to_store), active_course_id, user_id))
+            conn.execute("UPDATE Users SET settings_json = ?, active_course_id = ? WHERE id = ?", 
+                        (json.dumps(settings_to_store), active_course_id, user_id))
         else:
-            db.execute("UPDATE Users SET settings_json = ? WHERE id = ?", 
-                      (json.dumps(settings_to_store), user_id))
-        db.commit()
+            conn.execute("UPDATE Users SET settings_json = ? WHERE id = ?", 
+                        (json.dumps(settings_to_store), user_id))
+    
+    try:
+        writer.run(write)
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
     
     new_data['active_course_id'] = active_course_id 
@@ -90,6 +93,7 @@ def reset_user_progress(request: ResetProgressRequest, current_user: sqlite3.Row
         db.execute("DELETE FROM SessionState WHERE user_id = ?", (user_id,))
         
         db.commit()
+        forget_user(user_id)  # Cached /session/start payloads
         return {"status": "success", "message": "İlerleme başarıyla sıfırlandı."}
     except Exception as e:
         db.rollback()
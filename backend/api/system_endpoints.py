@@ -2,7 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from typing import Optional
 import sqlite3
-from backend.api.dependencies import get_db
+from backend.api.dependencies import get_db, get_writer
+from backend.connection_pool import pool_stats
+from backend.write_queue import WriteQueue, write_queue_stats
+from backend.translation_cache import translation_stats
 
 router = APIRouter()
 
@@ -15,7 +18,7 @@ class LogFilterRequest(BaseModel):
 
 # Helper function for logging
 def log_admin_action(db: sqlite3.Connection, admin_id: int, action: str, target_user_id: Optional[int] = None, details: str = ""):
-    """Log admin actions to database"""
+    """Log admin actions to database (inside a queued write the commit is the group's)"""
     db.execute("""
         INSERT INTO admin_logs (admin_user_id, action, target_user_id, details)
         VALUES (?, ?, ?, ?)
@@ -34,19 +37,21 @@ def get_maintenance_mode(db: sqlite3.Connection = Depends(get_db)):
     }
 
 @router.post("/maintenance-mode")
-def set_maintenance_mode(request: MaintenanceModeRequest, db: sqlite3.Connection = Depends(get_db)):
+def set_maintenance_mode(request: MaintenanceModeRequest, writer: WriteQueue = Depends(get_writer)):
     """Set maintenance mode on/off"""
     ADMIN_USER_ID = 1
     
-    db.execute("""
-        INSERT INTO maintenance_mode (is_active, message, updated_by)
-        VALUES (?, ?, ?)
-    """, (request.is_active, request.message, ADMIN_USER_ID))
-    db.commit()
+    def write(conn: sqlite3.Connection):
+        conn.execute("""
+            INSERT INTO maintenance_mode (is_active, message, updated_by)
+            VALUES (?, ?, ?)
+        """, (request.is_active, request.message, ADMIN_USER_ID))
+        
+        # Log the action (same write)
+        log_admin_action(conn, ADMIN_USER_ID, "maintenance_mode_change", None, 
+                         f"Active: {request.is_active}, Message: {request.message[:50]}")
     
-    # Log the action
-    log_admin_action(db, ADMIN_USER_ID, "maintenance_mode_change", None, 
-                     f"Active: {request.is_active}, Message: {request.message[:50]}")
+    writer.run(write)
     
     return {"status": "success", "is_active": request.is_active}
 
@@ -79,5 +84,10 @@ def get_admin_logs(limit: int = 50, db: sqlite3.Connection = Depends(get_db)):
     
     return {"logs": logs}
 
+@router.get("/pool-stats")
+def get_pool_stats():
+    """Get SQLite connection pool (created/reused/idle/in_use), writer queue (writes/groups) and translation cache (hits/misses) statistics"""
+    return {"pools": pool_stats(), "writers": write_queue_stats(), "translations": translation_stats()}
+
 # Export this function for use in other modules
 __all__ = ['log_admin_action', 'router']
@@ -3,20 +3,22 @@ from fastapi.responses import HTMLResponse
 from starlette.requests import Request
 import sqlite3
 import os
-from .dependencies import get_db
+from .dependencies import get_async_db, get_writer
 from .security_utils import verify_password
+from backend.async_db import AsyncConnection
+from backend.write_queue import WriteQueue
 
 teacher_router = APIRouter()
 
 # Teacher authentication dependency
-async def get_teacher_user(request: Request, db: sqlite3.Connection = Depends(get_db)):
+async def get_teacher_user(request: Request, db: AsyncConnection = Depends(get_async_db)):
     """Verify user is logged in and has teacher role"""
     user = None
     try:
         if request.session.get("token") == "admin_logged_in":
             username = request.session.get("user")
             if username:
-                user_row = db.execute("SELECT id, username, is_admin, is_teacher FROM Users WHERE username = ?", (username,)).fetchone()
+                user_row = await db.fetchone("SELECT id, username, is_admin, is_teacher FROM Users WHERE username = ?", (username,))
                 if user_row and (user_row[2] or user_row[3]):  # is_admin or is_teacher
                     user = user_row
     except Exception:
@@ -27,14 +29,14 @@ async def get_teacher_user(request: Request, db: sqlite3.Connection = Depends(ge
     return user
 
 @teacher_router.get("/")
-async def serve_teacher_dashboard(request: Request, db: sqlite3.Connection = Depends(get_db)):
+async def serve_teacher_dashboard(request: Request, db: AsyncConnection = Depends(get_async_db)):
     """Serve teacher panel or redirect to login"""
     user = None
     try:
         if request.session.get("token") == "admin_logged_in":
             username = request.session.get("user")
             if username:
-                user_row = db.execute("SELECT id, username, is_admin, is_teacher FROM Users WHERE username = ?", (username,)).fetchone()
+                user_row = await db.fetchone("SELECT id, username, is_admin, is_teacher FROM Users WHERE username = ?", (username,))
                 if user_row and (user_row[2] or user_row[3]):  # is_admin or is_teacher
                     user = user_row
     except:
@@ -59,45 +61,45 @@ async def serve_teacher_dashboard(request: Request, db: sqlite3.Connection = Dep
 
 # Dashboard endpoints
 @teacher_router.get("/dashboard-stats")
-async def get_teacher_dashboard_stats(user=Depends(get_teacher_user), db: sqlite3.Connection = Depends(get_db)):
+async def get_teacher_dashboard_stats(user=Depends(get_teacher_user), db: AsyncConnection = Depends(get_async_db)):
     """Get summary statistics for teacher dashboard"""
     teacher_id = user[0]
     
     try:
         # Get assigned students
-        assigned_students = db.execute(
+        assigned_students = (await db.fetchone(
             "SELECT COUNT(*) FROM TeacherStudents WHERE teacher_id = ?", (teacher_id,)
-        ).fetchone()[0]
+        ))[0]
         
         # Get all students if teacher, or assigned students if specific teacher
         if user[2]:  # is_admin - can see all
-            total_students = db.execute("SELECT COUNT(*) FROM Users WHERE is_admin = 0 AND is_teacher = 0").fetchone()[0]
-            new_this_month = db.execute(
+            total_students = (await db.fetchone("SELECT COUNT(*) FROM Users WHERE is_admin = 0 AND is_teacher = 0"))[0]
+            new_this_month = (await db.fetchone(
                 "SELECT COUNT(*) FROM Users WHERE is_admin = 0 AND is_teacher = 0 AND created_at >= date('now', 'start of month')"
-            ).fetchone()[0]
+            ))[0]
         else:
             total_students = assigned_students
             # New students assigned this month
-            new_this_month = db.execute(
+            new_this_month = (await db.fetchone(
                 "SELECT COUNT(*) FROM TeacherStudents WHERE teacher_id = ? AND assigned_date >= date('now', 'start of month')",
                 (teacher_id,)
-            ).fetchone()[0]
+            ))[0]
         
         # Get active courses (courses that have students enrolled)
-        active_courses = db.execute(
+        active_courses = (await db.fetchone(
             "SELECT COUNT(DISTINCT active_course_id) FROM Users WHERE active_course_id IS NOT NULL AND is_admin = 0"
-        ).fetchone()[0]
+        ))[0]
         
         # Most popular course
-        popular_course = db.execute(
+        popular_course = await db.fetchone(
             "SELECT c.name FROM Courses c JOIN Users u ON c.id = u.active_course_id WHERE u.is_admin = 0 GROUP BY c.id ORDER BY COUNT(*) DESC LIMIT 1"
-        ).fetchone()
+        )
         popular_course_name = popular_course[0] if popular_course else "-"
         
         # Weekly words learned (approximate from UserProgress)
-        weekly_words = db.execute(
+        weekly_words = (await db.fetchone(
             "SELECT COUNT(*) FROM UserProgress WHERE repetition_count > 0"
-        ).fetchone()[0]
+        ))[0]
         
         return {
             "total_students": total_students,
@@ -117,22 +119,22 @@ async def get_teacher_dashboard_stats(user=Depends(get_teacher_user), db: sqlite
         }
 
 @teacher_router.get("/daily-activity")
-async def get_daily_activity(user=Depends(get_teacher_user), db: sqlite3.Connection = Depends(get_db)):
+async def get_daily_activity(user=Depends(get_teacher_user), db: AsyncConnection = Depends(get_async_db)):
     """Get today's activity statistics"""
     try:
         # Students active today (based on last_login)
-        active_today = db.execute(
+        active_today = (await db.fetchone(
             "SELECT COUNT(*) FROM Users WHERE is_admin = 0 AND is_teacher = 0 AND DATE(last_login) = DATE('now')"
-        ).fetchone()[0]
+        ))[0]
         
-        total_students = db.execute(
+        total_students = (await db.fetchone(
             "SELECT COUNT(*) FROM Users WHERE is_admin = 0 AND is_teacher = 0"
-        ).fetchone()[0]
+        ))[0]
         
         # Approximate words learned today (this is simplified without activity log)
-        words_today = db.execute(
+        words_today = (await db.fetchone(
             "SELECT COUNT(*) FROM UserProgress WHERE repetition_count > 0"
-        ).fetchone()[0] if total_students > 0 else 0
+        ))[0] if total_students > 0 else 0
         
         return {
             "active_today": active_today,
@@ -149,7 +151,7 @@ async def get_daily_activity(user=Depends(get_teacher_user), db: sqlite3.Connect
         }
 
 @teacher_router.get("/weekly-trend")
-async def get_weekly_trend(user=Depends(get_teacher_user), db: sqlite3.Connection = Depends(get_db)):
+async def get_weekly_trend(user=Depends(get_teacher_user), db: AsyncConnection = Depends(get_async_db)):
     """Get 7-day activity trend for chart"""
     try:
         # Generate data for last 7 days
@@ -157,9 +159,9 @@ async def get_weekly_trend(user=Depends(get_teacher_user), db: sqlite3.Connectio
         counts = []
         
         for i in range(6, -1, -1):
-            day = db.execute(
+            day = (await db.fetchone(
                 f"SELECT COUNT(*) FROM Users WHERE is_admin = 0 AND DATE(last_login) = DATE('now', '-{i} days')"
-            ).fetchone()[0]
+            ))[0]
             
             days.append(["Pzt", "Sal", "Çrş", "Prş", "Cum", "Cmt", "Paz"][(6-i) % 7])
             counts.append(day)
@@ -175,24 +177,24 @@ async def get_weekly_trend(user=Depends(get_teacher_user), db: sqlite3.Connectio
         }
 
 @teacher_router.get("/alerts")
-async def get_alerts(user=Depends(get_teacher_user), db: sqlite3.Connection = Depends(get_db)):
+async def get_alerts(user=Depends(get_teacher_user), db: AsyncConnection = Depends(get_async_db)):
     """Get students requiring attention"""
     try:
         # Inactive 5+ days
-        inactive = db.execute(
+        inactive = (await db.fetchone(
             "SELECT COUNT(*) FROM Users WHERE is_admin = 0 AND is_teacher = 0 AND (last_login IS NULL OR DATE(last_login) <= DATE('now', '-5 days'))"
-        ).fetchone()[0]
+        ))[0]
         
         # Below daily goal (simplified - assume goal is 10 words/day)
         # This is approximate without detailed activity tracking
-        below_goal = db.execute(
+        below_goal = (await db.fetchone(
             "SELECT COUNT(*) FROM Users WHERE is_admin = 0 AND is_teacher = 0"
-        ).fetchone()[0] // 3  # Rough estimate
+        ))[0] // 3  # Rough estimate
         
         # Above goal
-        above_goal = db.execute(
+        above_goal = (await db.fetchone(
             "SELECT COUNT(*) FROM Users WHERE is_admin = 0 AND is_teacher = 0 AND DATE(last_login) = DATE('now')"
-        ).fetchone()[0]
+        ))[0]
         
         # Completed unit recently (simplified)
         completed_unit = 0
@@ -216,7 +218,7 @@ async def get_students_list(
     status: str = "all",
     search: str = "",
     user=Depends(get_teacher_user),
-    db: sqlite3.Connection = Depends(get_db)
+    db: AsyncConnection = Depends(get_async_db)
 ):
     """Get list of students with filtering and search"""
     teacher_id = user[0]
@@ -240,10 +242,10 @@ async def get_students_list(
         if search:
             query += f" AND u.username LIKE '%{search}%'"
         
-        cursor = db.execute(query)
+        rows = await db.fetchall(query)
         students = []
         
-        for row in cursor.fetchall():
+        for row in rows:
             student_id, username, created_at, last_login, course_name, learned_words = row
             
             # Calculate status
@@ -290,12 +292,12 @@ async def get_students_list(
 async def get_student_detail(
     student_id: int,
     user=Depends(get_teacher_user),
-    db: sqlite3.Connection = Depends(get_db)
+    db: AsyncConnection = Depends(get_async_db)
 ):
     """Get detailed information about a specific student"""
     try:
         # Get student basic info
-        student = db.execute("""
+        student = await db.fetchone("""
             SELECT 
                 u.id,
                 u.username,
@@ -306,39 +308,39 @@ async def get_student_detail(
             FROM Users u
             LEFT JOIN Courses c ON u.active_course_id = c.id
             WHERE u.id = ?
-        """, (student_id,)).fetchone()
+        """, (student_id,))
         
         if not student:
             raise HTTPException(404, "Student not found")
         
         # Get learning progress
-        learned_words = db.execute("""
+        learned_words = (await db.fetchone("""
             SELECT COUNT(*) FROM UserProgress
             WHERE user_id = ? AND repetition_count > 0
-        """, (student_id,)).fetchone()[0]
+        """, (student_id,)))[0]
         
         # Calculate Repetition Breakdown (New/Mid/Mastered)
-        rep_stats = db.execute("""
+        rep_stats = await db.fetchone("""
             SELECT 
                 COUNT(CASE WHEN repetition_count BETWEEN 1 AND 5 THEN 1 END) as new_count,
                 COUNT(CASE WHEN repetition_count BETWEEN 6 AND 10 THEN 1 END) as mid_count,
                 COUNT(CASE WHEN repetition_count >= 11 THEN 1 END) as mastered_count
             FROM UserProgress
             WHERE user_id = ?
-        """, (student_id,)).fetchone()
+        """, (student_id,))
 
-        total_words = db.execute("""
+        total_words = (await db.fetchone("""
             SELECT COUNT(*) FROM Words WHERE course_id = ?
-        """, (student[5],)).fetchone()[0] if student[5] else 0
+        """, (student[5],)))[0] if student[5] else 0
         
         # Get recent words
-        recent_words = db.execute("""
+        recent_words = await db.fetchall("""
             SELECT w.english, w.turkish, uwp.repetition_count, uwp.next_review_step
             FROM UserProgress uwp
             JOIN Words w ON uwp.word_id = w.id
             WHERE uwp.user_id = ?
             ORDER BY uwp.last_updated DESC LIMIT 10
-        """, (student_id,)).fetchall()
+        """, (student_id,))
         
         learned_list = [{
             "english": row[0],
@@ -377,7 +379,7 @@ async def get_student_detail(
 @teacher_router.get("/class-stats")
 async def get_class_stats(
     user=Depends(get_teacher_user),
-    db: sqlite3.Connection = Depends(get_db)
+    db: AsyncConnection = Depends(get_async_db)
 ):
     """Get comprehensive class-wide statistics"""
     teacher_id = user[0]
@@ -386,11 +388,11 @@ async def get_class_stats(
     try:
         # Get student IDs based on role
         if is_admin:
-            students = db.execute("SELECT id FROM Users WHERE is_admin = 0").fetchall()
+            students = await db.fetchall("SELECT id FROM Users WHERE is_admin = 0")
         else:
-            students = db.execute("""
+            students = await db.fetchall("""
                 SELECT student_id FROM TeacherStudents WHERE teacher_id = ?
-            """, (teacher_id,)).fetchall()
+            """, (teacher_id,))
         
         student_ids = [s[0] for s in students]
         
@@ -408,17 +410,17 @@ async def get_class_stats(
         placeholders = ','.join('?' * len(student_ids))
         
         # Average words learned
-        avg_words = db.execute(f"""
+        avg_words = (await db.fetchone(f"""
             SELECT AVG(word_count) FROM (
                 SELECT COUNT(DISTINCT word_id) as word_count
                 FROM UserProgress
                 WHERE user_id IN ({placeholders}) AND repetition_count > 0
                 GROUP BY user_id
             )
-        """, student_ids).fetchone()[0] or 0
+        """, student_ids))[0] or 0
         
         # Top performer
-        top = db.execute(f"""
+        top = await db.fetchone(f"""
             SELECT u.id, u.username, COUNT(DISTINCT uwp.word_id) as words
             FROM Users u
             LEFT JOIN UserProgress uwp ON u.id = uwp.user_id AND uwp.repetition_count > 0
@@ -426,14 +428,14 @@ async def get_class_stats(
             GROUP BY u.id
             ORDER BY words DESC
             LIMIT 1
-        """, student_ids).fetchone()
+        """, student_ids)
         
         # Completion rate (students with active course)
-        completion = db.execute(f"""
+        completion = (await db.fetchone(f"""
             SELECT 
                 COUNT(CASE WHEN active_course_id IS NOT NULL THEN 1 END) * 100.0 / COUNT(*)
             FROM Users WHERE id IN ({placeholders})
-        """, student_ids).fetchone()[0] or 0
+        """, student_ids))[0] or 0
         
         return {
             "total_students": len(student_ids),
@@ -450,7 +452,7 @@ async def get_class_stats(
 async def get_leaderboard(
     limit: int = 10,
     user=Depends(get_teacher_user),
-    db: sqlite3.Connection = Depends(get_db)
+    db: AsyncConnection = Depends(get_async_db)
 ):
     """Get student leaderboard ranked by learned words"""
     teacher_id = user[0]
@@ -458,7 +460,7 @@ async def get_leaderboard(
     
     try:
         if is_admin:
-            rows = db.execute("""
+            rows = await db.fetchall("""
                 SELECT 
                     u.id, u.username, u.last_login,
                     COUNT(DISTINCT uwp.word_id) as learned_words
@@ -468,9 +470,9 @@ async def get_leaderboard(
                 GROUP BY u.id
                 ORDER BY learned_words DESC
                 LIMIT ?
-            """, (limit,)).fetchall()
+            """, (limit,))
         else:
-            rows = db.execute("""
+            rows = await db.fetchall("""
                 SELECT 
                     u.id, u.username, u.last_login,
                     COUNT(DISTINCT uwp.word_id) as learned_words
@@ -481,7 +483,7 @@ async def get_leaderboard(
                 GROUP BY u.id
                 ORDER BY learned_words DESC
                 LIMIT ?
-            """, (teacher_id, limit)).fetchall()
+            """, (teacher_id, limit))
         
         return {"leaderboard": [{
             "rank": idx + 1,
@@ -497,7 +499,7 @@ async def get_leaderboard(
 @teacher_router.get("/comparison")
 async def get_student_comparison(
     user=Depends(get_teacher_user),
-    db: sqlite3.Connection = Depends(get_db)
+    db: AsyncConnection = Depends(get_async_db)
 ):
     """Get comparative table of all students"""
     teacher_id = user[0]
@@ -505,7 +507,7 @@ async def get_student_comparison(
     
     try:
         if is_admin:
-            rows = db.execute("""
+            rows = await db.fetchall("""
                 SELECT 
                     u.id, u.username, u.created_at, u.last_login,
                     c.name as course_name,
@@ -516,9 +518,9 @@ async def get_student_comparison(
                 WHERE u.is_admin = 0
                 GROUP BY u.id
                 ORDER BY learned_words DESC
-            """).fetchall()
+            """)
         else:
-            rows = db.execute("""
+            rows = await db.fetchall("""
                 SELECT 
                     u.id, u.username, u.created_at, u.last_login,
                     c.name as course_name,
@@ -530,7 +532,7 @@ async def get_student_comparison(
                 WHERE ts.teacher_id = ?
                 GROUP BY u.id
                 ORDER BY learned_words DESC
-            """, (teacher_id,)).fetchall()
+            """, (teacher_id,))
         
         # Calculate days since last login
         from datetime import datetime
@@ -566,17 +568,17 @@ async def get_student_comparison(
 async def get_teacher_notes(
     student_id: int,
     user=Depends(get_teacher_user),
-    db: sqlite3.Connection = Depends(get_db)
+    db: AsyncConnection = Depends(get_async_db)
 ):
     """Get teacher notes for a specific student"""
     teacher_id = user[0]
     try:
-        notes = db.execute("""
+        notes = await db.fetchall("""
             SELECT id, note, created_at
             FROM TeacherNotes
             WHERE teacher_id = ? AND student_id = ?
             ORDER BY created_at DESC
-        """, (teacher_id, student_id)).fetchall()
+        """, (teacher_id, student_id))
         
         return {"notes": [{"id": n[0], "note": n[1], "created_at": n[2]} for n in notes]}
     except:
@@ -586,18 +588,18 @@ async def get_teacher_notes(
 @teacher_router.get("/class-goals")
 async def get_class_goals(
     user=Depends(get_teacher_user),
-    db: sqlite3.Connection = Depends(get_db)
+    db: AsyncConnection = Depends(get_async_db)
 ):
     """Get class-wide goals"""
     teacher_id = user[0]
     
     try:
-        goals = db.execute("""
+        goals = await db.fetchall("""
             SELECT id, goal_name, target_value, current_value, deadline, completed
             FROM ClassGoals
             WHERE teacher_id = ?
             ORDER BY deadline ASC
-        """, (teacher_id,)).fetchall()
+        """, (teacher_id,))
         
         from datetime import datetime, date
         result_goals = []
@@ -625,7 +627,7 @@ async def get_class_goals(
 async def create_class_goal(
     goal_data: dict,
     user=Depends(get_teacher_user),
-    db: sqlite3.Connection = Depends(get_db)
+    writer: WriteQueue = Depends(get_writer)
 ):
     """Create a new class-wide goal"""
     teacher_id = user[0]
@@ -638,26 +640,28 @@ async def create_class_goal(
         if not goal_name or not target_value or not deadline:
             raise HTTPException(400, "Missing required fields")
         
-        # Create ClassGoals table if not exists
-        db.execute("""
-            CREATE TABLE IF NOT EXISTS ClassGoals (
-                id INTEGER PRIMARY KEY,
-                teacher_id INTEGER NOT NULL,
-                goal_name TEXT NOT NULL,
-                target_value INTEGER NOT NULL,
-                current_value INTEGER DEFAULT 0,
-                deadline DATE,
-                completed BOOLEAN DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (teacher_id) REFERENCES Users(id)
-            )
-        """)
+        def write(conn: sqlite3.Connection):
+            # Create ClassGoals table if not exists
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ClassGoals (
+                    id INTEGER PRIMARY KEY,
+                    teacher_id INTEGER NOT NULL,
+                    goal_name TEXT NOT NULL,
+                    target_value INTEGER NOT NULL,
+                    current_value INTEGER DEFAULT 0,
+                    deadline DATE,
+                    completed BOOLEAN DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (teacher_id) REFERENCES Users(id)
+                )
+            """)
+            
+            conn.execute("""
+                INSERT INTO ClassGoals (teacher_id, goal_name, target_value, deadline)
+                VALUES (?, ?, ?, ?)
+            """, (teacher_id, goal_name, target_value, deadline))
         
-        db.execute("""
-            INSERT INTO ClassGoals (teacher_id, goal_name, target_value, deadline)
-            VALUES (?, ?, ?, ?)
-        """, (teacher_id, goal_name, target_value, deadline))
-        db.commit()
+        await writer.run_async(write)
         
         return {"success": True}
     except HTTPException:
@@ -671,16 +675,15 @@ async def add_teacher_note(
     student_id: int,
     note: str,
     user=Depends(get_teacher_user),
-    db: sqlite3.Connection = Depends(get_db)
+    writer: WriteQueue = Depends(get_writer)
 ):
     """Add a new teacher note"""
     teacher_id = user[0]
     try:
-        db.execute("""
+        await writer.run_async(lambda conn: conn.execute("""
             INSERT INTO TeacherNotes (teacher_id, student_id, note)
             VALUES (?, ?, ?)
-        """, (teacher_id, student_id, note))
-        db.commit()
+        """, (teacher_id, student_id, note)).rowcount)
         return {"success": True}
     except Exception as e:
         raise HTTPException(500, str(e))
@@ -689,12 +692,11 @@ async def add_teacher_note(
 async def delete_teacher_note(
     note_id: int,
     user=Depends(get_teacher_user),
-    db: sqlite3.Connection = Depends(get_db)
+    writer: WriteQueue = Depends(get_writer)
 ):
     """Delete a teacher note"""
     try:
-        db.execute("DELETE FROM TeacherNotes WHERE id = ?", (note_id,))
-        db.commit()
+        await writer.run_async(lambda conn: conn.execute("DELETE FROM TeacherNotes WHERE id = ?", (note_id,)).rowcount)
         return {"success": True}
     except Exception as e:
         raise HTTPException(500, str(e))
@@ -704,16 +706,16 @@ async def delete_teacher_note(
 async def get_student_goals(
     student_id: int,
     user=Depends(get_teacher_user),
-    db: sqlite3.Connection = Depends(get_db)
+    db: AsyncConnection = Depends(get_async_db)
 ):
     """Get goals for a specific student"""
     try:
-        goals = db.execute("""
+        goals = await db.fetchall("""
             SELECT id, goal_type, target_value, current_value, deadline, completed
             FROM StudentGoals
             WHERE student_id = ?
             ORDER BY completed, deadline
-        """, (student_id,)).fetchall()
+        """, (student_id,))
         
         return {"goals": [{
             "id": g[0],
@@ -733,16 +735,15 @@ async def create_student_goal(
     target_value: int,
     deadline: str = None,
     user=Depends(get_teacher_user),
-    db: sqlite3.Connection = Depends(get_db)
+    writer: WriteQueue = Depends(get_writer)
 ):
     """Create a new goal for student"""
     teacher_id = user[0]
     try:
-        db.execute("""
+        await writer.run_async(lambda conn: conn.execute("""
             INSERT INTO StudentGoals (student_id, teacher_id, goal_type, target_value, deadline)
             VALUES (?, ?, ?, ?, ?)
-        """, (student_id, teacher_id, goal_type, target_value, deadline))
-        db.commit()
+        """, (student_id, teacher_id, goal_type, target_value, deadline)).rowcount)
         return {"success": True}
     except Exception as e:
         raise HTTPException(500, str(e))
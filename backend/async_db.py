@@ -0,0 +1,63 @@
+"""
+Async Database Access
+For async def endpoints. sqlite3 calls block, and a blocking call inside an
+async handler stalls the event loop - every other request on the worker waits.
+
+Here every call runs on a dedicated DB thread pool and is awaited instead.
+Connections come from the regular pool (same tuning); writes go through the
+writer queue (await writer.run_async(...)). scripts/check_async_blocking.py
+checks that async handlers don't touch sqlite3 directly.
+"""
+
+import sqlite3
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, List, Optional, Sequence
+
+from backend.connection_pool import get_pool, DB_PATH
+
+# Threads that run SQLite work for async handlers (sync handlers use Starlette's pool)
+DB_THREADS = 8
+
+_executor = ThreadPoolExecutor(max_workers=DB_THREADS, thread_name_prefix="sqlite-async")
+
+
+async def run_blocking(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking call on the DB thread pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+
+class AsyncConnection:
+    """
+    Awaitable wrapper around a pooled sqlite3 connection.
+
+    Rows are fetched on the DB thread as well (a cursor is never handed to the
+    loop). For several statements that belong together, pass a function to run().
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    async def fetchone(self, sql: str, params: Sequence = ()) -> Optional[sqlite3.Row]:
+        return await run_blocking(lambda: self._conn.execute(sql, params).fetchone())
+
+    async def fetchall(self, sql: str, params: Sequence = ()) -> List[sqlite3.Row]:
+        return await run_blocking(lambda: self._conn.execute(sql, params).fetchall())
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """fn(connection, *args, **kwargs) on the DB thread pool (for existing sync helpers)."""
+        return await run_blocking(fn, self._conn, *args, **kwargs)
+
+
+@asynccontextmanager
+async def connection(db_path: str = DB_PATH) -> AsyncIterator[AsyncConnection]:
+    """Async context manager: pooled connection, acquired and released off the loop."""
+    pool = get_pool(db_path)
+    conn = await run_blocking(pool.acquire)
+    try:
+        yield AsyncConnection(conn)
+    finally:
+        await run_blocking(pool.release, conn)
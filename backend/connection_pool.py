@@ -0,0 +1,171 @@
+"""
+SQLite Connection Pool
+Shared, pre-tuned sqlite3 connections for all routers and session_manager.
+
+Connections are created once, tuned once (WAL, page cache, mmap...) and then
+handed out again and again instead of connect/close on every request.
+A checked-out connection belongs to exactly one request until it is released.
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from queue import LifoQueue, Empty, Full
+from typing import Dict, Iterator
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(BASE_DIR, "englishbus.db")
+
+# Applied once per physical connection (not per request)
+# NOTE: foreign_keys is intentionally left OFF here. The raw sqlite3 routers have
+# always run without FK enforcement and their delete paths rely on that.
+PRAGMAS = (
+    ("journal_mode", "WAL"),        # Readers don't block the writer
+    ("synchronous", "NORMAL"),      # Safe with WAL, far fewer fsyncs
+    ("busy_timeout", 30000),        # Same 30s budget as the SQLAlchemy engine
+    ("cache_size", -16000),         # 16 MB page cache per connection
+    ("mmap_size", 268435456),       # 256 MB memory-mapped reads
+    ("temp_store", "MEMORY"),       # Sorts / temp b-trees stay in RAM
+)
+
+STATEMENT_CACHE_SIZE = 256  # sqlite3 default is 128
+MAX_IDLE_CONNECTIONS = 16
+
+
+class ConnectionPool:
+    """
+    LIFO pool of tuned sqlite3 connections for one database file.
+
+    LIFO keeps the most recently used (warmest page/statement cache) connection
+    at the top. Connections are created lazily; at most MAX_IDLE_CONNECTIONS are
+    kept idle, extra ones are closed on release.
+    """
+
+    def __init__(self, db_path: str, max_idle: int = MAX_IDLE_CONNECTIONS):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self._idle = LifoQueue(maxsize=max_idle)
+        self._lock = threading.Lock()
+        self._stats = {
+            "created": 0,
+            "reused": 0,
+            "released": 0,
+            "discarded": 0,
+            "in_use": 0,
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        # check_same_thread=False: FastAPI may resolve the dependency and run the
+        # endpoint on different worker threads. The pool guarantees exclusive use.
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=30,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        conn.row_factory = sqlite3.Row  # Enable column access by name
+
+        for name, value in PRAGMAS:
+            conn.execute(f"PRAGMA {name}={value}")
+
+        with self._lock:
+            self._stats["created"] += 1
+        logger.debug(f"Pool {self.db_path}: opened connection #{self._stats['created']}")
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """Take a connection from the pool (or open a new one)."""
+        try:
+            conn = self._idle.get_nowait()
+            reused = True
+        except Empty:
+            conn = self._connect()
+            reused = False
+
+        with self._lock:
+            self._stats["in_use"] += 1
+            if reused:
+                self._stats["reused"] += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection):
+        """
+        Return a connection to the pool.
+        Any transaction left open by the caller is rolled back first.
+        """
+        with self._lock:
+            self._stats["in_use"] -= 1
+
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.ProgrammingError:
+            # Caller closed it (legacy code path) - nothing to return
+            with self._lock:
+                self._stats["discarded"] += 1
+            return
+
+        try:
+            self._idle.put_nowait(conn)
+            with self._lock:
+                self._stats["released"] += 1
+        except Full:
+            conn.close()
+            with self._lock:
+                self._stats["discarded"] += 1
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Context manager: acquire on enter, release on exit."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of pool counters (for /admin diagnostics and benchmarks)."""
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot["idle"] = self._idle.qsize()
+        snapshot["max_idle"] = self.max_idle
+        return snapshot
+
+    def close_all(self):
+        """Close every idle connection (checked-out ones are closed on release)."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except Empty:
+                break
+            conn.close()
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str = DB_PATH) -> ConnectionPool:
+    """
+    Get the process-wide pool for a database file.
+    One pool per normalized path, created on first use.
+    """
+    key = os.path.abspath(os.path.normpath(db_path))
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(key)
+                _pools[key] = pool
+    return pool
+
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    """Statistics for every pool in this process, keyed by database path."""
+    return {path: pool.stats() for path, pool in _pools.items()}
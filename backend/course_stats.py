@@ -0,0 +1,217 @@
+"""
+Per-User Course Statistics
+Running counters in UserCourseStats (migration 004), so progress and statistics
+reads are a primary-key lookup instead of a scan of the user's UserProgress.
+
+Counters are updated by complete_session in the same transaction as the
+progress rows. A missing or outdated row (new user/course, content change,
+progress reset) is recomputed from UserProgress on first use. Reads never
+write: they answer from the recomputed counters and hand the saving of the
+row to the writer queue (or leave it to the next complete_session).
+"""
+
+import sqlite3
+import logging
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+from backend.curriculum import get_curriculum
+from backend.write_queue import WriteQueue
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# Repetition buckets shown on the statistics cards: (column, min_rep, max_rep)
+REPETITION_BUCKETS = (
+    ("rep_1_2", 1, 2),     # New Seen
+    ("rep_3_6", 3, 6),     # Mid Level
+    ("rep_7_plus", 7, None),  # Mastered
+)
+
+
+def _bucket(repetition_count: int):
+    for column, low, high in REPETITION_BUCKETS:
+        if repetition_count >= low and (high is None or repetition_count <= high):
+            return column
+    return None  # repetition_count 0: seen, but in no bucket
+
+
+# seen, rep_1_2, rep_3_6, rep_7_plus, daily_new of one (user, course), from UserProgress
+_COUNTERS_SQL = """
+    SELECT COUNT(*),
+           COALESCE(SUM(CASE WHEN P.repetition_count BETWEEN 1 AND 2 THEN 1 ELSE 0 END), 0),
+           COALESCE(SUM(CASE WHEN P.repetition_count BETWEEN 3 AND 6 THEN 1 ELSE 0 END), 0),
+           COALESCE(SUM(CASE WHEN P.repetition_count >= 7 THEN 1 ELSE 0 END), 0),
+           COALESCE(SUM(CASE WHEN date(P.first_learned_at) = date('now') THEN 1 ELSE 0 END), 0)
+    FROM UserProgress P
+    JOIN Words W ON P.word_id = W.id
+    WHERE P.user_id = ? AND W.course_id = ?
+"""
+
+
+def _rebuild(conn: sqlite3.Connection, user_id: int, course_id: int, version: int):
+    """Recompute one counters row from UserProgress (one indexed aggregate) and save it."""
+    conn.execute(f"""
+        INSERT INTO UserCourseStats
+            (user_id, course_id, seen, rep_1_2, rep_3_6, rep_7_plus, daily_new, daily_date, content_version)
+        SELECT ?, ?, C.*, date('now'), ?
+        FROM ({_COUNTERS_SQL}) C
+        WHERE 1  -- Upsert after a SELECT needs a WHERE clause to parse
+        ON CONFLICT(user_id, course_id) DO UPDATE SET
+            seen = excluded.seen,
+            rep_1_2 = excluded.rep_1_2,
+            rep_3_6 = excluded.rep_3_6,
+            rep_7_plus = excluded.rep_7_plus,
+            daily_new = excluded.daily_new,
+            daily_date = excluded.daily_date,
+            content_version = excluded.content_version
+    """, (user_id, course_id, version, user_id, course_id))
+    logger.debug(f"Course stats rebuilt: user {user_id} course {course_id}")
+
+
+def _is_current(conn: sqlite3.Connection, user_id: int, course_id: int, version: int) -> bool:
+    row = conn.execute("""
+        SELECT content_version FROM UserCourseStats
+        WHERE user_id = ? AND course_id = ?
+    """, (user_id, course_id)).fetchone()
+    return row is not None and row[0] == version
+
+
+def _refresh(conn: sqlite3.Connection, user_id: int, course_id: int, version: int):
+    """Writer-side rebuild requested by a read (skipped if a write got there first)."""
+    if not _is_current(conn, user_id, course_id, version):
+        _rebuild(conn, user_id, course_id, version)
+
+
+def _log_refresh_result(future: Future):
+    error = future.exception()
+    if error is not None:
+        logger.warning(f"Course stats rebuild failed: {error}")
+
+
+def get_course_stats(
+    conn: sqlite3.Connection,
+    user_id: int,
+    course_id: int,
+    writer: Optional[WriteQueue] = None
+) -> Dict[str, int]:
+    """
+    Progress counters of a user in a course.
+
+    A stale counters row is recomputed in memory. Inside a write
+    (complete_session) it is saved with that transaction; on a read
+    connection nothing is written, the rebuild is queued on writer (if given).
+
+    Returns:
+        {
+            "total_words": int,   # Words in the course
+            "seen": int,          # Words with a UserProgress row
+            "rep_1_2": int, "rep_3_6": int, "rep_7_plus": int,
+            "mastered": int,      # repetition_count >= 3
+            "daily_new": int      # First encounters today in this course
+        }
+    """
+    curriculum = get_curriculum(conn, course_id)
+    version = curriculum.version
+
+    if _is_current(conn, user_id, course_id, version):
+        row = conn.execute("""
+            SELECT seen, rep_1_2, rep_3_6, rep_7_plus,
+                   CASE WHEN daily_date = date('now') THEN daily_new ELSE 0 END
+            FROM UserCourseStats
+            WHERE user_id = ? AND course_id = ?
+        """, (user_id, course_id)).fetchone()
+    else:
+        row = conn.execute(_COUNTERS_SQL, (user_id, course_id)).fetchone()
+        if conn.in_transaction:
+            _rebuild(conn, user_id, course_id, version)
+        elif writer is not None:
+            writer.submit(
+                lambda write_conn: _refresh(write_conn, user_id, course_id, version)
+            ).add_done_callback(_log_refresh_result)
+
+    seen, rep_1_2, rep_3_6, rep_7_plus, daily_new = row
+    return {
+        "total_words": curriculum.total_words,
+        "seen": seen,
+        "rep_1_2": rep_1_2,
+        "rep_3_6": rep_3_6,
+        "rep_7_plus": rep_7_plus,
+        "mastered": rep_3_6 + rep_7_plus,
+        "daily_new": daily_new
+    }
+
+
+def apply_progress_changes(
+    conn: sqlite3.Connection,
+    user_id: int,
+    course_id: int,
+    changes: List[Tuple[int, Optional[int], int]]
+):
+    """
+    Apply a session's progress writes to the counters (inside complete_session's transaction).
+
+    Args:
+        changes: (word_id, old repetition_count, new repetition_count) as returned by
+                 update_words_progress; old is None for a first encounter
+    """
+    if not changes:
+        return
+
+    curriculum = get_curriculum(conn, course_id)
+
+    if not _is_current(conn, user_id, course_id, curriculum.version):
+        # Rebuild reads UserProgress, which already contains this session's writes
+        _rebuild(conn, user_id, course_id, curriculum.version)
+    else:
+        delta = {"seen": 0, "daily_new": 0, "rep_1_2": 0, "rep_3_6": 0, "rep_7_plus": 0}
+        for word_id, old_rep, new_rep in changes:
+            if curriculum.word(word_id) is None:
+                continue
+            if old_rep is None:
+                delta["seen"] += 1
+                delta["daily_new"] += 1
+            old_bucket = _bucket(old_rep) if old_rep is not None else None
+            new_bucket = _bucket(new_rep)
+            if old_bucket != new_bucket:
+                if old_bucket:
+                    delta[old_bucket] -= 1
+                if new_bucket:
+                    delta[new_bucket] += 1
+
+        if any(delta.values()):
+            conn.execute("""
+                UPDATE UserCourseStats SET
+                    seen = seen + ?,
+                    rep_1_2 = rep_1_2 + ?,
+                    rep_3_6 = rep_3_6 + ?,
+                    rep_7_plus = rep_7_plus + ?,
+                    daily_new = CASE WHEN daily_date = date('now') THEN daily_new + ? ELSE ? END,
+                    daily_date = date('now')
+                WHERE user_id = ? AND course_id = ?
+            """, (
+                delta["seen"], delta["rep_1_2"], delta["rep_3_6"], delta["rep_7_plus"],
+                delta["daily_new"], delta["daily_new"], user_id, course_id
+            ))
+
+    # Words submitted under the wrong course count towards their own course:
+    # drop that course's counters so they are rebuilt on next use
+    foreign = [word_id for word_id, _, _ in changes if curriculum.word(word_id) is None]
+    if foreign:
+        placeholders = ",".join("?" * len(foreign))
+        conn.execute(f"""
+            DELETE FROM UserCourseStats
+            WHERE user_id = ? AND course_id IN (
+                SELECT course_id FROM Words WHERE id IN ({placeholders})
+            )
+        """, (user_id, *foreign))
+
+
+def daily_new_count(conn: sqlite3.Connection, user_id: int) -> int:
+    """Words learned for the first time today, across all of the user's courses."""
+    row = conn.execute("""
+        SELECT COALESCE(SUM(daily_new), 0)
+        FROM UserCourseStats
+        WHERE user_id = ? AND daily_date = date('now')
+    """, (user_id,)).fetchone()
+    return row[0]
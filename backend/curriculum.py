@@ -0,0 +1,194 @@
+"""
+Course Curriculum Map
+Immutable, in-process snapshot of a course's static structure: units in order,
+words in order inside each unit, and the text/media of every word.
+
+Loaded once per course and shared by all requests. Every lookup checks the
+course's content version (CourseContentVersions, bumped by triggers on
+Words/Units/Courses - see migration 002), so admin edits and re-imports are
+picked up on the next request without restarts.
+"""
+
+import sqlite3
+import logging
+import threading
+from array import array
+from bisect import bisect_right
+from typing import Dict, NamedTuple, Optional, Tuple
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+class UnitSpan(NamedTuple):
+    """A unit and its slice [start, end) of the curriculum word arrays."""
+    unit_id: int
+    name: str
+    order_number: int
+    word_count: int  # Units.word_count (catalog value shown on the dashboard)
+    start: int
+    end: int
+
+
+class WordInfo(NamedTuple):
+    word_id: int
+    english: str
+    turkish: str
+    image_url: Optional[str]
+    audio_en_url: Optional[str]
+    audio_tr_url: Optional[str]
+    order_number: int
+    unit_id: Optional[int]
+
+
+class CourseCurriculum:
+    """
+    Read-only curriculum of one course at one content version.
+
+    word_ids / order_numbers are compact parallel arrays sorted by
+    (unit order, word order), so each unit is a contiguous slice and
+    "how many words of this unit are at or below order N" is a bisect.
+
+    course_word_ids / course_orders / course_unit_orders hold every word of
+    the course in plain order_number order (continuous curriculum mode), with
+    the order of its unit (-1 if the unit is not part of this course).
+    """
+
+    __slots__ = (
+        "course_id", "version", "units", "word_ids", "order_numbers",
+        "course_word_ids", "course_orders", "course_unit_orders",
+        "_words", "_unit_by_id", "_unit_by_order", "_image_by_english", "_turkish_by_english"
+    )
+
+    def __init__(self, course_id: int, version: int, unit_rows, word_rows):
+        self.course_id = course_id
+        self.version = version
+
+        self._words: Dict[int, WordInfo] = {}
+        by_unit: Dict[int, list] = {}
+        self._image_by_english: Dict[str, str] = {}
+        self._turkish_by_english: Dict[str, str] = {}
+
+        for row in word_rows:  # Ordered by order_number
+            word = WordInfo(*row)
+            self._words[word.word_id] = word
+            by_unit.setdefault(word.unit_id, []).append(word)
+            if word.image_url and word.english:
+                self._image_by_english.setdefault(word.english.lower(), word.image_url)
+            if word.turkish and word.english:
+                self._turkish_by_english.setdefault(word.english.lower(), word.turkish)
+
+        self.word_ids = array("q")
+        self.order_numbers = array("q")
+        units = []
+        for unit_id, name, order_number, word_count in unit_rows:  # Ordered by order_number
+            start = len(self.word_ids)
+            for word in by_unit.get(unit_id, ()):
+                self.word_ids.append(word.word_id)
+                self.order_numbers.append(word.order_number or 0)
+            units.append(UnitSpan(unit_id, name, order_number, word_count or 0, start, len(self.word_ids)))
+
+        self.units: Tuple[UnitSpan, ...] = tuple(units)
+        self._unit_by_id = {unit.unit_id: unit for unit in self.units}
+        self._unit_by_order: Dict[int, UnitSpan] = {}
+        for unit in self.units:
+            self._unit_by_order.setdefault(unit.order_number, unit)
+
+        self.course_word_ids = array("q")
+        self.course_orders = array("q")
+        self.course_unit_orders = array("q")
+        for word in self._words.values():  # Insertion order = order_number order
+            unit = self._unit_by_id.get(word.unit_id)
+            self.course_word_ids.append(word.word_id)
+            self.course_orders.append(word.order_number or 0)
+            self.course_unit_orders.append(unit.order_number if unit and unit.order_number is not None else -1)
+
+    @property
+    def total_words(self) -> int:
+        """Number of words in the course."""
+        return len(self.course_word_ids)
+
+    def word(self, word_id: int) -> Optional[WordInfo]:
+        """Word of this course by ID (None if it belongs to another course)."""
+        return self._words.get(word_id)
+
+    def unit(self, unit_id: int) -> Optional[UnitSpan]:
+        return self._unit_by_id.get(unit_id)
+
+    def unit_at(self, order_number: int) -> Optional[UnitSpan]:
+        """Unit with the given order_number (first one if duplicated)."""
+        return self._unit_by_order.get(order_number)
+
+    def words_up_to(self, unit: UnitSpan, max_order: int) -> int:
+        """Number of words in the unit with order_number <= max_order (bisect)."""
+        return bisect_right(self.order_numbers, max_order, unit.start, unit.end) - unit.start
+
+    def image_for(self, english: str) -> Optional[str]:
+        """image_url of the first word with this English text (case-insensitive)."""
+        return self._image_by_english.get(english.lower()) if english else None
+
+    def turkish_for(self, english: str) -> Optional[str]:
+        """Words.turkish of the first word with this English text (case-insensitive)."""
+        return self._turkish_by_english.get(english.lower()) if english else None
+
+
+# ============================================================
+# SHARED CACHE
+# ============================================================
+
+_cache: Dict[Tuple[str, int], CourseCurriculum] = {}
+_cache_lock = threading.Lock()
+
+
+def _load(conn: sqlite3.Connection, course_id: int, version: int) -> CourseCurriculum:
+    unit_rows = conn.execute("""
+        SELECT id, name, order_number, word_count
+        FROM Units
+        WHERE course_id = ?
+        ORDER BY order_number, id
+    """, (course_id,)).fetchall()
+
+    word_rows = conn.execute("""
+        SELECT id, english, turkish, image_url, audio_en_url, audio_tr_url, order_number, unit_id
+        FROM Words
+        WHERE course_id = ?
+        ORDER BY order_number, id
+    """, (course_id,)).fetchall()
+
+    curriculum = CourseCurriculum(course_id, version, unit_rows, word_rows)
+    logger.debug(f"Curriculum loaded: course {course_id} v{version} ({len(word_rows)} words, {len(unit_rows)} units)")
+    return curriculum
+
+
+def get_curriculum(conn: sqlite3.Connection, course_id: int) -> CourseCurriculum:
+    """
+    Shared curriculum for a course, rebuilt only when its content version changed.
+    Cost on a cache hit: one primary-key lookup.
+    """
+    try:
+        db_file, version = conn.execute("""
+            SELECT
+                (SELECT file FROM pragma_database_list WHERE name = 'main'),
+                (SELECT version FROM CourseContentVersions WHERE course_id = ?)
+        """, (course_id,)).fetchone()
+    except sqlite3.OperationalError:
+        # Migration 002 not applied: no way to detect changes, so never cache
+        return _load(conn, course_id, 0)
+    version = version or 0
+
+    if not db_file:
+        # In-memory database: no stable identity to key a shared cache on
+        return _load(conn, course_id, version)
+
+    key = (db_file, course_id)
+    curriculum = _cache.get(key)
+    if curriculum is not None and curriculum.version == version:
+        return curriculum
+
+    curriculum = _load(conn, course_id, version)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is None or cached.version <= version:
+            _cache[key] = curriculum
+    return curriculum
+
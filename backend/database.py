@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, Text, DateTime
+from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, Text, DateTime, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import sessionmaker, declarative_base, relationship
 import logging
@@ -36,99 +36,14 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 def check_and_migrate_db():
-    import sqlite3
+    """
+    Apply pending schema migrations (see migrations/runner.py).
+    No-op (single SELECT on schema_version) once the database is current.
+    """
+    from backend.migrations.runner import run_migrations
     try:
-        with sqlite3.connect(DB_PATH) as conn:
-            cursor = conn.cursor()
-            
-            # Check Users table columns
-            cursor.execute("PRAGMA table_info(Users)")
-            columns = [info[1] for info in cursor.fetchall()]
-            
-            if "created_at" not in columns:
-                logger.info("Migrating: Adding created_at to Users")
-                # SQLite ADD COLUMN requires constant default.
-                cursor.execute("ALTER TABLE Users ADD COLUMN created_at TIMESTAMP DEFAULT '2024-01-01 00:00:00'")
-                
-            if "last_login" not in columns:
-                logger.info("Migrating: Adding last_login to Users")
-                cursor.execute("ALTER TABLE Users ADD COLUMN last_login TIMESTAMP")
-            
-            if "is_teacher" not in columns:
-                logger.info("Migrating: Adding is_teacher to Users")
-                cursor.execute("ALTER TABLE Users ADD COLUMN is_teacher INTEGER DEFAULT 0")
-            
-            if "teacher_id" not in columns:
-                logger.info("Migrating: Adding teacher_id to Users")
-                cursor.execute("ALTER TABLE Users ADD COLUMN teacher_id TEXT UNIQUE")
-            
-            if "assigned_teacher_id" not in columns:
-                logger.info("Migrating: Adding assigned_teacher_id to Users")
-                cursor.execute("ALTER TABLE Users ADD COLUMN assigned_teacher_id TEXT")
-                
-            if "approved_at" not in columns:
-                logger.info("Migrating: Adding approved_at to Users")
-                cursor.execute("ALTER TABLE Users ADD COLUMN approved_at TIMESTAMP")
-            
-            if "account_type" not in columns:
-                logger.info("Migrating: Adding account_type to Users")
-                cursor.execute("ALTER TABLE Users ADD COLUMN account_type VARCHAR(20)")
-            
-            if "approval_status" not in columns:
-                logger.info("Migrating: Adding approval_status to Users")
-                cursor.execute("ALTER TABLE Users ADD COLUMN approval_status VARCHAR(20) DEFAULT 'approved'")
-            
-            # Create maintenance_mode table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS maintenance_mode (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    is_active BOOLEAN DEFAULT 0,
-                    message TEXT,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_by INTEGER
-                )
-            """)
-            
-            # Create admin_logs table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS admin_logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    admin_user_id INTEGER NOT NULL,
-                    action VARCHAR(50) NOT NULL,
-                    target_user_id INTEGER,
-                    details TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            # Create TeacherMessages table (for Admin/Teacher -> Student communication)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS TeacherMessages (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    student_id INTEGER NOT NULL,
-                    sender_id INTEGER,
-                    subject TEXT,
-                    message TEXT,
-                    message_type VARCHAR(20) DEFAULT 'general',
-                    sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    read_at TIMESTAMP,
-                    FOREIGN KEY(student_id) REFERENCES Users(id)
-                )
-            """)
-            
-            conn.commit()
-            logger.info("Migration successful")
-            
-            # Additional Migration for Courses
-            with sqlite3.connect(DB_PATH) as conn:
-                cursor = conn.cursor()
-                cursor.execute("PRAGMA table_info(Courses)")
-                course_cols = [info[1] for info in cursor.fetchall()]
-                if "level" not in course_cols:
-                    logger.info("Migrating: Adding level to Courses")
-                    cursor.execute("ALTER TABLE Courses ADD COLUMN level TEXT DEFAULT 'General'")
-                    conn.commit()
-
+        version = run_migrations(DB_PATH)
+        logger.debug(f"Schema version: {version}")
     except Exception as e:
         logger.warning(f"Migration Warning: {e}")
 
@@ -164,6 +79,10 @@ class Unit(Base):
 
 class Word(Base):
     __tablename__ = "Words"
+    __table_args__ = (
+        Index("ix_words_course_order", "course_id", "order_number"),
+        Index("ix_words_unit_order", "unit_id", "order_number"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     course_id = Column(Integer, ForeignKey("Courses.id"))
@@ -197,6 +116,10 @@ class User(Base):
 
 class UserProgress(Base):
     __tablename__ = "UserProgress"
+    __table_args__ = (
+        Index("ux_userprogress_user_word", "user_id", "word_id", unique=True),
+        Index("ix_userprogress_user_next_review", "user_id", "next_review_step"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("Users.id"))
@@ -208,6 +131,9 @@ class UserProgress(Base):
 
 class UserCourseProgress(Base):
     __tablename__ = "UserCourseProgress"
+    __table_args__ = (
+        Index("ux_usercourseprogress_user_course", "user_id", "course_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("Users.id"))
@@ -215,6 +141,7 @@ class UserCourseProgress(Base):
     current_step = Column(Integer, default=1)
     max_open_unit_order = Column(Integer, default=1)
     last_activity = Column(DateTime(timezone=True), server_default=func.now())
+    version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped on every current_step write (CAS)
 
 class UserWordProgress(Base):
     """
@@ -1,7 +1,12 @@
 import random
-from collections import defaultdict
+import hashlib
+import functools
+import threading
+from bisect import bisect_right
+from itertools import accumulate
+from collections import OrderedDict, defaultdict
 from dataclasses import dataclass
-from typing import Dict, List, Set, Tuple, Optional
+from typing import Dict, List, NamedTuple, Set, Tuple, Optional
 
 # =========================================================
 # V13 ENGINE LOGIC
@@ -21,101 +26,161 @@ class Word:
     plural: Optional[str] = None
 
 
+class Frame(NamedTuple):
+    """ What a generated sentence is made of (input of the Turkish realizer) """
+    kind: str                      # statement, copula, question
+    subj: Optional[Word] = None    # None: 'Who' question
+    verb: Optional[Word] = None
+    obj: Optional[Word] = None     # Object, or the job noun of a copula
+    adj: Optional[Word] = None     # Adjective of the object, or the copula predicate
+    q: Optional[Word] = None
+
+
+POS_MAP = {
+    "obj": "noun",
+    "verb": "verb",
+    "adj": "adj",
+    "q_word": "q_word"
+}
+PRONOUNS = {"I", "you", "he", "she", "it", "we", "they"}
+
+
+def adapt_word(w: dict) -> Optional[Word]:
+    """ One DB entry as a V13 Word (None: type not used by the engine) """
+    # Map DB types to V13 POS
+    db_pos = w.get("type", "unknown")
+    if db_pos == "sub":
+        pos = "pron" if w["text"] in PRONOUNS else "noun"
+    elif db_pos in POS_MAP:
+        pos = POS_MAP[db_pos]
+    else:
+        return None
+
+    return Word(
+        text=w["text"],
+        pos=pos,
+        tags=frozenset(w.get("tags", [])),
+        req_sub=frozenset(w.get("req_sub", [])),
+        req_obj=frozenset(w.get("req_obj", [])),
+        base=w.get("base"),
+        third=w.get("morph", {}).get("3s"),
+        past=w.get("past"),
+        ing=w.get("ing"),
+        plural=w.get("plural"),
+    )
+
+
 def adapt_vocab(rich_db: dict) -> list[Word]:
     words = []
     for wid, w in rich_db.items():
-        # Map DB types to V13 POS
-        pos_map = {
-            "sub": "pron" if w["text"] in ["I","you","he","she","it","we","they"] else "noun",
-            "obj": "noun",
-            "verb": "verb",
-            "adj": "adj",
-            "q_word": "q_word"
-        }
-        
-        db_pos = w.get("type", "unknown")
-        if db_pos not in pos_map:
-            continue
-            
-        words.append(
-            Word(
-                text=w["text"],
-                pos=pos_map[db_pos],
-                tags=frozenset(w.get("tags", [])),
-                req_sub=frozenset(w.get("req_sub", [])),
-                req_obj=frozenset(w.get("req_obj", [])),
-                base=w.get("base"),
-                third=w.get("morph", {}).get("3s"),
-                past=w.get("past"),
-                ing=w.get("ing"),
-                plural=w.get("plural"),
-            )
-        )
+        word = adapt_word(w)
+        if word is not None:
+            words.append(word)
     return words
 
 
 class SmartIndex:
+    """
+    Word pools by POS / tag, plus the subject->verb and verb->object
+    compatibility pools precomputed at build time: every pick is a single
+    random.choice over a ready tuple. Read-only after build (engines are shared).
+    """
+
     def __init__(self, words: list[Word]):
-        self.by_pos = defaultdict(list)
-        self.by_pos_tag = defaultdict(list)
+        by_pos = defaultdict(list)
+        by_pos_tag = defaultdict(list)
 
         for w in words:
-            self.by_pos[w.pos].append(w)
+            by_pos[w.pos].append(w)
             for t in w.tags:
-                self.by_pos_tag[(w.pos, t)].append(w)
+                by_pos_tag[(w.pos, t)].append(w)
+
+        self.by_pos = {pos: tuple(pool) for pos, pool in by_pos.items()}
+        self.by_pos_tag = {key: tuple(pool) for key, pool in by_pos_tag.items()}
+
+        # Subject tag set -> compatible verbs (every subject candidate + 'Who' as human)
+        self.verbs_for_subject = {}
+        subject_tags = {w.tags for w in self.by_pos.get("noun", ()) + self.by_pos.get("pron", ())}
+        subject_tags.add(frozenset(["human"]))
+        for tags in subject_tags:
+            self.verbs_for_subject[tags] = self._verb_pool(tags)
+
+        # Verb req_obj -> compatible objects
+        self.objects_for_verb = {}
+        for verb in self.by_pos.get("verb", ()):
+            if verb.req_obj and verb.req_obj not in self.objects_for_verb:
+                self.objects_for_verb[verb.req_obj] = self._object_pool(verb.req_obj)
+
+    def _verb_pool(self, subj_tags: frozenset) -> tuple:
+        verbs = self.by_pos.get("verb", ())
+        # If verb has NO req_sub, it's generic. If it has req_sub, it must match.
+        pool = tuple(w for w in verbs if not w.req_sub or (w.req_sub & subj_tags))
+        if not pool:
+            # Fallback: lenient search usually not good here, but prevents specific crash
+            # Let's try to return broad verbs
+            pool = tuple(w for w in verbs if "human" in w.req_sub)
+        return pool or verbs # Total fallback
 
-    def pick(self, pos: str, tag: Optional[str] = None) -> Word:
-        pool = self.by_pos_tag[(pos, tag)] if tag else self.by_pos[pos]
+    def _object_pool(self, req_obj: frozenset) -> tuple:
+        nouns = self.by_pos.get("noun", ())
+        pool = tuple(w for w in nouns if (w.tags & req_obj))
         if not pool:
+            # Fallback: Pick any noun (creates nonsense but avoids crash)
+            # improved: pick 'object' tag as safe fallback
+            pool = tuple(w for w in nouns if "object" in w.tags)
+        return pool or nouns
+
+    def pool(self, pos: str, tag: Optional[str] = None) -> tuple:
+        """ The candidates pick() chooses from (empty: pick raises) """
+        pool = self.by_pos_tag.get((pos, tag), ()) if tag else self.by_pos.get(pos, ())
+        if not pool and tag:
             # Fallback for strict tags in limited vocab
-             if tag: pool = self.by_pos[pos] # Broaden search
-             if not pool: raise ValueError(f"No word for pos={pos}")
+            pool = self.by_pos.get(pos, ()) # Broaden search
+        return pool
+
+    def verbs_for(self, subj_tags: frozenset) -> tuple:
+        pool = self.verbs_for_subject.get(subj_tags)
+        if pool is None:
+            pool = self._verb_pool(subj_tags) # Tag set not seen at build time
+        return pool
+
+    def objects_for(self, req_obj: frozenset) -> tuple:
+        if not req_obj:
+            # Verb takes any object? Or intransitive? 
+            # If intransitive, this shouldn't be called ideally, but safely pick generic object
+            return self.by_pos.get("noun", ())
+        pool = self.objects_for_verb.get(req_obj)
+        if pool is None:
+            pool = self._object_pool(req_obj)
+        return pool
+
+    def pick(self, pos: str, tag: Optional[str] = None) -> Word:
+        pool = self.pool(pos, tag)
+        if not pool: raise ValueError(f"No word for pos={pos}")
         return random.choice(pool)
 
     def pick_filtered(self, pos: str, required_tags: frozenset) -> Word:
         # Legacy method - kept if needed but we should use specific requirement checks
         pool = [
-            w for w in self.by_pos[pos]
+            w for w in self.by_pos.get(pos, ())
             if not required_tags or (w.tags & required_tags)
         ]
-        if not pool: pool = self.by_pos[pos]
+        if not pool: pool = self.by_pos.get(pos, ())
         if not pool: raise ValueError("No words available")
         return random.choice(pool)
 
     def pick_verb_for_subject(self, subj_tags: frozenset) -> Word:
         """ Select a verb where verb.req_sub has intersection with subj_tags """
-        # If verb has NO req_sub, it's generic. If it has req_sub, it must match.
-        pool = [
-            w for w in self.by_pos["verb"]
-            if not w.req_sub or (w.req_sub & subj_tags)
-        ]
-        if not pool:
-            # Fallback: lenient search usually not good here, but prevents specific crash
-            # Try to find 'any' verb if strict failed, or raise?
-            # Let's try to return broad verbs
-            pool = [w for w in self.by_pos["verb"] if "human" in w.req_sub] 
-        
-        if not pool: pool = self.by_pos["verb"] # Total fallback
+        pool = self.verbs_for(subj_tags)
         if not pool: raise ValueError("No verbs available")
         return random.choice(pool)
 
     def pick_object_for_verb(self, req_obj: frozenset) -> Word:
         """ Select a noun where noun.tags intersects with req_obj """
         if not req_obj:
-            # Verb takes any object? Or intransitive? 
-            # If intransitive, this shouldn't be called ideally, but safely pick generic object
             return self.pick("noun")
-            
-        pool = [
-            w for w in self.by_pos["noun"]
-            if (w.tags & req_obj)
-        ]
-        if not pool:
-            # Fallback: Pick any noun (creates nonsense but avoids crash)
-            # improved: pick 'object' tag as safe fallback
-            pool = [w for w in self.by_pos["noun"] if "object" in w.tags]
 
-        if not pool: pool = self.by_pos["noun"]
+        pool = self.objects_for(req_obj)
         if not pool: raise ValueError("No objects available")
         return random.choice(pool)
 
@@ -155,159 +220,226 @@ class Morph:
             return "is"
         return "are"
 
+# =========================================================
+# SENTENCE SPACE
+# =========================================================
 
-class SentenceEngineV13:
-    def __init__(self, rich_db: dict):
-        adapted = adapt_vocab(rich_db)
-        self.index = SmartIndex(adapted)
+# Template mix of the space: statements / copulas / questions,
+# and the share of statements with an adjective / copulas with an adjective
+STATEMENT_WEIGHT = 0.50
+COPULA_WEIGHT = 0.25
+QUESTION_WEIGHT = 0.25
+STATEMENT_ADJ_SHARE = 0.4
+COPULA_ADJ_SHARE = 0.7
+
+HUMAN = frozenset(["human"])
+THIRD_PERSON = Word("he", "sub", frozenset())  # 'Who' agrees like he/she/it
+
+
+def _prefix_sums(counts) -> list[int]:
+    return list(accumulate(counts))
+
+
+def _locate(prefix: list[int], i: int) -> tuple[int, int]:
+    """ (slot, offset inside the slot) of index i in a prefix-summed layout """
+    slot = bisect_right(prefix, i)
+    return slot, i - (prefix[slot - 1] if slot else 0)
+
+
+class _Draw:
+    """ Indexes 0..n-1 without replacement, one at a time (sparse Fisher-Yates) """
+
+    def __init__(self, n: int):
+        self.remaining = n
+        self._moved = {}
+
+    def next(self) -> int:
+        j = random.randrange(self.remaining)
+        self.remaining -= 1
+        value = self._moved.get(j, j)
+        self._moved[j] = self._moved.pop(self.remaining, self.remaining)
+        return value
+
+
+class SentenceSpace:
+    """
+    Every sentence an index can produce, counted and addressed by number
+    without materializing it.
+
+    The space is split into strata (statement, statement + adjective, copula
+    + adjective, copula + job, one per question word), each laid out as
+    subject -> verb -> object with prefix sums of the pool sizes, so a
+    stratum's size is known at build time and any index decodes in O(log n).
+    Decoding an index is the only place the English templates live.
+    """
+
+    def __init__(self, index: SmartIndex):
+        self.index = index
+        nouns = index.pool("noun")
+        adjs = index.pool("adj")
+
+        # Statement / question subjects (human pronouns, else human nouns)
+        self.subjects = index.pool("pron", "human") or index.pool("noun", "human")
+        self.speakers = index.pool("pron", "human")   # Copula subjects
+        self.jobs = index.pool("noun", "job")
+        self.adjs = adjs
+
+        # Subject tags -> (verbs, prefix sums of their object pool sizes)
+        self._verbs = {}
+        for tags in {w.tags for w in self.subjects} | {HUMAN}:
+            verbs = index.verbs_for(tags)
+            self._verbs[tags] = (verbs, _prefix_sums(len(index.objects_for(v.req_obj)) for v in verbs))
+
+        # Subject -> (verb, object) combinations, and subject -> verb only (ask_object questions)
+        self._svo = _prefix_sums(self._svo_count(w.tags) for w in self.subjects)
+        self._sv = _prefix_sums(len(self._verbs[w.tags][0]) for w in self.subjects)
+        svo = self._svo[-1] if self._svo else 0
+        sv = self._sv[-1] if self._sv else 0
+
+        self.strata = [
+            ("statement", STATEMENT_WEIGHT * (1 - STATEMENT_ADJ_SHARE), svo, self._statement),
+            ("statement_adj", STATEMENT_WEIGHT * STATEMENT_ADJ_SHARE, svo * len(adjs), self._statement_adj),
+            ("copula_adj", COPULA_WEIGHT * COPULA_ADJ_SHARE, len(self.speakers) * len(adjs), self._copula_adj),
+            ("copula_job", COPULA_WEIGHT * (1 - COPULA_ADJ_SHARE), len(self.speakers) * len(self.jobs), self._copula_job),
+        ]
+        q_words = index.pool("q_word")
+        for q in q_words:
+            weight = QUESTION_WEIGHT / len(q_words)
+            if q.text.lower() == "who":
+                size = self._svo_count(HUMAN) if sv else 0
+                self.strata.append((f"question:{q.text}", weight, size, functools.partial(self._who_question, q)))
+            elif "ask_object" in q.tags:
+                self.strata.append((f"question:{q.text}", weight, sv, functools.partial(self._verb_question, q)))
+            else:
+                self.strata.append((f"question:{q.text}", weight, svo, functools.partial(self._object_question, q)))
+
+        self.total = sum(size for _, _, size, _ in self.strata)
+
+    def __len__(self) -> int:
+        return self.total
+
+    def _svo_count(self, tags: frozenset) -> int:
+        prefix = self._verbs[tags][1]
+        return prefix[-1] if prefix else 0
 
     # -------------------------
-    # STATEMENT (SVO)
+    # DECODING (index -> words -> text, key)
     # -------------------------
 
-    def make_statement(self) -> tuple[str, str]:
-        # Try to pick a pronoun subject first (simpler)
-        subj = None
-        for p_type, p_tag in [("pron", "human"), ("noun", "human"), ("noun", "animal")]:
-            try:
-                subj = self.index.pick(p_type, p_tag)
-                break
-            except: continue
-        
-        if not subj:
-            # Fallback to any noun (e.g. Car, if Vehicle supported)
-            try: subj = self.index.pick("noun")
-            except: raise ValueError("No subject available")
-            
-        # verb → req_sub compatible
-        verb = self.index.pick_verb_for_subject(subj.tags)
-        
-        # object → req_obj compatible
-        obj = self.index.pick_object_for_verb(verb.req_obj)
-
-        parts = [subj.text, Morph.verb(verb, subj)]
-
-        # Article + Adjective + Noun logic
+    def _svo_at(self, i: int) -> tuple[Word, Word, Word]:
+        s, i = _locate(self._svo, i)
+        subj = self.subjects[s]
+        verbs, prefix = self._verbs[subj.tags]
+        v, o = _locate(prefix, i)
+        return subj, verbs[v], self.index.objects_for(verbs[v].req_obj)[o]
+
+    def _statement(self, i: int, adj: Optional[Word] = None) -> tuple[str, str, Frame]:
+        subj, verb, obj = self._svo_at(i)
         article = Morph.article(obj)
-        adj_text = ""
-        
-        if random.random() < 0.4:
-            try:
-                adj = self.index.pick("adj")
-                adj_text = adj.text
-            except: pass
-
-        if adj_text:
-             parts.extend([article, adj_text])
-        else:
-             parts.append(article)
-        
-        # Pluralize randomly? No, strict to singular for simple SVO + Article agreement.
-        # "He eats an apple" vs "He eats apples".
-        # If we used 'some', we could pluralize. For 'a/an', singular is mandatory.
-        # Let's keep singular for now as Morph.article returns a/an/some correctly.
-        noun_text = obj.text 
-        if article == "some":
-            noun_text = Morph.plural(obj)
-            
-        parts.append(noun_text)
-
-        sentence = " ".join(parts).capitalize() + "."
-        return sentence, obj.text
+        parts = [subj.text, Morph.verb(verb, subj), article]
+        if adj is not None:
+            parts.append(adj.text)
+        parts.append(Morph.plural(obj) if article == "some" else obj.text)
+        return " ".join(parts).capitalize() + ".", obj.text, Frame("statement", subj, verb, obj, adj)
+
+    def _statement_adj(self, i: int) -> tuple[str, str, Frame]:
+        i, a = divmod(i, len(self.adjs))
+        return self._statement(i, self.adjs[a])
+
+    def _copula_adj(self, i: int) -> tuple[str, str, Frame]:
+        s, a = divmod(i, len(self.adjs))
+        subj, pred = self.speakers[s], self.adjs[a]
+        text = f"{subj.text} {Morph.copula(subj)} {pred.text}.".capitalize()
+        return text, pred.text.replace("a ", ""), Frame("copula", subj, adj=pred)
+
+    def _copula_job(self, i: int) -> tuple[str, str, Frame]:
+        s, j = divmod(i, len(self.jobs))
+        subj, pred = self.speakers[s], self.jobs[j]
+        text = f"{subj.text} {Morph.copula(subj)} a {pred.text}.".capitalize()
+        return text, pred.text.replace("a ", ""), Frame("copula", subj, obj=pred)
+
+    def _who_question(self, q: Word, i: int) -> tuple[str, str, Frame]:
+        verbs, prefix = self._verbs[HUMAN]
+        v, o = _locate(prefix, i)
+        verb = verbs[v]
+        obj = self.index.objects_for(verb.req_obj)[o]
+        text = f"Who {Morph.verb(verb, THIRD_PERSON)} {Morph.article(obj)} {obj.text}?"
+        return text, obj.text, Frame("question", None, verb, obj, q=q)
+
+    def _verb_question(self, q: Word, i: int) -> tuple[str, str, Frame]:
+        s, v = _locate(self._sv, i)
+        subj = self.subjects[s]
+        verb = self._verbs[subj.tags][0][v]
+        return f"{q.text} {_aux(subj)} {subj.text} {verb.text}?", verb.text, Frame("question", subj, verb, q=q)
+
+    def _object_question(self, q: Word, i: int) -> tuple[str, str, Frame]:
+        subj, verb, obj = self._svo_at(i)
+        text = f"{q.text} {_aux(subj)} {subj.text} {verb.text} {Morph.article(obj)} {obj.text}?"
+        return text, obj.text, Frame("question", subj, verb, obj, q=q)
 
     # -------------------------
-    # COPULA (Subject + Be + Adj/Noun)
+    # SAMPLING
     # -------------------------
 
-    def make_copula(self) -> tuple[str, str]:
-        try:
-            subj = self.index.pick("pron", "human")
-        except:
-            return self.make_statement() # Fallback
-
-        cop = Morph.copula(subj)
-        
-        # Predicate: Adjective or Noun
-        if random.random() < 0.7:
-             try:
-                pred = self.index.pick("adj")
-                pred_text = pred.text
-             except:
-                return self.make_statement()
-        else:
-             # "I am a student"
-             try:
-                pred = self.index.pick("noun", "job") # Job or role
-             except:
-                return self.make_statement()
-             pred_text = f"a {pred.text}"
-
-        sentence = f"{subj.text} {cop} {pred_text}.".capitalize()
-        # Keyword is predicate (e.g. happy, student)
-        return sentence, pred.text.replace("a ", "")
+    def sentence(self, i: int) -> tuple[str, str, Frame]:
+        """ The i-th sentence of the space (0 <= i < total): text, key word, frame """
+        if not 0 <= i < self.total:
+            raise IndexError(i)
+        for _, _, size, decode in self.strata:
+            if i < size:
+                return decode(i)
+            i -= size
 
-    # -------------------------
-    # QUESTION (Wh + Do/Does + S + V + O)
-    # -------------------------
+    def sample(self, count: int) -> list[tuple[str, str, Frame]]:
+        """
+        Up to count distinct sentences, drawn without replacement.
+        Each draw picks a stratum by the template mix (among strata that
+        still have sentences left), then an unused index inside it. Returns
+        fewer than count only when the space is exhausted.
+        """
+        draws = [(weight, decode, _Draw(size)) for _, weight, size, decode in self.strata if size]
+        sentences, seen = [], set()
+        while len(sentences) < count and draws:
+            k = random.choices(range(len(draws)), weights=[d[0] for d in draws])[0]
+            _, decode, draw = draws[k]
+            text, key, frame = decode(draw.next())
+            if not draw.remaining:
+                del draws[k]
+            if text not in seen:  # Different words can still spell the same sentence
+                seen.add(text)
+                sentences.append((text, key, frame))
+        return sentences
 
-    def make_question(self) -> tuple[str, str]:
-        try:
-            q = self.index.pick("q_word")
-            
-            # Prioritize Human Subjects for questions
-            subj = None
-            for p_type, p_tag in [("pron", "human"), ("noun", "human"), ("noun", "animal")]:
-                try:
-                    subj = self.index.pick(p_type, p_tag)
-                    break
-                except: continue
-            
-            if not subj: subj = self.index.pick("sub") # Fallback
-
-            verb = self.index.pick_verb_for_subject(subj.tags)
-        except:
-            return self.make_statement()
-        
-        # Handle 'who' -> subject question? simplified to 'Who likes apple?'
-        if q.text.lower() == "who":
-             # Who likes x?
-             # Treat 'Who' as 3rd person singular human
-             verb = self.index.pick_verb_for_subject(frozenset(["human"]))
-             obj = self.index.pick_object_for_verb(verb.req_obj)
-             # "Who likes the apple?"
-             article = Morph.article(obj)
-             return f"Who {Morph.verb(verb, Word('he','sub',frozenset()))} {article} {obj.text}?", obj.text
-
-        aux = "does" if subj.text.lower() in {"he", "she", "it"} else "do"
-        
-        # Check if question asks for object (What)
-        if "ask_object" in q.tags:
-            # "What do you want?" (Transitive verb needed)
-            # Pick verb that NEEDS object
-            # For now standard logic is fine
-            sentence = f"{q.text} {aux} {subj.text} {verb.text}?"
-            return sentence, verb.text
-
-        # Otherwise add object
-        obj = self.index.pick_object_for_verb(verb.req_obj)
-        article = Morph.article(obj)
-        # Simplified question object usually "the" or bare or 'a'
-        
-        sentence = f"{q.text} {aux} {subj.text} {verb.text} {article} {obj.text}?"
-        return sentence, obj.text
+
+def _aux(subj: Word) -> str:
+    return "does" if subj.text.lower() in {"he", "she", "it"} else "do"
+
+
+class SentenceEngineV13:
+    def __init__(self, rich_db: dict):
+        adapted = adapt_vocab(rich_db)
+        self.index = SmartIndex(adapted)
+        self.space = SentenceSpace(self.index)
+
+    @classmethod
+    def from_words(cls, words: list[Word]) -> "SentenceEngineV13":
+        """ Engine over already adapted words (skips adapt_vocab) """
+        engine = cls.__new__(cls)
+        engine.index = SmartIndex(words)
+        engine.space = SentenceSpace(engine.index)
+        return engine
 
     # -------------------------
     # DISPATCHER
     # -------------------------
 
-    def generate_one(self, complexity=0.5):
-        r = random.random()
-        # Balance distribution
-        if r < 0.50:
-            return self.make_statement()
-        if r < 0.75:
-            return self.make_copula()
-        return self.make_question()
+    def generate_one(self, complexity=0.5) -> tuple[str, str]:
+        """ One random sentence (text, key word), drawn from the space with the template mix """
+        sentences = self.space.sample(1)
+        if not sentences:
+            raise ValueError("No sentence available")
+        text, key, _ = sentences[0]
+        return text, key
 
 
 # ==========================================
@@ -732,49 +864,110 @@ RICH_VOCAB_DB = {
 }
 
 
+# ==========================================
+# PREBUILT ENGINES
+# ==========================================
+# RICH_VOCAB_DB adapted once at import (None: entry type not used by the engine)
+WORD_TABLE: Dict[str, Optional[Word]] = {key: adapt_word(meta) for key, meta in RICH_VOCAB_DB.items()}
+
+# Known word -> DB keys it selects (by key or by text), in DB order
+_KEY_ORDER = {key: i for i, key in enumerate(RICH_VOCAB_DB)}
+_KEYS_BY_TEXT: Dict[str, List[str]] = defaultdict(list)
+for _key, _meta in RICH_VOCAB_DB.items():
+    _KEYS_BY_TEXT[_meta["text"]].append(_key)
+
+FALLBACK_TAGS = frozenset(["object", "countable"])
+ENGINE_CACHE_MAX_ENTRIES = 256  # Built engines kept (one per distinct known-word set)
+
+
+def vocab_fingerprint(known_set: Set[str]) -> str:
+    """ Stable hash of a known-word set (students at the same stage share it) """
+    return hashlib.sha1("\n".join(sorted(known_set)).encode("utf-8")).hexdigest()
+
+
+def filter_words(known_set: Set[str]) -> list[Word]:
+    """ The user's view of WORD_TABLE: known DB words + unknown words as generic nouns """
+    keys = set()
+    for word in known_set:
+        if word in RICH_VOCAB_DB:
+            keys.add(word)
+        keys.update(_KEYS_BY_TEXT.get(word, ()))
+
+    words = [
+        WORD_TABLE[key] for key in sorted(keys, key=_KEY_ORDER.__getitem__)
+        if WORD_TABLE[key] is not None
+    ]
+    # Fallback: Add known words as generic nouns if strict matching failed
+    words.extend(
+        Word(text=word, pos="noun", tags=FALLBACK_TAGS)
+        for word in sorted(known_set) if word not in RICH_VOCAB_DB
+    )
+    return words
+
+
 class SentenceEngineWrapper:
     """ Wrapper to expose the V13 Engine with the expected API interface """
-    def __init__(self):
-        pass
+    def __init__(self, max_engines: int = ENGINE_CACHE_MAX_ENTRIES):
+        self.max_engines = max_engines
+        self._engines: "OrderedDict[str, SentenceEngineV13]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
 
-    def generate(self, known_words_list: list[str], count=5) -> list[dict]:
+    def engine_for(self, known_set: Set[str]) -> SentenceEngineV13:
         """
-        Returns list of dicts: {'text': str, 'key_word': str}
+        Built engine for a known-word set, from the LRU or built once and cached.
+        Engines are read-only after build, so requests share them across threads.
         """
+        key = vocab_fingerprint(known_set)
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is not None:
+                self._engines.move_to_end(key)
+                self._stats["hits"] += 1
+                return engine
+            self._stats["misses"] += 1
+
+        engine = SentenceEngineV13.from_words(filter_words(known_set))
+        with self._lock:
+            self._engines[key] = engine
+            self._engines.move_to_end(key)
+            while len(self._engines) > self.max_engines:
+                self._engines.popitem(last=False)
+        return engine
+
+    def stats(self) -> Dict[str, int]:
+        """ Engine cache counters (hits / misses / cached engines) """
+        with self._lock:
+            return {**self._stats, "engines": len(self._engines)}
+
+    @staticmethod
+    def _known_set(known_words_list: list[str]) -> Set[str]:
         # Normalize known words
-        known_set = set(w.lower() if w != "I" else "I" for w in known_words_list)
-        
-        # Build Filtered DB for V13 Adapter
-        filtered_db = {}
-        for key, meta in RICH_VOCAB_DB.items():
-            if key in known_set or meta["text"] in known_set:
-                filtered_db[key] = meta
-        
-        # Fallback: Add known words as generic nouns if strict matching failed
-        for word in known_set:
-            if word not in filtered_db:
-                 filtered_db[word] = {"type": "obj", "text": word, "tags": ["object", "countable"]}
-
-        if not filtered_db:
-            return []
+        return set(w.lower() if w != "I" else "I" for w in known_words_list)
 
-        # Initialize V13 Engine with filtered data
-        engine = SentenceEngineV13(filtered_db)
+    def count(self, known_words_list: list[str]) -> int:
+        """ Number of sentences the vocabulary can produce (0: insufficient vocabulary) """
+        known_set = self._known_set(known_words_list)
+        if not known_set:
+            return 0
+        return self.engine_for(known_set).space.total
+
+    def generate(self, known_words_list: list[str], count=5, with_frames=False) -> list[dict]:
+        """
+        Returns list of dicts: {'text': str, 'key_word': str} (+ 'frame': Frame if with_frames)
+        Exactly count distinct sentences unless the vocabulary has fewer.
+        """
+        known_set = self._known_set(known_words_list)
+        if not known_set:
+            return []
 
+        engine = self.engine_for(known_set)
         sentences = []
-        attempts = 0
-        while len(sentences) < count and attempts < 20: # Limit attempts
-            attempts += 1
-            try:
-                result = engine.generate_one()
-                text, key = result
-                
-                if not any(s['text'] == text for s in sentences):
-                    sentences.append({'text': text, 'key_word': key})
-            except Exception as e:
-                # Engine might fail if not enough compatible words found
-                continue
-        
+        for text, key, frame in engine.space.sample(count):
+            sentence = {'text': text, 'key_word': key}
+            if with_frames:
+                sentence['frame'] = frame
+            sentences.append(sentence)
         return sentences
 
 # Singleton Instance
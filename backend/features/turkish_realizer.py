@@ -0,0 +1,320 @@
+import re
+from typing import Callable, Optional, Tuple
+
+from backend.utils.dictionary_data import WORD_TRANSLATIONS
+
+# =========================================================
+# TURKISH REALIZER
+# =========================================================
+# Translates a V13 sentence from its Frame (subject, verb, object, adjective,
+# question word) without a network call: SOV word order, case suffixes with
+# vowel harmony, person agreement on the verb (aorist) and the personal copula.
+#
+# Words come from the course (Words.turkish, via a lookup function) and
+# dictionary_data.WORD_TRANSLATIONS. What a gloss doesn't say - the case a verb
+# governs, verbs glossed as nouns ("open": "açık") - is in VERB_FRAMES.
+# realize() returns None when a word has no usable translation; the caller
+# falls back to the translation cache / network translator.
+
+BACK_VOWELS = "aıou"
+FRONT_VOWELS = "eiöü"
+ROUNDED_VOWELS = "ouöü"
+VOWELS = BACK_VOWELS + FRONT_VOWELS
+VOICELESS = "fstkçşhp"          # -DA becomes -tA after these
+SOFTENING = {"p": "b", "ç": "c", "k": "ğ"}
+
+# Cases
+NOM, ACC, DAT, LOC, ABL, INS = "nom", "acc", "dat", "loc", "abl", "ins"
+
+# English verb -> (Turkish infinitive, case of its object)
+VERB_FRAMES = {
+    "eat": ("yemek", NOM),
+    "drink": ("içmek", NOM),
+    "want": ("istemek", NOM),
+    "like": ("sevmek", ACC),
+    "love": ("sevmek", ACC),
+    "see": ("görmek", NOM),
+    "read": ("okumak", NOM),
+    "write": ("yazmak", NOM),
+    "open": ("açmak", NOM),
+    "close": ("kapatmak", NOM),
+    "wash": ("yıkamak", NOM),
+    "clean": ("temizlemek", NOM),
+    "know": ("bilmek", NOM),
+    "think": ("düşünmek", NOM),
+    "make": ("yapmak", NOM),
+    "help": ("yardım etmek", DAT),
+    "look at": ("bakmak", DAT),
+    "listen to": ("dinlemek", NOM),
+    "go to": ("gitmek", DAT),
+    "come to": ("gelmek", DAT),
+    "walk to": ("yürümek", DAT),
+    "run to": ("koşmak", DAT),
+    "stay at": ("kalmak", LOC),
+    "live in": ("yaşamak", LOC),
+    "sit on": ("oturmak", DAT),
+    "sleep in": ("uyumak", LOC),
+    "put": ("koymak", NOM),
+    "wait for": ("beklemek", NOM),
+    "call": ("aramak", NOM),
+    "learn": ("öğrenmek", NOM),
+    "study": ("çalışmak", NOM),
+    "speak to": ("konuşmak", INS),
+    "tell": ("anlatmak", NOM),
+    "hurt": ("incitmek", NOM),
+    "turn on": ("açmak", NOM),
+    "turn off": ("kapatmak", NOM),
+    "leave": ("ayrılmak", ABL),
+    "buy": ("satın almak", NOM),
+    "get": ("almak", NOM),
+    "play with": ("oynamak", INS),
+    "work": ("çalışmak", NOM),
+    "start": ("başlamak", DAT),
+}
+
+# Aorist: monosyllabic stems take -Ar, except these (-Ir); irregular t -> d stems
+AORIST_IR = {"al", "bil", "bul", "dur", "gel", "gör", "kal", "ol", "öl", "san", "var", "vur", "ver"}
+AORIST_IRREGULAR = {"et": "eder", "git": "gider", "tat": "tadar", "kaybet": "kaybeder"}
+
+# Loanwords whose suffixes don't follow their last vowel: word -> vowel the suffix
+# harmonizes with (meşgul -> meşgulüm, saat -> saate, alkol -> alkolü)
+HARMONY_IRREGULAR = {
+    "meşgul": "ü", "saat": "e", "alkol": "ö", "kontrol": "ö", "petrol": "ö",
+    "sembol": "ö", "gol": "ö", "rol": "ö", "dikkat": "e", "hakikat": "e",
+    "harf": "e", "hal": "e", "kabul": "ü", "hayal": "e", "ihtimal": "e",
+}
+
+# English subject -> (Turkish pronoun, person)
+PRONOUNS = {
+    "i": ("ben", "1sg"),
+    "you": ("sen", "2sg"),
+    "he": ("o", "3sg"),
+    "she": ("o", "3sg"),
+    "it": ("o", "3sg"),
+    "we": ("biz", "1pl"),
+    "they": ("onlar", "3pl"),
+}
+QUESTION_WORDS = {"what": "ne", "where": "nerede", "who": "kim", "when": "ne zaman", "why": "neden"}
+WHAT_IN_CASE = {LOC: "nerede", ABL: "nereden"}  # 'What do we stay at?' -> 'Nerede kalırız?'
+
+# Adjectives that replace 'bir' (üç muz, not üç bir muz)
+NUMERALS = {
+    "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+    "twenty", "thirty", "forty", "fifty", "hundred",
+}
+
+
+class _NoTranslation(Exception):
+    pass
+
+
+# -------------------------
+# PHONOLOGY
+# -------------------------
+
+def _last_vowel(word: str) -> str:
+    irregular = HARMONY_IRREGULAR.get(word.split()[-1]) if word.strip() else None
+    if irregular:
+        return irregular
+    for ch in reversed(word):
+        if ch in VOWELS:
+            return ch
+    return "e"
+
+
+def _a(word: str) -> str:
+    """ 2-way harmony vowel (a/e) """
+    return "a" if _last_vowel(word) in BACK_VOWELS else "e"
+
+
+def _i(word: str) -> str:
+    """ 4-way harmony vowel (ı/i/u/ü) """
+    v = _last_vowel(word)
+    if v in BACK_VOWELS:
+        return "u" if v in ROUNDED_VOWELS else "ı"
+    return "ü" if v in ROUNDED_VOWELS else "i"
+
+
+def _ends_with_vowel(word: str) -> bool:
+    return word[-1] in VOWELS
+
+
+def _syllables(word: str) -> int:
+    return sum(1 for ch in word if ch in VOWELS)
+
+
+def _soften(word: str) -> str:
+    """ Final p/ç/k of a polysyllabic word before a vowel (kitap -> kitabı, bardak -> bardağı) """
+    last = word[-1]
+    if last not in SOFTENING or _syllables(word.split()[-1]) < 2:
+        return word
+    if last == "k" and word[-2:-1] == "n":
+        return word[:-1] + "g"
+    return word[:-1] + SOFTENING[last]
+
+
+def inflect(noun: str, case: str) -> str:
+    """
+    Case suffix with harmony and buffer consonants:
+    elma -> elmayı / elmaya / elmada / elmadan / elmayla, kitap -> kitabı.
+    Compounds ending in the possessive (meyve suyu) take the -n- buffer.
+    """
+    if case == NOM:
+        return noun
+    if case == INS:
+        return noun + ("y" if _ends_with_vowel(noun) else "") + "l" + _a(noun)
+
+    compound = " " in noun and noun[-1] in "ıiuü"
+    if case in (ACC, DAT):
+        vowel = _i(noun) if case == ACC else _a(noun)
+        if compound:
+            return noun + "n" + vowel
+        if _ends_with_vowel(noun):
+            return noun + "y" + vowel
+        return _soften(noun) + vowel
+
+    # LOC -DA / ABL -DAn
+    d = "t" if noun[-1] in VOICELESS else "d"
+    return noun + ("n" if compound else "") + d + _a(noun) + ("n" if case == ABL else "")
+
+
+def aorist(infinitive: str) -> Optional[str]:
+    """ 3rd person aorist: okumak -> okur, içmek -> içer, gelmek -> gelir, yardım etmek -> yardım eder """
+    if not infinitive.endswith(("mak", "mek")):
+        return None
+    head, _, stem = infinitive[:-3].rpartition(" ")
+    if not stem:
+        return None
+
+    if stem in AORIST_IRREGULAR:
+        form = AORIST_IRREGULAR[stem]
+    elif _ends_with_vowel(stem):
+        form = stem + "r"
+    elif _syllables(stem) == 1 and stem not in AORIST_IR:
+        form = stem + _a(stem) + "r"
+    else:
+        form = stem + _i(stem) + "r"
+    return f"{head} {form}" if head else form
+
+
+def _person_suffix(word: str, person: str, buffer: str = "") -> str:
+    i, a = _i(word), _a(word)
+    return {
+        "1sg": buffer + i + "m",
+        "2sg": "s" + i + "n",
+        "3sg": "",
+        "1pl": buffer + i + "z",
+        "2pl": "s" + i + "n" + i + "z",
+        "3pl": "l" + a + "r",
+    }[person]
+
+
+def conjugate(infinitive: str, person: str) -> str:
+    """ Aorist with person agreement: yemek, 1sg -> yerim """
+    form = aorist(infinitive)
+    if form is None:
+        raise _NoTranslation(infinitive)
+    return form + _person_suffix(form, person)
+
+
+def copula(predicate: str, person: str) -> str:
+    """ Personal copula: hasta, 1sg -> hastayım; öğretmen, 2sg -> öğretmensin; 3pl stays bare """
+    if person == "3pl":
+        return predicate
+    return predicate + _person_suffix(predicate, person, buffer="y" if _ends_with_vowel(predicate) else "")
+
+
+# -------------------------
+# LEXICON
+# -------------------------
+
+def _clean(gloss: Optional[str]) -> Optional[str]:
+    """ First sense of a learner gloss: 'sıra/masa' -> 'sıra', 'o (erkek)' -> 'o' """
+    if not gloss:
+        return None
+    gloss = re.sub(r"\(.*?\)", "", gloss).split("/")[0]
+    return " ".join(gloss.split()) or None
+
+
+def _word(text: str, lookup: Optional[Callable[[str], Optional[str]]]) -> str:
+    """ Course translation (Words.turkish) first, then the dictionary """
+    translation = _clean(lookup(text)) if lookup else None
+    translation = translation or _clean(WORD_TRANSLATIONS.get(text) or WORD_TRANSLATIONS.get(text.lower()))
+    if translation is None:
+        raise _NoTranslation(text)
+    return translation
+
+
+def _verb(text: str) -> Tuple[str, str]:
+    frame = VERB_FRAMES.get(text)
+    if frame:
+        return frame
+    gloss = _clean(WORD_TRANSLATIONS.get(text))
+    if gloss and gloss.endswith(("mak", "mek")):
+        return gloss, NOM
+    raise _NoTranslation(text)
+
+
+def _subject(subj, lookup) -> Tuple[str, str]:
+    pronoun = PRONOUNS.get(subj.text.lower())
+    if pronoun:
+        return pronoun
+    return _word(subj.text, lookup), "3sg"
+
+
+def _object_phrase(obj, adj, case: str, lookup) -> str:
+    """ [adjective] [bir] noun+case: büyük bir elmayı, soğuk su """
+    parts = [_word(adj.text, lookup)] if adj is not None else []
+    if "countable" in obj.tags and (adj is None or adj.text.lower() not in NUMERALS):
+        parts.append("bir")
+    parts.append(inflect(_word(obj.text, lookup), case))
+    return " ".join(parts)
+
+
+def _capitalize(sentence: str) -> str:
+    first = {"i": "İ", "ı": "I"}.get(sentence[0], sentence[0].upper())
+    return first + sentence[1:]
+
+
+# -------------------------
+# REALIZER
+# -------------------------
+
+def realize(frame, lookup: Optional[Callable[[str], Optional[str]]] = None) -> Optional[str]:
+    """
+    Turkish sentence for a sentence_generator.Frame, or None if a word is missing.
+    lookup(english) -> turkish is consulted before the dictionary (course words).
+    """
+    try:
+        if frame.kind == "copula":
+            subject, person = _subject(frame.subj, lookup)
+            predicate = frame.adj if frame.adj is not None else frame.obj
+            return _capitalize(f"{subject} {copula(_word(predicate.text, lookup), person)}.")
+
+        infinitive, case = _verb(frame.verb.text)
+
+        if frame.kind == "statement":
+            subject, person = _subject(frame.subj, lookup)
+            phrase = _object_phrase(frame.obj, frame.adj, case, lookup)
+            return _capitalize(f"{subject} {phrase} {conjugate(infinitive, person)}.")
+
+        q = QUESTION_WORDS.get(frame.q.text.lower()) if frame.q is not None else None
+        if q is None:
+            return None
+
+        if frame.subj is None:
+            # Who + verb + object: 'Kim bir elma yer?'
+            phrase = _object_phrase(frame.obj, None, case, lookup)
+            return _capitalize(f"{q} {phrase} {conjugate(infinitive, '3sg')}?")
+
+        subject, person = _subject(frame.subj, lookup)
+        if frame.obj is None:
+            # The question word is the object: 'Sen ne istersin?', 'Sen neye bakarsın?'
+            if q == "ne":
+                q = WHAT_IN_CASE.get(case) or inflect(q, case)
+            return _capitalize(f"{subject} {q} {conjugate(infinitive, person)}?")
+
+        phrase = _object_phrase(frame.obj, None, case, lookup)
+        return _capitalize(f"{subject} {q} {phrase} {conjugate(infinitive, person)}?")
+    except _NoTranslation:
+        return None
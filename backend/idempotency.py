@@ -0,0 +1,76 @@
+"""
+Idempotency Keys
+Write endpoints (/session/complete, /session/complete-batch) accept an
+Idempotency-Key header. The response is stored under the key in the same
+transaction as the progress writes, so a retried request gets the original
+response back without touching UserProgress - exactly once, across workers.
+
+Keys are scoped per user and expire after IDEMPOTENCY_TTL_HOURS.
+"""
+
+import json
+import sqlite3
+import hashlib
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_TTL_HOURS = 24
+MAX_KEY_LENGTH = 255
+
+
+def request_hash(endpoint: str, body: Dict[str, Any]) -> str:
+    """Fingerprint of a request, to detect a key reused for a different request."""
+    payload = json.dumps([endpoint, body], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_stored_response(
+    conn: sqlite3.Connection,
+    user_id: int,
+    key: str
+) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Response stored for this key (if not expired).
+    
+    Returns:
+        (request_hash, response) or None
+    """
+    row = conn.execute("""
+        SELECT request_hash, response
+        FROM IdempotencyKeys
+        WHERE user_id = ? AND idempotency_key = ?
+        AND created_at >= datetime('now', ?)
+    """, (user_id, key, f"-{IDEMPOTENCY_TTL_HOURS} hours")).fetchone()
+    
+    if row is None:
+        return None
+    return row[0], json.loads(row[1])
+
+
+def store_response(
+    conn: sqlite3.Connection,
+    user_id: int,
+    key: str,
+    fingerprint: str,
+    response: Dict[str, Any]
+):
+    """
+    Remember the response of a write request. Call inside the request's
+    transaction, before its commit.
+    
+    Raises:
+        sqlite3.IntegrityError: a concurrent request with the same key committed first
+    """
+    # Expired keys go first (index range on created_at, usually nothing to do)
+    conn.execute("""
+        DELETE FROM IdempotencyKeys
+        WHERE created_at < datetime('now', ?)
+    """, (f"-{IDEMPOTENCY_TTL_HOURS} hours",))
+    
+    conn.execute("""
+        INSERT INTO IdempotencyKeys (user_id, idempotency_key, request_hash, response)
+        VALUES (?, ?, ?, ?)
+    """, (user_id, key, fingerprint, json.dumps(response)))
@@ -54,25 +54,21 @@ from starlette.middleware.sessions import SessionMiddleware
 app.add_middleware(SessionMiddleware, secret_key="super-secret-key", same_site="Lax", https_only=False)
 
 # === STUDENT MESSAGES ENDPOINTS ===
-def get_db():
-    db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "englishbus.db")
-    conn = sqlite3.connect(db_path)
-    try:
-        yield conn
-    finally:
-        conn.close()
+from backend.api.dependencies import get_async_db, get_writer
+from backend.async_db import AsyncConnection, connection as async_connection
+from backend.write_queue import WriteQueue
 
 @app.get("/messages/student/{user_id}")
-async def get_student_messages(user_id: int, db: sqlite3.Connection = Depends(get_db)):
+async def get_student_messages(user_id: int, db: AsyncConnection = Depends(get_async_db)):
     """Get messages for a specific student"""
     try:
-        messages = db.execute("""
+        messages = await db.fetchall("""
             SELECT id, message_type, subject, message, sent_at, read_at
             FROM TeacherMessages
             WHERE student_id = ?
             ORDER BY sent_at DESC
             LIMIT 50
-        """, (user_id,)).fetchall()
+        """, (user_id,))
         
         return {"messages": [{
             "id": m[0],
@@ -87,16 +83,16 @@ async def get_student_messages(user_id: int, db: sqlite3.Connection = Depends(ge
         return {"messages": []}
 
 @app.post("/messages/{message_id}/read")
-async def mark_message_as_read(message_id: int, db: sqlite3.Connection = Depends(get_db)):
+async def mark_message_as_read(message_id: int, writer: WriteQueue = Depends(get_writer)):
     """Mark a message as read"""
     try:
         from datetime import datetime
-        db.execute("""
+        read_at = datetime.now().isoformat()
+        await writer.run_async(lambda conn: conn.execute("""
             UPDATE TeacherMessages 
             SET read_at = ? 
             WHERE id = ? AND read_at IS NULL
-        """, (datetime.now().isoformat(), message_id))
-        db.commit()
+        """, (read_at, message_id)).rowcount)
         return {"success": True}
     except Exception as e:
         logger.error(f"Mark as read error: {e}")
@@ -158,11 +154,8 @@ class AdminAuth(AuthenticationBackend):
         password = form.get("password")
         
         try:
-            db_path = os.path.join(base_dir, "englishbus.db")
-            with sqlite3.connect(db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT id, password_hash, is_admin FROM Users WHERE username = ?", (username,))
-                user_row = cursor.fetchone()
+            async with async_connection() as db:
+                user_row = await db.fetchone("SELECT id, password_hash, is_admin FROM Users WHERE username = ?", (username,))
         except Exception as e:
             logger.error(f"DB Auth Error: {e}")
             return False
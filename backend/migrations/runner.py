@@ -0,0 +1,430 @@
+"""
+Versioned Schema Migrations
+Applied versions are recorded in the schema_version table.
+
+Startup cost once the database is current: one connection, one SELECT.
+
+Adding a migration:
+    1. Write a function taking a sqlite3.Connection (runs inside a transaction)
+    2. Append (next_version, "short_name", function) to MIGRATIONS
+Never edit or renumber a migration that has already shipped.
+"""
+
+import os
+import sqlite3
+import logging
+from typing import Callable, List, Tuple
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DB_PATH = os.path.join(BASE_DIR, "englishbus.db")
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [info[1] for info in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+def _baseline(conn: sqlite3.Connection):
+    """
+    Legacy schema fix-ups (formerly database.check_and_migrate_db).
+    Runs once, when a database is first put under version control.
+    """
+    columns = _table_columns(conn, "Users")
+    if columns:
+        user_columns = [
+            # SQLite ADD COLUMN requires constant default.
+            ("created_at", "TIMESTAMP DEFAULT '2024-01-01 00:00:00'"),
+            ("last_login", "TIMESTAMP"),
+            ("is_teacher", "INTEGER DEFAULT 0"),
+            ("teacher_id", "TEXT"),  # UNIQUE via index below (ADD COLUMN can't be UNIQUE)
+            ("assigned_teacher_id", "TEXT"),
+            ("approved_at", "TIMESTAMP"),
+            ("account_type", "VARCHAR(20)"),
+            ("approval_status", "VARCHAR(20) DEFAULT 'approved'"),
+        ]
+        for name, ddl in user_columns:
+            if name not in columns:
+                logger.info(f"Migrating: Adding {name} to Users")
+                conn.execute(f"ALTER TABLE Users ADD COLUMN {name} {ddl}")
+        if "teacher_id" not in columns:
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_users_teacher_id ON Users (teacher_id)")
+
+    course_columns = _table_columns(conn, "Courses")
+    if course_columns and "level" not in course_columns:
+        logger.info("Migrating: Adding level to Courses")
+        conn.execute("ALTER TABLE Courses ADD COLUMN level TEXT DEFAULT 'General'")
+
+    # Columns added by the old one-off scripts in this folder
+    progress_columns = _table_columns(conn, "UserProgress")
+    if progress_columns:
+        if "last_updated" not in progress_columns:
+            logger.info("Migrating: Adding last_updated to UserProgress")
+            conn.execute("ALTER TABLE UserProgress ADD COLUMN last_updated TEXT DEFAULT NULL")
+        if "first_learned_at" not in progress_columns:
+            logger.info("Migrating: Adding first_learned_at to UserProgress")
+            conn.execute("ALTER TABLE UserProgress ADD COLUMN first_learned_at TEXT DEFAULT NULL")
+            conn.execute("""
+                UPDATE UserProgress SET first_learned_at = date(last_updated)
+                WHERE first_learned_at IS NULL AND last_updated IS NOT NULL
+            """)
+
+    # Create maintenance_mode table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS maintenance_mode (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            is_active BOOLEAN DEFAULT 0,
+            message TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_by INTEGER
+        )
+    """)
+
+    # Create admin_logs table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS admin_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            admin_user_id INTEGER NOT NULL,
+            action VARCHAR(50) NOT NULL,
+            target_user_id INTEGER,
+            details TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # Create TeacherMessages table (for Admin/Teacher -> Student communication)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS TeacherMessages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            sender_id INTEGER,
+            subject TEXT,
+            message TEXT,
+            message_type VARCHAR(20) DEFAULT 'general',
+            sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            read_at TIMESTAMP,
+            FOREIGN KEY(student_id) REFERENCES Users(id)
+        )
+    """)
+
+
+def _m001_performance_indexes(conn: sqlite3.Connection):
+    """
+    Composite indexes for the hot paths (session start/complete, dashboard, messages).
+    Unique indexes are preceded by a de-duplication pass because the old
+    SELECT-then-INSERT code could leave duplicate rows behind.
+    """
+    # Keep the most advanced row per (user, word)
+    conn.execute("""
+        DELETE FROM UserProgress WHERE rowid IN (
+            SELECT rid FROM (
+                SELECT rowid AS rid,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY user_id, word_id
+                           ORDER BY repetition_count DESC, rowid DESC
+                       ) AS rn
+                FROM UserProgress
+            ) WHERE rn > 1
+        )
+    """)
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_userprogress_user_word
+        ON UserProgress (user_id, word_id)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS ix_userprogress_user_next_review
+        ON UserProgress (user_id, next_review_step)
+    """)
+
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS ix_words_course_order
+        ON Words (course_id, order_number)
+    """)
+    # (unit_id, order_number) also serves plain unit_id lookups
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS ix_words_unit_order
+        ON Words (unit_id, order_number)
+    """)
+
+    # Keep the furthest step per (user, course)
+    conn.execute("""
+        DELETE FROM UserCourseProgress WHERE rowid IN (
+            SELECT rid FROM (
+                SELECT rowid AS rid,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY user_id, course_id
+                           ORDER BY current_step DESC, rowid DESC
+                       ) AS rn
+                FROM UserCourseProgress
+            ) WHERE rn > 1
+        )
+    """)
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_usercourseprogress_user_course
+        ON UserCourseProgress (user_id, course_id)
+    """)
+
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS ix_teachermessages_student_sent
+        ON TeacherMessages (student_id, sent_at)
+    """)
+
+
+def _m002_course_content_versions(conn: sqlite3.Connection):
+    """
+    Per-course content version for the in-process curriculum cache (curriculum.py).
+    Bumped by triggers, so admin edits and import scripts invalidate it without
+    any code changes. Kept in its own table because the import scripts delete
+    and re-insert Courses rows (a column there would reset to the same values).
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS CourseContentVersions (
+            course_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+    bump = """
+        INSERT INTO CourseContentVersions (course_id, version) VALUES ({ref}.course_id, 1)
+        ON CONFLICT(course_id) DO UPDATE SET version = version + 1;
+    """
+    for table in ("Words", "Units"):
+        if not _table_columns(conn, table):
+            continue
+        for event, refs in (("INSERT", ("NEW",)), ("DELETE", ("OLD",)), ("UPDATE", ("OLD", "NEW"))):
+            body = "".join(bump.format(ref=ref) for ref in refs)
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table.lower()}_{event.lower()}_content_version
+                AFTER {event} ON {table}
+                BEGIN {body} END
+            """)
+
+    if _table_columns(conn, "Courses"):
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_courses_delete_content_version
+            AFTER DELETE ON Courses
+            BEGIN
+                INSERT INTO CourseContentVersions (course_id, version) VALUES (OLD.id, 1)
+                ON CONFLICT(course_id) DO UPDATE SET version = version + 1;
+            END
+        """)
+
+
+def _m003_new_word_cursors(conn: sqlite3.Connection):
+    """
+    Per-(user, course, unit) "next unseen word" pointer (session_manager).
+    unit_id 0 is the course-wide cursor; next_order NULL means nothing left.
+    Deleting progress (reset, user delete) can make a word unseen again,
+    so it drops the user's cursors; they are rebuilt on the next lookup.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS UserNewWordCursors (
+            user_id INTEGER NOT NULL,
+            course_id INTEGER NOT NULL,
+            unit_id INTEGER NOT NULL DEFAULT 0,
+            next_order INTEGER,
+            content_version INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, course_id, unit_id)
+        )
+    """)
+
+    if _table_columns(conn, "UserProgress"):
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_userprogress_delete_cursors
+            AFTER DELETE ON UserProgress
+            BEGIN
+                DELETE FROM UserNewWordCursors WHERE user_id = OLD.user_id;
+            END
+        """)
+
+
+def _m004_user_course_stats(conn: sqlite3.Connection):
+    """
+    Running progress counters per (user, course) (course_stats.py).
+    Rows are created lazily; deleting progress drops the affected course's
+    row so it is rebuilt from UserProgress on next use.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS UserCourseStats (
+            user_id INTEGER NOT NULL,
+            course_id INTEGER NOT NULL,
+            seen INTEGER NOT NULL DEFAULT 0,
+            rep_1_2 INTEGER NOT NULL DEFAULT 0,
+            rep_3_6 INTEGER NOT NULL DEFAULT 0,
+            rep_7_plus INTEGER NOT NULL DEFAULT 0,
+            daily_new INTEGER NOT NULL DEFAULT 0,
+            daily_date TEXT,
+            content_version INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, course_id)
+        )
+    """)
+
+    if _table_columns(conn, "UserProgress"):
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_userprogress_delete_stats
+            AFTER DELETE ON UserProgress
+            BEGIN
+                DELETE FROM UserCourseStats
+                WHERE user_id = OLD.user_id
+                AND course_id = (SELECT course_id FROM Words WHERE id = OLD.word_id);
+            END
+        """)
+
+
+def _m005_idempotency_keys(conn: sqlite3.Connection):
+    """
+    Responses of completed write requests by Idempotency-Key (idempotency.py).
+    Stored in the same transaction as the write; rows expire after a TTL.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS IdempotencyKeys (
+            user_id INTEGER NOT NULL,
+            idempotency_key TEXT NOT NULL,
+            request_hash TEXT NOT NULL,
+            response TEXT NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, idempotency_key)
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_idempotencykeys_created ON IdempotencyKeys (created_at)")
+
+
+def _m006_step_version(conn: sqlite3.Connection):
+    """
+    UserCourseProgress.version for compare-and-swap step advances
+    (session_manager.advance_step): every write of current_step bumps it.
+    """
+    columns = _table_columns(conn, "UserCourseProgress")
+    if columns and "version" not in columns:
+        logger.info("Migrating: Adding version to UserCourseProgress")
+        conn.execute("ALTER TABLE UserCourseProgress ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+
+def _m007_translation_cache(conn: sqlite3.Connection):
+    """
+    en->tr translations of practice sentences by normalized text (translation_cache.py).
+    Rows don't expire: the sentence generator's output space is finite.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS TranslationCache (
+            source_key TEXT PRIMARY KEY,
+            source_text TEXT NOT NULL,
+            translation TEXT NOT NULL,
+            translator TEXT NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def _m008_learned_words_index(conn: sqlite3.Connection):
+    """
+    Partial covering index for the teacher dashboard's learned-words total
+    (COUNT(*) FROM UserProgress WHERE repetition_count > 0): a range read
+    of the index instead of a scan of every progress row.
+    """
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS ix_userprogress_learned
+        ON UserProgress (repetition_count)
+        WHERE repetition_count > 0
+    """)
+
+
+def _m009_unpracticed_progress_index(conn: sqlite3.Connection):
+    """
+    Progress rows never practiced (repetition_count NULL or 0), which
+    get_session_items still offers as NEW. The app doesn't write such rows,
+    so the index stays near empty.
+    """
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS ix_userprogress_unpracticed
+        ON UserProgress (user_id)
+        WHERE repetition_count IS NULL OR repetition_count = 0
+    """)
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "performance_indexes", _m001_performance_indexes),
+    (2, "course_content_versions", _m002_course_content_versions),
+    (3, "new_word_cursors", _m003_new_word_cursors),
+    (4, "user_course_stats", _m004_user_course_stats),
+    (5, "idempotency_keys", _m005_idempotency_keys),
+    (6, "step_version", _m006_step_version),
+    (7, "translation_cache", _m007_translation_cache),
+    (8, "learned_words_index", _m008_learned_words_index),
+    (9, "unpracticed_progress_index", _m009_unpracticed_progress_index),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def _current_version(conn: sqlite3.Connection) -> int:
+    """Highest applied version, or -1 if the database is not versioned yet."""
+    try:
+        row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    except sqlite3.OperationalError:
+        return -1
+    return row[0] if row and row[0] is not None else 0
+
+
+def run_migrations(db_path: str = DB_PATH) -> int:
+    """
+    Bring the database schema up to LATEST_VERSION.
+
+    Each migration runs in its own IMMEDIATE transaction together with its
+    schema_version row, so a crash never leaves a half-applied version and
+    concurrent workers starting at the same time apply it only once.
+
+    Returns:
+        Schema version after the run
+    """
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+
+    try:
+        version = _current_version(conn)
+        if version >= LATEST_VERSION:
+            return version  # Fast path: nothing to do
+
+        if version < 0:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if _current_version(conn) < 0:
+                    logger.info("Migrating: Creating schema_version (baseline)")
+                    _baseline(conn)
+                    conn.execute("""
+                        CREATE TABLE IF NOT EXISTS schema_version (
+                            version INTEGER PRIMARY KEY,
+                            name TEXT NOT NULL,
+                            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                        )
+                    """)
+                    conn.execute("INSERT INTO schema_version (version, name) VALUES (0, 'baseline')")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        for number, name, migrate in MIGRATIONS:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Re-check inside the write lock (another worker may have won)
+                if _current_version(conn) >= number:
+                    conn.execute("COMMIT")
+                    continue
+                logger.info(f"Migrating: {number:03d}_{name}")
+                migrate(conn)
+                conn.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)", (number, name))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        return _current_version(conn)
+
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(f"Schema version: {run_migrations()}")
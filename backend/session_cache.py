@@ -0,0 +1,84 @@
+"""
+Session Start Cache
+Short-lived, in-process copy of /session/start payloads per (user, course, step),
+so a retried start at the same step is answered without rebuilding the cards.
+
+An entry is only valid for the exact state it was built from: the key holds
+the user's current_step, max_open_unit_order, last_activity and the course
+content version, all read with one primary-key lookup. Any completion, step
+jump, unit unlock or content edit changes the key. Progress resets call
+forget_user(); other workers' copies expire after START_CACHE_TTL_SECONDS.
+"""
+
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+START_CACHE_TTL_SECONDS = 60
+START_CACHE_MAX_ENTRIES = 10000
+
+_entries: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def start_cache_key(
+    conn: sqlite3.Connection,
+    user_id: int,
+    course_id: int,
+    unit_id: Optional[int],
+    lookahead: int = 0
+) -> Optional[Tuple]:
+    """Cache key for the user's current session state (None: not cacheable yet)."""
+    try:
+        row = conn.execute("""
+            SELECT P.current_step, P.max_open_unit_order, P.last_activity,
+                   (SELECT file FROM pragma_database_list WHERE name = 'main'),
+                   (SELECT version FROM CourseContentVersions WHERE course_id = P.course_id)
+            FROM UserCourseProgress P
+            WHERE P.user_id = ? AND P.course_id = ?
+        """, (user_id, course_id)).fetchone()
+    except sqlite3.OperationalError:
+        return None  # Migration 002 not applied: content changes can't be detected
+    
+    if row is None:
+        return None  # First start: the progress row doesn't exist yet
+    current_step, max_open, last_activity, db_file, version = row
+    return (db_file, user_id, course_id, unit_id, lookahead, current_step, max_open, last_activity, version or 0)
+
+
+def get_cached_start(key: Optional[Tuple]) -> Optional[Dict[str, Any]]:
+    if key is None:
+        return None
+    entry = _entries.get(key)
+    if entry is None or entry[0] < time.monotonic():
+        return None
+    logger.debug(f"Session start served from cache: user {key[1]}, course {key[2]}, step {key[5]}")
+    return entry[1]
+
+
+def cache_start(key: Optional[Tuple], payload: Dict[str, Any]):
+    if key is None:
+        return
+    now = time.monotonic()
+    with _lock:
+        _entries[key] = (now + START_CACHE_TTL_SECONDS, payload)
+        _entries.move_to_end(key)
+        # Oldest first: drop expired entries and anything over the size limit
+        while _entries:
+            oldest_key, (expires, _) = next(iter(_entries.items()))
+            if expires >= now and len(_entries) <= START_CACHE_MAX_ENTRIES:
+                break
+            del _entries[oldest_key]
+
+
+def forget_user(user_id: int):
+    """Drop a user's cached payloads (after a progress reset)."""
+    with _lock:
+        for key in [key for key in _entries if key[1] == user_id]:
+            del _entries[key]
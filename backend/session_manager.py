@@ -5,7 +5,13 @@ Implements Fibonacci-based spaced repetition with step-based tracking
 
 import sqlite3
 import logging
-from typing import List, Dict, Any, Tuple, Optional
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Any, Tuple, Optional, Callable, Set
+
+from backend.connection_pool import get_pool
+from backend.curriculum import CourseCurriculum, WordInfo, get_curriculum
+from backend.course_stats import apply_progress_changes, daily_new_count
+from backend.write_queue import WriteQueue
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -54,27 +60,68 @@ def get_user_step(conn: sqlite3.Connection, user_id: int, course_id: int) -> int
     Returns:
         Current step number
     """
-    # 1. Get User Progress
+    return get_user_step_version(conn, user_id, course_id)[0]
+
+
+def _write(conn: sqlite3.Connection, writer: Optional[WriteQueue], write: Callable[[sqlite3.Connection], Any]) -> Any:
+    """A write of a read path: through the writer queue if given, else on conn (committed)."""
+    if writer is not None:
+        return writer.run(write)
+    result = write(conn)
+    conn.commit()
+    return result
+
+
+def get_user_step_version(
+    conn: sqlite3.Connection,
+    user_id: int,
+    course_id: int,
+    writer: Optional[WriteQueue] = None
+) -> Tuple[int, int]:
+    """
+    Current step together with its version, for a later advance_step
+    (compare-and-swap). Creates initial progress record if doesn't exist
+    (through writer if given, see get_session_content).
+    
+    Returns:
+        (current_step, version)
+    """
     row = conn.execute("""
-        SELECT current_step, max_open_unit_order 
+        SELECT current_step, version
         FROM UserCourseProgress 
         WHERE user_id = ? AND course_id = ?
     """, (user_id, course_id)).fetchone()
     
     if not row:
-        # Auto-initialize progress for this course if missing
-        conn.execute("""
-            INSERT INTO UserCourseProgress (user_id, course_id, current_step, max_open_unit_order)
+        # Auto-initialize progress for this course if missing (committed immediately)
+        _write(conn, writer, lambda write_conn: write_conn.execute("""
+            INSERT OR IGNORE INTO UserCourseProgress (user_id, course_id, current_step, max_open_unit_order)
             VALUES (?, ?, 1, 1)
-        """, (user_id, course_id))
-        conn.commit() # Commit the insert immediately
-        current_step = 1
-        max_open_unit = 1 # This variable is not returned, but is part of the new logic
-    else:
-        current_step = row[0]
-        max_open_unit = row[1] # This variable is not returned, but is part of the new logic
+        """, (user_id, course_id)).rowcount)
+        return 1, 0
+    
+    return row[0], row[1]
+
+
+STEP_CAS_ATTEMPTS = 3  # Retries after losing a current_step race to a non-overlapping write
+
+
+def advance_step(conn: sqlite3.Connection, user_id: int, course_id: int, version: int, new_step: int) -> bool:
+    """
+    Compare-and-swap write of current_step (optimistic concurrency).
     
-    return current_step
+    Only succeeds if nobody wrote the step since `version` was read with
+    get_user_step_version; bumps the version. On False the caller rolls back
+    its transaction and re-reads the state.
+    """
+    cursor = conn.execute("""
+        UPDATE UserCourseProgress
+        SET current_step = ?,
+            version = version + 1,
+            last_activity = CURRENT_TIMESTAMP
+        WHERE user_id = ? AND course_id = ? AND version = ?
+    """, (new_step, user_id, course_id, version))
+    return cursor.rowcount > 0
 
 
 def update_word_progress(conn: sqlite3.Connection, user_id: int, word_id: int, current_step: int):
@@ -130,44 +177,386 @@ def update_word_progress(conn: sqlite3.Connection, user_id: int, word_id: int, c
         """, (user_id, word_id, next_review))
 
 
-def get_session_content(
-    user_id: int, 
-    course_id: int, 
-    db: sqlite3.Connection, 
-    skip_count: int = 0,
+def update_words_progress(
+    conn: sqlite3.Connection,
+    user_id: int,
+    word_ids: List[int],
+    current_step: int
+) -> List[Tuple[int, Optional[int], int]]:
+    """
+    Set-based version of update_word_progress for a whole session.
+
+    One SELECT loads (repetition_count, next_review_step) for every submitted word,
+    the Fibonacci gaps are computed in memory and the result is written back with
+    a single executemany UPSERT on the (user_id, word_id) unique index.
+
+    IDEMPOTENCY: Same rule as update_word_progress. Words already scheduled beyond
+    current_step are skipped, and a word repeated inside the same submission is
+    only counted once.
+
+    Args:
+        conn: Database connection (in transaction)
+        user_id: User ID
+        word_ids: Word IDs completed in this step
+        current_step: Current step number (from UserCourseProgress)
+
+    Returns:
+        (word_id, old repetition_count, new repetition_count) for every word written;
+        old is None for a first encounter
+    """
+    # Preserve submission order, drop in-request duplicates
+    unique_ids = list(dict.fromkeys(word_ids))
+    if not unique_ids:
+        return []
+
+    placeholders = ",".join("?" * len(unique_ids))
+    cursor = conn.execute(f"""
+        SELECT word_id, repetition_count, next_review_step
+        FROM UserProgress
+        WHERE user_id = ? AND word_id IN ({placeholders})
+    """, (user_id, *unique_ids))
+    existing = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+
+    rows = []
+    changes = []
+    new_count = 0
+    for word_id in unique_ids:
+        if word_id in existing:
+            old_rep_count, old_next_review = existing[word_id]
+
+            # IDEMPOTENCY: If this word was already scheduled BEYOND current step, ignore
+            if old_next_review > current_step:
+                logger.warning(f"Duplicate submission: Word {word_id} already scheduled for step {old_next_review}")
+                continue
+
+            new_rep_count = old_rep_count + 1
+            rows.append((user_id, word_id, new_rep_count, current_step + fibonacci(new_rep_count)))
+            changes.append((word_id, old_rep_count, new_rep_count))
+        else:
+            # First encounter: rep_count=1, next review at +1 step
+            rows.append((user_id, word_id, 1, current_step + 1))
+            changes.append((word_id, None, 1))
+            new_count += 1
+
+    if rows:
+        # first_learned_at is only set on INSERT, never overwritten
+        conn.executemany("""
+            INSERT INTO UserProgress (user_id, word_id, repetition_count, next_review_step, last_updated, first_learned_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, date('now'))
+            ON CONFLICT(user_id, word_id) DO UPDATE SET
+                repetition_count = excluded.repetition_count,
+                next_review_step = excluded.next_review_step,
+                last_updated = excluded.last_updated
+        """, rows)
+
+    logger.debug(f"Batch progress: {len(rows) - new_count} updated, {new_count} new, {len(unique_ids) - len(rows)} skipped")
+    return changes
+
+
+def next_new_word_step(step: int) -> int:
+    """
+    Smallest new-word step (1-4-7-10 rule) that is >= step.
+    
+        next_new_word_step(1) = 1
+        next_new_word_step(2) = 4
+        next_new_word_step(5) = 7
+    """
+    step = max(step, 1)
+    return step + (1 - step) % 3
+
+
+# ==========================================
+# NEW WORD CURSORS
+# ==========================================
+
+COURSE_CURSOR = 0  # UserNewWordCursors.unit_id of the course-wide cursor
+NEW_WORD_SCAN_CHUNK = 32  # Candidates checked per UserProgress lookup
+
+
+def _cursor_span(curriculum: CourseCurriculum, unit_key: int) -> Optional[Tuple[Any, Any, int, int]]:
+    """(word_ids, order_numbers, lo, hi) the cursor walks over, or None for an unknown unit."""
+    if unit_key == COURSE_CURSOR:
+        return curriculum.course_word_ids, curriculum.course_orders, 0, len(curriculum.course_word_ids)
+    unit = curriculum.unit(unit_key)
+    if unit is None:
+        return None
+    return curriculum.word_ids, curriculum.order_numbers, unit.start, unit.end
+
+
+def _first_unseen(
+    db: sqlite3.Connection,
+    user_id: int,
+    word_ids,
+    lo: int,
+    hi: int,
+    accept: Optional[Callable[[int], bool]] = None
+) -> Optional[int]:
+    """Index of the first word in word_ids[lo:hi] the user has no progress row for."""
+    while lo < hi:
+        chunk = word_ids[lo:min(lo + NEW_WORD_SCAN_CHUNK, hi)]
+        placeholders = ",".join("?" * len(chunk))
+        seen = {row[0] for row in db.execute(f"""
+            SELECT word_id FROM UserProgress
+            WHERE user_id = ? AND word_id IN ({placeholders})
+        """, (user_id, *chunk))}
+        
+        for offset, word_id in enumerate(chunk):
+            if word_id not in seen and (accept is None or accept(lo + offset)):
+                return lo + offset
+        lo += len(chunk)
+    return None
+
+
+def _low_water_order(db: sqlite3.Connection, user_id: int, course_id: int, unit_key: int) -> Optional[int]:
+    """Smallest unseen order_number, straight from the tables (cursor rebuild)."""
+    query = """
+        SELECT MIN(W.order_number)
+        FROM Words W
+        WHERE W.course_id = ?
+        AND W.id NOT IN (
+            SELECT word_id FROM UserProgress WHERE user_id = ?
+        )
+    """
+    params = [course_id, user_id]
+    
+    if unit_key != COURSE_CURSOR:
+        query += " AND W.unit_id = ?"
+        params.append(unit_key)
+    
+    return db.execute(query, params).fetchone()[0]
+
+
+def _read_cursor(
+    db: sqlite3.Connection,
+    user_id: int,
+    course_id: int,
+    unit_key: int,
+    curriculum: CourseCurriculum
+) -> Tuple[bool, Optional[int]]:
+    """
+    Stored cursor, if it was written against the current course content.
+    
+    Returns:
+        (found, next_order) - next_order None means every word is seen
+    """
+    row = db.execute("""
+        SELECT next_order, content_version
+        FROM UserNewWordCursors
+        WHERE user_id = ? AND course_id = ? AND unit_id = ?
+    """, (user_id, course_id, unit_key)).fetchone()
+    
+    if row and row[1] == curriculum.version:
+        return True, row[0]
+    return False, None
+
+
+def find_next_new_word(
+    db: sqlite3.Connection,
+    user_id: int,
+    course_id: int,
+    curriculum: CourseCurriculum,
+    unit_id: Optional[int] = None,
+    max_order: Optional[int] = None,
+    max_unit_order: Optional[int] = None,
+    exclude: Optional[Set[int]] = None
+) -> Optional[WordInfo]:
+    """
+    First unseen word (by order_number) of a unit or of the whole course.
+    
+    Starts at the user's cursor - every word below it is already seen - so the
+    cost no longer grows with the user's history: one cursor lookup plus one
+    indexed UserProgress probe for the next few candidates.
+    
+    Args:
+        unit_id: Manual unit mode (words of that unit only)
+        max_order: Only words with order_number <= max_order (step limit)
+        max_unit_order: Only words in units up to this order (lock limit)
+        exclude: Word IDs to treat as seen (words introduced by a lookahead plan)
+    
+    Returns:
+        WordInfo of the word, or None
+    """
+    unit_key = unit_id or COURSE_CURSOR
+    span = _cursor_span(curriculum, unit_key)
+    if span is None:
+        return None
+    word_ids, orders, lo, hi = span
+    
+    found, start = _read_cursor(db, user_id, course_id, unit_key, curriculum)
+    if not found:
+        start = _low_water_order(db, user_id, course_id, unit_key)
+    if start is None:
+        return None  # Everything seen
+    
+    lo = bisect_left(orders, start, lo, hi)
+    if max_order is not None:
+        hi = bisect_right(orders, max_order, lo, hi)
+    
+    checks = []
+    if max_unit_order is not None:
+        unit_orders = curriculum.course_unit_orders
+        checks.append(lambda i: 0 <= unit_orders[i] <= max_unit_order)
+    if exclude:
+        checks.append(lambda i: word_ids[i] not in exclude)
+    accept = (lambda i: all(check(i) for check in checks)) if checks else None
+    
+    index = _first_unseen(db, user_id, word_ids, lo, hi, accept)
+    return curriculum.word(word_ids[index]) if index is not None else None
+
+
+def advance_new_word_cursors(conn: sqlite3.Connection, user_id: int, course_id: int, word_ids: List[int]):
+    """
+    Move the course cursor and the cursors of the touched units past words
+    that are now seen. Call after update_words_progress, in the same transaction.
+    
+    A cursor only moves when the word it points at was just completed,
+    so a typical review-only session costs a single SELECT here.
+    """
+    curriculum = get_curriculum(conn, course_id)
+    words = [word for word in map(curriculum.word, word_ids) if word is not None]
+    if not words:
+        return
+    
+    stored = {
+        row[0]: (row[1], row[2])
+        for row in conn.execute("""
+            SELECT unit_id, next_order, content_version
+            FROM UserNewWordCursors
+            WHERE user_id = ? AND course_id = ?
+        """, (user_id, course_id))
+    }
+    
+    touched = {COURSE_CURSOR: {word.order_number for word in words}}
+    for word in words:
+        if curriculum.unit(word.unit_id):
+            touched.setdefault(word.unit_id, set()).add(word.order_number)
+    
+    rows = []
+    for unit_key, completed_orders in touched.items():
+        next_order, version = stored.get(unit_key, (None, None))
+        
+        if version == curriculum.version:
+            if next_order not in completed_orders:
+                continue  # Word under the cursor is still unseen (or nothing left)
+            span_ids, orders, lo, hi = _cursor_span(curriculum, unit_key)
+            index = _first_unseen(conn, user_id, span_ids, bisect_left(orders, next_order, lo, hi), hi)
+            next_order = orders[index] if index is not None else None
+        else:
+            # Missing or written against older content: rebuild
+            next_order = _low_water_order(conn, user_id, course_id, unit_key)
+        
+        rows.append((user_id, course_id, unit_key, next_order, curriculum.version))
+    
+    if rows:
+        conn.executemany("""
+            INSERT INTO UserNewWordCursors (user_id, course_id, unit_id, next_order, content_version)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(user_id, course_id, unit_id) DO UPDATE SET
+                next_order = excluded.next_order,
+                content_version = excluded.content_version
+        """, rows)
+
+
+def find_next_content_step(
+    db: sqlite3.Connection,
+    user_id: int,
+    course_id: int,
+    current_step: int,
     unit_id: Optional[int] = None
-) -> Dict[str, Any]:
+) -> Optional[int]:
     """
-    Get cards for current step using 1-4-7-10 rule and Fibonacci reviews.
+    Find the first step AFTER current_step that has at least one card.
     
-    CORE ALGORITHM:
-    - New word on steps: 1, 4, 7, 10, 13... (when (step-1) % 3 == 0)
-    - Review words: where next_review_step == current_step
-    - Empty steps: Auto-increment and recurse
+    Replaces the old "increment and recurse" loop with a direct computation:
+    the answer is the smaller of
+    - the next new-word step (1-4-7-10 rule) on which an unseen word is unlocked
+      (continuous mode only: Words.order_number <= step, unit inside max_open)
+    - MIN(next_review_step) above current_step for this course (and unit)
+    
+    In manual unit mode every step offers a new word, so an empty step means the
+    unit has no unseen words left and only reviews can fill a later step.
     
     Args:
+        db: Database connection
         user_id: User ID
         course_id: Course ID
-        db: Database connection
-        skip_count: Recursion depth (avalanche guard)
-        unit_id: Optional unit ID to filter content
+        current_step: The (empty) step the user is on
+        unit_id: Optional unit ID (manual unit selection mode)
     
     Returns:
-        {
-            'current_step': int,
-            'items': List[{...card data...}],
-            'message': str (optional, if no cards found)
-        }
+        Next non-empty step, or None if the user has nothing left to study
     """
-    try:
-        current_step = get_user_step(db, user_id, course_id)
-    except Exception as e:
-        logger.error(f"Error getting user step: {e}")
-        current_step = 1
+    candidates = []
+    
+    # Candidate A: Next review (Fibonacci-scheduled)
+    review_query = """
+        SELECT MIN(P.next_review_step)
+        FROM UserProgress P
+        JOIN Words W ON P.word_id = W.id
+        WHERE P.user_id = ?
+        AND P.next_review_step > ?
+        AND W.course_id = ?
+    """
+    review_params = [user_id, current_step, course_id]
+    
+    if unit_id:
+        review_query += " AND W.unit_id = ?"
+        review_params.append(unit_id)
+    
+    row = db.execute(review_query, review_params).fetchone()
+    if row and row[0] is not None:
+        candidates.append(row[0])
+    
+    # Candidate B: Next new word (continuous curriculum mode only)
+    if not unit_id:
+        row = db.execute("""
+            SELECT COALESCE(MAX(max_open_unit_order), 1)
+            FROM UserCourseProgress
+            WHERE user_id = ? AND course_id = ?
+        """, (user_id, course_id)).fetchone()
+        
+        word = find_next_new_word(
+            db, user_id, course_id, get_curriculum(db, course_id), max_unit_order=row[0]
+        )
+        if word is not None:
+            # A word with order_number N is first offered on a new-word step >= N
+            candidates.append(next_new_word_step(max(current_step + 1, word.order_number)))
+    
+    return min(candidates) if candidates else None
+
+
+def _card(user_id: int, course_id: int, word: WordInfo, card_type: str, repetition_count: int) -> Dict[str, Any]:
+    """Study card of a word (same shape for the current step and planned steps)."""
+    return {
+        "type": card_type,
+        "word_id": word.word_id,
+        "english": word.english,
+        "turkish": word.turkish,
+        "image_url": word.image_url,
+        "audio_en_url": word.audio_en_url,
+        "audio_tr_url": word.audio_tr_url,
+        "order_number": word.order_number,
+        "repetition_count": repetition_count,
+        "unit_id": word.unit_id,
+        "logical_address": f"{user_id}.{course_id}.{word.unit_id}.{word.order_number}"
+    }
+
+
+def _collect_step_items(
+    db: sqlite3.Connection,
+    user_id: int,
+    course_id: int,
+    current_step: int,
+    unit_id: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    Build the card list for a single step (no step changes).
     
+    Returns:
+        (study_list, active_unit_id)
+    """
     study_list = []
-    unit_filter_msg = f", Unit {unit_id}" if unit_id else ""
-    logger.info(f"User {user_id}, Course {course_id}, Step {current_step}, Skip {skip_count}{unit_filter_msg}")
+    curriculum = get_curriculum(db, course_id)
     
     # RULE 1: New Word Check (1-4-7-10 pattern)
     is_new_word_step = (current_step - 1) % 3 == 0
@@ -184,18 +573,7 @@ def get_session_content(
 
         if unit_id:
             # --- MANUAL UNIT SELECTION MODE ---
-            query = """
-                SELECT W.id, W.english, W.turkish, W.image_url, W.audio_en_url, W.audio_tr_url, W.order_number, W.unit_id
-                FROM Words W
-                WHERE W.course_id = ?
-                AND W.unit_id = ?
-                AND W.id NOT IN (
-                    SELECT word_id FROM UserProgress WHERE user_id = ?
-                )
-                ORDER BY W.order_number
-                LIMIT 1
-            """
-            params = (course_id, unit_id, user_id)
+            new_word = find_next_new_word(db, user_id, course_id, curriculum, unit_id=unit_id)
         else:
             # --- CONTINUOUS CURRICULUM MODE ---
             # Get max_open_unit_order for this user
@@ -206,125 +584,396 @@ def get_session_content(
             """, (user_id, course_id))
             
             row = cursor.fetchone()
-            max_open = row[0] if row else 1
+            max_open = row[0] if row and row[0] is not None else 1
             
-            query = """
-                SELECT W.id, W.english, W.turkish, W.image_url, W.audio_en_url, W.audio_tr_url, W.order_number, W.unit_id
-                FROM Words W
-                JOIN Units u ON W.unit_id = u.id
-                WHERE W.course_id = ?
-                  AND W.order_number <= ?
-                  AND u.order_number <= ?
-                  AND W.id NOT IN (
-                      SELECT word_id FROM UserProgress WHERE user_id = ?
-                  )
-                ORDER BY W.order_number
-                LIMIT 1
-            """
-            params = (course_id, current_step, max_open, user_id)
-        
-        cursor = db.execute(query, params)
-        new_word = cursor.fetchone()
+            new_word = find_next_new_word(
+                db, user_id, course_id, curriculum,
+                max_order=current_step, max_unit_order=max_open
+            )
         
         if new_word:
-            study_list.append({
-                "type": "NEW",
-                "word_id": new_word['id'],
-                "english": new_word['english'],
-                "turkish": new_word['turkish'],
-                "image_url": new_word['image_url'],
-                "audio_en_url": new_word['audio_en_url'],
-                "audio_tr_url": new_word['audio_tr_url'],
-                "order_number": new_word['order_number'],
-                "repetition_count": 0,
-                "unit_id": new_word['unit_id'],
-                "logical_address": f"{user_id}.{course_id}.{new_word['unit_id']}.{new_word['order_number']}"
-            })
+            study_list.append(_card(user_id, course_id, new_word, "NEW", 0))
             # CAPTURE THE UNIT ID OF THE NEW WORD
             if unit_id is None:
-                unit_id = new_word['unit_id']
+                unit_id = new_word.unit_id
 
-            logger.debug(f"NEW word: {new_word['english']} (Unit {unit_id})")
+            logger.debug(f"NEW word: {new_word.english} (Unit {unit_id})")
         else:
             logger.debug("No more new words available")
     
     # RULE 2: Review Words (Fibonacci-scheduled)
-    # Modified to include Unid ID filter
-    base_review_query = """
-        SELECT P.word_id, P.repetition_count, 
-               W.english, W.turkish, W.image_url, W.audio_en_url, W.audio_tr_url, W.order_number, W.unit_id
-        FROM UserProgress P
-        JOIN Words W ON P.word_id = W.id
-        WHERE P.user_id = ?
-        AND P.next_review_step = ?
-        AND W.course_id = ?
-    """
-    review_params = [user_id, current_step, course_id]
+    # Due rows come from the (user_id, next_review_step) index alone; course/unit
+    # filtering and the card text/media come from the shared curriculum map.
+    review_unit_id = unit_id
     
-    if unit_id:
-        base_review_query += " AND W.unit_id = ?"
-        review_params.append(unit_id)
+    cursor = db.execute("""
+        SELECT word_id, repetition_count
+        FROM UserProgress
+        WHERE user_id = ?
+        AND next_review_step = ?
+    """, (user_id, current_step))
+    
+    for word_id, repetition_count in cursor.fetchall():
+        word = curriculum.word(word_id)
+        if word is None or (review_unit_id and word.unit_id != review_unit_id):
+            continue  # Other course / other unit
         
-    cursor = db.execute(base_review_query, review_params)
-    
-    reviews = cursor.fetchall()
-    
-    for row in reviews:
-        study_list.append({
-            "type": "REVIEW",
-            "word_id": row['word_id'],
-            "english": row['english'],
-            "turkish": row['turkish'],
-            "image_url": row['image_url'],
-            "audio_en_url": row['audio_en_url'],
-            "audio_tr_url": row['audio_tr_url'],
-            "order_number": row['order_number'],
-            "order_number": row['order_number'],
-            "repetition_count": row['repetition_count'],
-            "unit_id": row['unit_id'],
-            "logical_address": f"{user_id}.{course_id}.{row['unit_id']}.{row['order_number']}"
-        })
+        study_list.append(_card(user_id, course_id, word, "REVIEW", repetition_count))
         
         # Fallback: If we assume "Active Unit" is the unit of the words we are studying...
         if unit_id is None:
-            unit_id = row['unit_id']
+            unit_id = word.unit_id
             
-        logger.debug(f"REVIEW word: {row['english']} (rep: {row['repetition_count']})")
+        logger.debug(f"REVIEW word: {word.english} (rep: {repetition_count})")
     
-    # RULE 3: Empty Step Handling
-    if study_list:
-        return {
-            "current_step": current_step,
-            "items": study_list,
-            "active_unit_id": unit_id
+    return study_list, unit_id
+
+
+def get_session_content(
+    user_id: int, 
+    course_id: int, 
+    db: sqlite3.Connection, 
+    skip_count: int = 0,
+    unit_id: Optional[int] = None,
+    writer: Optional[WriteQueue] = None
+) -> Dict[str, Any]:
+    """
+    Get cards for current step using 1-4-7-10 rule and Fibonacci reviews.
+    
+    CORE ALGORITHM:
+    - New word on steps: 1, 4, 7, 10, 13... (when (step-1) % 3 == 0)
+    - Review words: where next_review_step == current_step
+    - Empty steps: Jump straight to the next non-empty step (single UPDATE)
+    
+    Args:
+        user_id: User ID
+        course_id: Course ID
+        db: Database connection
+        skip_count: Re-read attempts after a lost step race (callers pass 0)
+        unit_id: Optional unit ID to filter content
+        writer: Write queue for the progress-row insert and the step jump
+                (endpoints); without it they are committed on db (scripts)
+    
+    Returns:
+        {
+            'current_step': int,
+            'items': List[{...card data...}],
+            'message': str (optional, if no cards found)
         }
-    else:
-        # Recursion guard
-        if skip_count > 200:
-            logger.warning(f"Recursion limit reached at step {current_step}")
+    
+    Raises:
+        sqlite3.Error: the stored step could not be read
+    """
+    try:
+        current_step, version = get_user_step_version(db, user_id, course_id, writer)
+    except Exception as e:
+        # No guessed step: without the stored step and its version nothing here can be right
+        logger.error(f"Error getting user step: {e}")
+        raise
+    
+    unit_filter_msg = f", Unit {unit_id}" if unit_id else ""
+    logger.info(f"User {user_id}, Course {course_id}, Step {current_step}{unit_filter_msg}")
+    
+    study_list, active_unit_id = _collect_step_items(db, user_id, course_id, current_step, unit_id)
+    
+    # RULE 3: Empty Step Handling
+    if not study_list:
+        next_step = find_next_content_step(db, user_id, course_id, current_step, unit_id)
+        
+        if next_step is None:
+            logger.info(f"Step {current_step} is empty and nothing is scheduled after it")
             return {
                 "current_step": current_step,
                 "items": [],
-                "message": "No cards found after 200 steps",
+                "message": "No cards found",
                 "active_unit_id": unit_id
             }
         
-        logger.info(f"Step {current_step} is empty, incrementing...")
+        logger.info(f"Step {current_step} is empty, jumping to step {next_step}")
         
-        # Increment step and try again
-        db.execute("""
-            UPDATE UserCourseProgress
-            SET current_step = current_step + 1,
-            last_activity = CURRENT_TIMESTAMP
+        # Single write instead of one UPDATE + commit per skipped step (compare-and-swap)
+        jumped = _write(db, writer, lambda write_conn: advance_step(write_conn, user_id, course_id, version, next_step))
+        if not jumped:
+            if skip_count < STEP_CAS_ATTEMPTS:
+                # A completion moved the step meanwhile: start over from the new state
+                logger.info(f"Step moved while jumping from {current_step}, re-reading")
+                return get_session_content(user_id, course_id, db, skip_count + 1, unit_id, writer)
+            # Still losing the race: serve the step that is stored, never one that wasn't saved
+            current_step = get_user_step(db, user_id, course_id)
+            logger.warning(f"Step jump to {next_step} lost {STEP_CAS_ATTEMPTS + 1} races, serving stored step {current_step}")
+        else:
+            current_step = next_step
+        
+        study_list, active_unit_id = _collect_step_items(db, user_id, course_id, current_step, unit_id)
+    
+    return {
+        "current_step": current_step,
+        "items": study_list,
+        "active_unit_id": active_unit_id
+    }
+
+
+# ==========================================
+# LOOKAHEAD PLANNING
+# ==========================================
+
+PLAN_REVIEW_WINDOW = 64  # Steps of review schedule read per UserProgress range query
+
+
+class _PlannedSchedule:
+    """
+    Review schedule of one user in one course: UserProgress rows read in step
+    windows, overlaid with the completions simulated by plan_session_steps.
+    """
+
+    def __init__(self, db: sqlite3.Connection, user_id: int, course_id: int,
+                 curriculum: CourseCurriculum, after_step: int):
+        self.db = db
+        self.user_id = user_id
+        self.course_id = course_id
+        self.curriculum = curriculum
+        self.loaded_until = after_step  # Every row with next_review_step <= this is in self.due
+        self.due: Dict[int, List[Tuple[int, int, int]]] = {}  # step -> [(rowid, word_id, repetition_count)]
+        self.next_rowid = 1 << 62  # Planned first encounters sort after every stored row, like real INSERTs
+
+    def _load(self, until: int):
+        if until <= self.loaded_until:
+            return
+        cursor = self.db.execute("""
+            SELECT rowid, word_id, repetition_count, next_review_step
+            FROM UserProgress
+            WHERE user_id = ?
+            AND next_review_step > ?
+            AND next_review_step <= ?
+        """, (self.user_id, self.loaded_until, until))
+        for rowid, word_id, repetition_count, step in cursor.fetchall():
+            if self.curriculum.word(word_id) is not None:
+                self.due.setdefault(step, []).append((rowid, word_id, repetition_count))
+        self.loaded_until = until
+
+    def due_at(self, step: int) -> List[Tuple[int, int, int]]:
+        """
+        Reviews due at step, in the order the due-review query returns them
+        (index order: rowid). They are removed: either completed and
+        rescheduled, or left behind for good.
+        """
+        if step > self.loaded_until:
+            self._load(step + PLAN_REVIEW_WINDOW)
+        return sorted(self.due.pop(step, []))
+
+    def reschedule(self, rowid: Optional[int], word_id: int, repetition_count: int, step: int):
+        if rowid is None:
+            rowid = self.next_rowid
+            self.next_rowid += 1
+        self.due.setdefault(step, []).append((rowid, word_id, repetition_count))
+
+    def next_review_after(self, step: int, unit_id: Optional[int] = None) -> Optional[int]:
+        """Same answer as find_next_content_step's review candidate, on the simulated schedule."""
+        def matches(entries):
+            return any(not unit_id or self.curriculum.word(word_id).unit_id == unit_id for _, word_id, _ in entries)
+
+        in_memory = min((s for s, entries in self.due.items() if s > step and matches(entries)), default=None)
+        if in_memory is not None and in_memory <= self.loaded_until:
+            return in_memory
+
+        # Nothing due inside the loaded window: first stored review past it
+        query = """
+            SELECT MIN(P.next_review_step)
+            FROM UserProgress P
+            JOIN Words W ON P.word_id = W.id
+            WHERE P.user_id = ?
+            AND P.next_review_step > ?
+            AND W.course_id = ?
+        """
+        params = [self.user_id, max(step, self.loaded_until), self.course_id]
+        if unit_id:
+            query += " AND W.unit_id = ?"
+            params.append(unit_id)
+        stored = self.db.execute(query, params).fetchone()[0]
+
+        candidates = [s for s in (in_memory, stored) if s is not None]
+        return min(candidates) if candidates else None
+
+
+def plan_session_steps(
+    db: sqlite3.Connection,
+    user_id: int,
+    course_id: int,
+    current_step: int,
+    items: List[Dict[str, Any]],
+    lookahead: int,
+    unit_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Cards of the next `lookahead` steps after current_step, assuming every card
+    of every step is completed (what complete_session would do with them).
+    
+    Nothing is written. The Fibonacci schedule is advanced in memory on top of
+    UserProgress range reads, new words come from the user's cursor with the
+    planned ones excluded, and empty steps are jumped like get_session_content
+    does. max_open_unit_order is fixed for the plan (units unlock from the
+    units screen, not from sessions).
+    
+    Args:
+        current_step: Step the items belong to (from get_session_content)
+        items: Cards of current_step
+        lookahead: Number of following steps to plan
+        unit_id: Optional unit ID (manual unit selection mode)
+    
+    Returns:
+        [{'current_step': int, 'items': [...], 'active_unit_id': int}, ...]
+        Shorter than lookahead if the user runs out of cards.
+    """
+    curriculum = get_curriculum(db, course_id)
+    schedule = _PlannedSchedule(db, user_id, course_id, curriculum, current_step)
+    introduced: Set[int] = set()
+    rowids: Dict[int, int] = {}  # Review cards of the step being completed -> their UserProgress rowid
+    
+    max_open = None
+    if not unit_id:
+        row = db.execute("""
+            SELECT max_open_unit_order
+            FROM UserCourseProgress
             WHERE user_id = ? AND course_id = ?
-        """, (user_id, course_id))
-        db.commit()
+        """, (user_id, course_id)).fetchone()
+        max_open = row[0] if row and row[0] is not None else 1
+    
+    def collect(step: int) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        # Same rules as _collect_step_items
+        new_word = None
+        if unit_id:
+            new_word = find_next_new_word(db, user_id, course_id, curriculum, unit_id=unit_id, exclude=introduced)
+        elif (step - 1) % 3 == 0:
+            new_word = find_next_new_word(
+                db, user_id, course_id, curriculum,
+                max_order=step, max_unit_order=max_open, exclude=introduced
+            )
+        
+        cards = []
+        active_unit_id = unit_id
+        if new_word:
+            cards.append(_card(user_id, course_id, new_word, "NEW", 0))
+            if active_unit_id is None:
+                active_unit_id = new_word.unit_id
+        
+        review_unit_id = active_unit_id
+        for rowid, word_id, repetition_count in schedule.due_at(step):
+            word = curriculum.word(word_id)
+            if review_unit_id and word.unit_id != review_unit_id:
+                continue
+            cards.append(_card(user_id, course_id, word, "REVIEW", repetition_count))
+            rowids[word_id] = rowid
+            if active_unit_id is None:
+                active_unit_id = word.unit_id
+        return cards, active_unit_id
+    
+    def next_content_step(step: int) -> Optional[int]:
+        # Same rules as find_next_content_step
+        candidates = []
+        review_step = schedule.next_review_after(step, unit_id)
+        if review_step is not None:
+            candidates.append(review_step)
+        if not unit_id:
+            word = find_next_new_word(
+                db, user_id, course_id, curriculum, max_unit_order=max_open, exclude=introduced
+            )
+            if word is not None:
+                candidates.append(next_new_word_step(max(step + 1, word.order_number)))
+        return min(candidates) if candidates else None
+    
+    # Stored rows behind the current step's reviews (planned reviews keep their rowid)
+    rowids.update(
+        (word_id, rowid) for rowid, word_id in db.execute("""
+            SELECT rowid, word_id
+            FROM UserProgress
+            WHERE user_id = ?
+            AND next_review_step = ?
+        """, (user_id, current_step))
+    )
+    
+    plan = []
+    step, cards = current_step, items
+    while cards and len(plan) < lookahead:
+        # Simulated complete_session: same arithmetic as update_words_progress
+        for card in cards:
+            word_id = card["word_id"]
+            if card["type"] == "NEW":
+                introduced.add(word_id)
+                schedule.reschedule(None, word_id, 1, step + 1)
+            else:
+                repetition_count = card["repetition_count"] + 1
+                schedule.reschedule(rowids.get(word_id), word_id, repetition_count, step + fibonacci(repetition_count))
+        rowids.clear()
+        step += 1
+        
+        cards, active_unit_id = collect(step)
+        if not cards:
+            next_step = next_content_step(step)
+            if next_step is None:
+                break
+            step = next_step
+            cards, active_unit_id = collect(step)
         
-        # Pass unit_id to recursion
-        return get_session_content(user_id, course_id, db, skip_count + 1, unit_id=unit_id)
+        if cards:
+            plan.append({
+                "current_step": step,
+                "items": cards,
+                "active_unit_id": active_unit_id
+            })
+    
+    logger.debug(f"Lookahead plan: user {user_id}, course {course_id}, {len(plan)}/{lookahead} steps after {current_step}")
+    return plan
+
+
+def _complete_step_words(
+    conn: sqlite3.Connection,
+    user_id: int,
+    course_id: int,
+    step: int,
+    word_ids: List[int]
+):
+    """Progress writes of one completed step: Fibonacci update, new-word cursors, course counters."""
+    changes = update_words_progress(conn, user_id, word_ids, step)
+    advance_new_word_cursors(conn, user_id, course_id, word_ids)
+    apply_progress_changes(conn, user_id, course_id, changes)
+    return changes
+
+
+def _progress_moved(
+    conn: sqlite3.Connection,
+    user_id: int,
+    word_ids: List[int],
+    changes: List[Tuple[int, Optional[int], int]]
+) -> bool:
+    """
+    After a lost step race (and rollback): did the winning write touch any of
+    our words? Then it was the same submission (double tap, second tab) and
+    replaying ours at the next step would count those words twice.
+    """
+    if len(changes) < len(set(word_ids)):
+        return True  # Some words were already scheduled past the step we read: the winner completed them
+    if not changes:
+        return False
+    word_ids = [word_id for word_id, _, _ in changes]
+    placeholders = ",".join("?" * len(word_ids))
+    current = {
+        row[0]: row[1]
+        for row in conn.execute(f"""
+            SELECT word_id, repetition_count
+            FROM UserProgress
+            WHERE user_id = ? AND word_id IN ({placeholders})
+        """, (user_id, *word_ids))
+    }
+    return any(current.get(word_id) != old_rep for word_id, old_rep, _ in changes)
 
 
-def complete_session(user_id: int, course_id: int, completed_word_ids: List[int], db_path: str = 'englishbus.db') -> Dict[str, Any]:
+def complete_session(
+    user_id: int,
+    course_id: int,
+    completed_word_ids: List[int],
+    db_path: str = 'englishbus.db',
+    conn: Optional[sqlite3.Connection] = None
+) -> Dict[str, Any]:
     """
     Atomically update user progress after completing a study session.
     
@@ -335,48 +984,68 @@ def complete_session(user_id: int, course_id: int, completed_word_ids: List[int]
         user_id: User ID
         course_id: Course ID
         completed_word_ids: List of word IDs completed in this session
-        db_path: Path to SQLite database
+        db_path: Path to SQLite database (connection comes from its pool)
+        conn: Existing connection to run on instead (e.g. the request's).
+              The transaction is then left open on success: the caller
+              commits, so it can read/write more in the same transaction.
+    
+    CONCURRENCY: current_step is advanced with a compare-and-swap on
+    UserCourseProgress.version. If another request moved the step in between,
+    everything is rolled back; a request that touched none of our words is
+    merged (we replay on the new step), one that completed the same words is
+    reported as a conflict.
     
     Returns:
         {
-            'status': 'success' | 'error',
+            'status': 'success' | 'conflict' | 'error',
             'new_step': int (if success),
             'words_updated': int (if success),
-            'error': str (if error)
+            'current_step': int (if conflict),
+            'error': str (if conflict / error)
         }
     """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+    owns_connection = conn is None
+    if owns_connection:
+        pool = get_pool(db_path)
+        conn = pool.acquire()
     
     try:
-        # Start transaction
-        current_step = get_user_step(conn, user_id, course_id)
-        
-        # Update each word
-        for word_id in completed_word_ids:
-            update_word_progress(conn, user_id, word_id, current_step)
-        
-        # Increment user's current step
-        conn.execute("""
-            UPDATE UserCourseProgress 
-            SET current_step = current_step + 1,
-                last_activity = CURRENT_TIMESTAMP
-            WHERE user_id = ? AND course_id = ?
-        """, (user_id, course_id))
+        for attempt in range(STEP_CAS_ATTEMPTS):
+            # Start transaction
+            current_step, version = get_user_step_version(conn, user_id, course_id)
+            
+            # Update all words in one pass (SELECT + executemany)
+            changes = _complete_step_words(conn, user_id, course_id, current_step, completed_word_ids)
+            
+            # Increment user's current step, unless someone else moved it since we read it
+            if advance_step(conn, user_id, course_id, version, current_step + 1):
+                break
+            
+            conn.rollback()
+            if _progress_moved(conn, user_id, completed_word_ids, changes):
+                logger.warning(f"Step conflict: user {user_id}, course {course_id}, words already completed by a concurrent request")
+                return {
+                    'status': 'conflict',
+                    'error': "Session was already completed by another request",
+                    'current_step': get_user_step(conn, user_id, course_id)
+                }
+            # Disjoint concurrent write (e.g. an empty-step jump): merge by replaying on the new step
+            logger.info(f"Step race lost (attempt {attempt + 1}): user {user_id}, course {course_id}, replaying")
+        else:
+            return {
+                'status': 'conflict',
+                'error': "Current step kept changing, try again",
+                'current_step': get_user_step(conn, user_id, course_id)
+            }
         
         new_step = current_step + 1
         
-        # Calculate Daily New Words (Cumulative for today using Creation Date)
-        cursor = conn.execute("""
-            SELECT COUNT(*) 
-            FROM UserProgress 
-            WHERE user_id = ? 
-            AND date(first_learned_at) = date('now')
-        """, (user_id,))
-        daily_count = cursor.fetchone()[0]
+        # Calculate Daily New Words (Cumulative for today, from UserCourseStats)
+        daily_count = daily_new_count(conn, user_id)
         
-        # Commit transaction
-        conn.commit()
+        # Commit transaction (caller commits when it passed its own connection)
+        if owns_connection:
+            conn.commit()
         
         return {
             'status': 'success',
@@ -394,7 +1063,113 @@ def complete_session(user_id: int, course_id: int, completed_word_ids: List[int]
         }
     
     finally:
-        conn.close()
+        if owns_connection:
+            pool.release(conn)
+
+
+def complete_session_journal(
+    conn: sqlite3.Connection,
+    user_id: int,
+    course_id: int,
+    journal: List[Tuple[int, List[int]]],
+    plan: Optional[Dict[int, Set[int]]] = None
+) -> Dict[str, Any]:
+    """
+    Replay an offline study journal - ordered (step, word_ids) completions - in
+    one transaction. Every entry gets the same writes as a complete_session call
+    for that step; current_step is written once at the end, with a
+    compare-and-swap (a lost race is replayed on the new state).
+    
+    Entry rules:
+    - step < current step: already applied (e.g. a retried upload), skipped
+    - step == current step: applied, current step moves to step + 1
+    - step > current step: only allowed from inside the signed plan to the
+      next planned step (the steps in between were empty when it was
+      planned), otherwise a conflict - a jump can't skip a planned step
+    
+    With a plan, every entry must be a planned step and contain only planned words.
+    The transaction is left open on success: the caller commits.
+    
+    Args:
+        conn: Database connection (the request's)
+        journal: (step, word_ids) in the order they were studied
+        plan: {step: planned word IDs} from a verified plan token
+    
+    Returns:
+        {
+            'status': 'success' | 'conflict' | 'error',
+            'new_step': int, 'steps_applied': int, 'steps_skipped': int,
+            'words_updated': int, 'daily_new_count': int (if success),
+            'error': str (if conflict / error)
+        }
+    """
+    try:
+        for attempt in range(STEP_CAS_ATTEMPTS):
+            result = _replay_journal(conn, user_id, course_id, journal, plan)
+            if result is not None:
+                return result
+            # Lost the step race: replay on the new state (steps the other request applied are skipped now)
+            conn.rollback()
+            logger.info(f"Journal step race lost (attempt {attempt + 1}): user {user_id}, course {course_id}")
+        
+        return {'status': 'conflict', 'error': "Current step kept changing, try again"}
+    
+    except Exception as e:
+        conn.rollback()
+        return {
+            'status': 'error',
+            'error': str(e)
+        }
+
+
+def _replay_journal(
+    conn: sqlite3.Connection,
+    user_id: int,
+    course_id: int,
+    journal: List[Tuple[int, List[int]]],
+    plan: Optional[Dict[int, Set[int]]]
+) -> Optional[Dict[str, Any]]:
+    """One replay attempt of complete_session_journal (None: current_step moved meanwhile)."""
+    current_step, version = get_user_step_version(conn, user_id, course_id)
+    applied, skipped, words_updated = 0, 0, 0
+    planned = sorted(plan) if plan else []
+    
+    for step, word_ids in journal:
+        if plan is not None and (step not in plan or not set(word_ids) <= plan[step]):
+            conn.rollback()
+            return {'status': 'conflict', 'error': f"Step {step} does not match the session plan"}
+        
+        if step < current_step:
+            skipped += 1
+            continue
+        if step > current_step and plan is None:
+            conn.rollback()
+            return {'status': 'conflict', 'error': f"Step {step} is ahead of current step {current_step}"}
+        if step > current_step:
+            # step is planned, so a planned step >= current_step exists
+            next_planned = planned[bisect_left(planned, current_step)]
+            if current_step < planned[0] or next_planned != step:
+                conn.rollback()
+                return {'status': 'conflict', 'error': f"Step {step} skips planned steps after current step {current_step}"}
+        
+        _complete_step_words(conn, user_id, course_id, step, word_ids)
+        applied += 1
+        words_updated += len(word_ids)
+        current_step = step + 1
+    
+    if applied and not advance_step(conn, user_id, course_id, version, current_step):
+        return None
+    
+    logger.info(f"Journal replay: user {user_id}, course {course_id}, {applied} applied, {skipped} skipped, now step {current_step}")
+    
+    return {
+        'status': 'success',
+        'new_step': current_step,
+        'steps_applied': applied,
+        'steps_skipped': skipped,
+        'words_updated': words_updated,
+        'daily_new_count': daily_new_count(conn, user_id)
+    }
 
 
 # ==========================================
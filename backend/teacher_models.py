@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from .database import Base
@@ -35,6 +35,9 @@ class StudentGoal(Base):
 
 class TeacherMessage(Base):
     __tablename__ = "TeacherMessages"
+    __table_args__ = (
+        Index("ix_teachermessages_student_sent", "student_id", "sent_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     teacher_id = Column(Integer, ForeignKey("Users.id"), nullable=False)
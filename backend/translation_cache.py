@@ -0,0 +1,260 @@
+"""
+Translation Cache
+Turkish translations of practice sentences, stored in the TranslationCache
+table (migration 007) under the normalized English text. /practice/sentences
+looks all of its sentences up with one query and only calls the translator
+for misses. The generator's sentence space is finite, so after warm-up
+almost every sentence is a hit.
+
+Sentences the caller already translated locally (the Turkish realizer,
+features/turkish_realizer.py) skip both: they cost microseconds, so they
+are neither looked up nor stored.
+
+Misses are translated concurrently on a small thread pool under a
+per-request deadline (TRANSLATION_DEADLINE_SECONDS). A sentence that misses
+it is returned as TRANSLATION_PENDING; its call keeps running in the
+background and the result goes into the cache, so the next request gets it.
+The same sentence is never translated twice at the same time, and at most
+TRANSLATION_MAX_IN_FLIGHT are queued or running: past that, misses are not
+submitted (TRANSLATION_PENDING, retried by a later request).
+
+The translator is pluggable (set_translator): anything with a name and
+translate(text, src, dest) that raises on failure. GoogleTranslator is the
+default; StaticTranslator is an offline stand-in for scripts and local runs.
+"""
+
+import json
+import sqlite3
+import logging
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from backend.write_queue import WriteQueue
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+SOURCE_LANG = "en"
+TARGET_LANG = "tr"
+TRANSLATION_FAILED = "(Çeviri oluşturulamadı)"
+TRANSLATION_PENDING = "(Çeviri hazırlanıyor)"
+
+TRANSLATION_THREADS = 8               # Concurrent translator calls per process
+TRANSLATION_MAX_IN_FLIGHT = 64        # Queued + running translations per process
+TRANSLATION_DEADLINE_SECONDS = 2.0    # Translation budget of one request
+
+
+def normalize(text: str) -> str:
+    """Cache key of a sentence: case and whitespace don't make a new entry."""
+    return " ".join(text.split()).lower()
+
+
+# =========================================================
+# TRANSLATORS
+# =========================================================
+
+class Translator:
+    """Translator interface: translate one text, raise on failure (nothing is cached then)."""
+
+    name = "translator"
+
+    def translate(self, text: str, src: str = SOURCE_LANG, dest: str = TARGET_LANG) -> str:
+        raise NotImplementedError
+
+
+class GoogleTranslator(Translator):
+    """googletrans: one network call per text. The client is created once, on first use."""
+
+    name = "googletrans"
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    def translate(self, text: str, src: str = SOURCE_LANG, dest: str = TARGET_LANG) -> str:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from googletrans import Translator as Client
+                    self._client = Client()
+        return self._client.translate(text, src=src, dest=dest).text
+
+
+class StaticTranslator(Translator):
+    """Offline stand-in: fixed translations; unknown text raises KeyError."""
+
+    name = "static"
+
+    def __init__(self, translations: Dict[str, str]):
+        self.translations = {normalize(source): target for source, target in translations.items()}
+
+    def translate(self, text: str, src: str = SOURCE_LANG, dest: str = TARGET_LANG) -> str:
+        return self.translations[normalize(text)]
+
+
+_translator: Translator = GoogleTranslator()
+
+
+def get_translator() -> Translator:
+    return _translator
+
+
+def set_translator(translator: Translator) -> Translator:
+    """Replace the process-wide translator. Returns the previous one (to restore it)."""
+    global _translator
+    previous, _translator = _translator, translator
+    return previous
+
+
+# =========================================================
+# CACHE
+# =========================================================
+
+_stats = {"realized": 0, "hits": 0, "misses": 0, "late": 0, "shed": 0, "errors": 0, "translated": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(**increments: int):
+    with _stats_lock:
+        for name, value in increments.items():
+            _stats[name] += value
+
+
+def lookup(conn: sqlite3.Connection, keys: Sequence[str]) -> Dict[str, str]:
+    """Cached translations for normalized keys (missing keys are absent)."""
+    if not keys:
+        return {}
+    try:
+        rows = conn.execute("""
+            SELECT source_key, translation
+            FROM TranslationCache
+            WHERE source_key IN (SELECT value FROM json_each(?))
+        """, (json.dumps(list(keys)),)).fetchall()
+    except sqlite3.OperationalError:
+        return {}  # Migration 007 not applied: everything is a miss
+    return {row[0]: row[1] for row in rows}
+
+
+def store(conn: sqlite3.Connection, rows: Sequence[Tuple[str, str, str, str]]):
+    """
+    Remember (source_key, source_text, translation, translator) rows.
+    A key stored concurrently by another request keeps its first translation.
+    """
+    conn.executemany("""
+        INSERT OR IGNORE INTO TranslationCache (source_key, source_text, translation, translator)
+        VALUES (?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+
+
+def _log_store_result(future: Future):
+    error = future.exception()
+    if error is not None:
+        logger.warning(f"Translation cache write failed: {error}")
+
+
+_executor = ThreadPoolExecutor(max_workers=TRANSLATION_THREADS, thread_name_prefix="translate")
+_in_flight: Dict[str, Future] = {}
+_in_flight_lock = threading.Lock()
+
+
+def _translate_async(translator: Translator, writer: Optional[WriteQueue], key: str, text: str) -> Optional[Future]:
+    """
+    Start the translation of a sentence (or join the one running); the result is cached when it arrives.
+    Returns None without submitting when TRANSLATION_MAX_IN_FLIGHT translations are already queued or running.
+    """
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        if future is not None:
+            return future
+        if len(_in_flight) >= TRANSLATION_MAX_IN_FLIGHT:
+            return None
+        future = _executor.submit(translator.translate, text, SOURCE_LANG, TARGET_LANG)
+        _in_flight[key] = future
+    future.add_done_callback(functools.partial(_finish, translator.name, writer, key, text))
+    return future
+
+
+def _finish(name: str, writer: Optional[WriteQueue], key: str, text: str, future: Future):
+    with _in_flight_lock:
+        _in_flight.pop(key, None)
+
+    error = future.exception()
+    if error is not None:
+        logger.warning(f"Translation error ({name}): {error}")
+        _count(errors=1)
+        return
+
+    _count(translated=1)
+    if writer is not None:
+        row = (key, text, future.result(), name)
+        writer.submit(lambda write_conn: store(write_conn, [row])).add_done_callback(_log_store_result)
+
+
+def translate_all(
+    conn: sqlite3.Connection,
+    writer: Optional[WriteQueue],
+    texts: Sequence[str],
+    translator: Optional[Translator] = None,
+    realized: Optional[Sequence[Optional[str]]] = None,
+    deadline: float = TRANSLATION_DEADLINE_SECONDS
+) -> List[str]:
+    """
+    Turkish translations for texts, in order: local translation (realized[i],
+    if not None) first, then the cache, then the translator for misses.
+
+    Misses are translated concurrently and waited for at most deadline
+    seconds in total. Late ones come back as TRANSLATION_PENDING (and are
+    cached when they finish), as do misses not submitted because the
+    translator is saturated; failed ones as TRANSLATION_FAILED (not cached).
+    """
+    translator = translator or _translator
+    realized = realized or [None] * len(texts)
+    keys = [normalize(text) for text in texts]
+    cached = lookup(conn, [key for key, local in zip(keys, realized) if local is None])
+
+    results: List[Optional[str]] = list(realized)
+    pending: Dict[int, Future] = {}
+    shed = 0
+    for i, (text, key) in enumerate(zip(texts, keys)):
+        if results[i] is None:
+            if key in cached:
+                results[i] = cached[key]
+                continue
+            future = _translate_async(translator, writer, key, text)
+            if future is None:
+                shed += 1
+                results[i] = TRANSLATION_PENDING
+            else:
+                pending[i] = future
+
+    late = 0
+    if pending:
+        done, _ = wait(set(pending.values()), timeout=deadline)
+        for i, future in pending.items():
+            if future not in done:
+                late += 1
+                results[i] = TRANSLATION_PENDING
+            elif future.exception() is not None:
+                results[i] = TRANSLATION_FAILED
+            else:
+                results[i] = future.result()
+
+    local = sum(1 for translation in realized if translation is not None)
+    misses = len(pending) + shed
+    _count(realized=local, hits=len(texts) - local - misses, misses=misses, late=late, shed=shed)
+    return results
+
+
+def translation_stats() -> Dict[str, Any]:
+    """Cache counters since process start (for /admin diagnostics)."""
+    with _stats_lock:
+        snapshot = dict(_stats)
+    lookups = snapshot["hits"] + snapshot["misses"]
+    snapshot["hit_rate"] = round(snapshot["hits"] / lookups, 3) if lookups else 0.0
+    sentences = snapshot["realized"] + lookups
+    snapshot["realized_rate"] = round(snapshot["realized"] / sentences, 3) if sentences else 0.0
+    snapshot["translator"] = _translator.name
+    return snapshot
@@ -4,7 +4,9 @@ Uses max_open_unit_order in UserCourseProgress for efficient unit access control
 """
 
 import sqlite3
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+
+from backend.curriculum import get_curriculum
 
 
 def get_max_open_unit_order(conn: sqlite3.Connection, user_id: int, course_id: int) -> int:
@@ -62,6 +64,11 @@ def calc_unit_progress(conn: sqlite3.Connection, user_id: int, unit_id: int) ->
     seen = row[1] if row and row[1] else 0
     mastered = row[2] if row and row[2] else 0
     
+    return _progress_dict(total, seen, mastered)
+
+
+def _progress_dict(total: int, seen: int, mastered: int) -> Dict[str, float]:
+    """Build the calc_unit_progress result from raw counts."""
     # EDGE CASE: Empty unit (total=0) → 100% to avoid blocking progression
     if total == 0:
         return {
@@ -84,6 +91,58 @@ def calc_unit_progress(conn: sqlite3.Connection, user_id: int, unit_id: int) ->
     }
 
 
+def calc_units_progress(
+    conn: sqlite3.Connection,
+    user_id: int,
+    course_id: int,
+    min_order: Optional[int] = None,
+    max_order: Optional[int] = None
+) -> List[Dict]:
+    """
+    Batched calc_unit_progress: every unit of a course in ONE GROUP BY query.
+    Same two-tier metrics (seen >= 1, mastered >= 3) and empty-unit rule.
+    
+    Args:
+        min_order / max_order: Optional unit order_number window (inclusive)
+    
+    Returns:
+        List ordered by unit order:
+        [{"unit_id", "name", "order", "progress": <calc_unit_progress dict>}, ...]
+    """
+    query = """
+        SELECT
+            u.id, u.name, u.order_number,
+            COUNT(w.id) AS total,
+            SUM(CASE WHEN COALESCE(up.repetition_count, 0) >= 1 THEN 1 ELSE 0 END) AS seen,
+            SUM(CASE WHEN COALESCE(up.repetition_count, 0) >= 3 THEN 1 ELSE 0 END) AS mastered
+        FROM Units u
+        LEFT JOIN Words w ON w.unit_id = u.id
+        LEFT JOIN UserProgress up 
+            ON up.word_id = w.id AND up.user_id = ?
+        WHERE u.course_id = ?
+    """
+    params = [user_id, course_id]
+    
+    if min_order is not None:
+        query += " AND u.order_number >= ?"
+        params.append(min_order)
+    if max_order is not None:
+        query += " AND u.order_number <= ?"
+        params.append(max_order)
+    
+    query += " GROUP BY u.id ORDER BY u.order_number"
+    
+    return [
+        {
+            "unit_id": unit_id,
+            "name": name,
+            "order": order_num,
+            "progress": _progress_dict(total, seen or 0, mastered or 0)
+        }
+        for unit_id, name, order_num, total, seen, mastered in conn.execute(query, params).fetchall()
+    ]
+
+
 def try_unlock_next_unit(conn: sqlite3.Connection, user_id: int, course_id: int):
     """
     Check if next unit should unlock based on current progress.
@@ -105,32 +164,23 @@ def try_unlock_next_unit(conn: sqlite3.Connection, user_id: int, course_id: int)
     # Get current max_open
     max_open = get_max_open_unit_order(conn, user_id, course_id)
     
-    # Find current unit (at max_open order)
-    cursor = conn.execute("""
-        SELECT id
-        FROM Units
-        WHERE course_id = ? AND order_number = ?
-    """, (course_id, max_open))
+    # Unit structure from the shared curriculum map (no query)
+    curriculum = get_curriculum(conn, course_id)
+    if not curriculum.unit_at(max_open) or not curriculum.unit_at(max_open + 1):
+        return  # No unit at this order / no more units to unlock
+    
+    # Previous, current and next unit progress in one query
+    window = calc_units_progress(conn, user_id, course_id, max_open - 1, max_open + 1)
+    by_order = {unit["order"]: unit for unit in window}
     
-    current_unit = cursor.fetchone()
+    current_unit = by_order.get(max_open)
     if not current_unit:
         return  # No unit at this order (shouldn't happen)
     
-    current_unit_id = current_unit[0]
-    
-    # Check if next unit exists
-    cursor = conn.execute("""
-        SELECT id
-        FROM Units
-        WHERE course_id = ? AND order_number = ?
-    """, (course_id, max_open + 1))
-    
-    next_unit = cursor.fetchone()
-    if not next_unit:
+    if max_open + 1 not in by_order:
         return  # No more units to unlock
     
-    # Calculate current unit progress
-    current_progress = calc_unit_progress(conn, user_id, current_unit_id)
+    current_progress = current_unit["progress"]
     
     # TWO-UNIT PREVENTION LOGIC with HYBRID METRICS
     # Unit 2: "seen" 50% (rep>=1)
@@ -142,17 +192,10 @@ def try_unlock_next_unit(conn: sqlite3.Connection, user_id: int, course_id: int)
         can_unlock = current_progress["seen_percentage"] >= 50.0
     else:
         # Unlocking Unit k+2: need Unit k >= 100% MASTERED AND Unit k+1 >= 50% SEEN
-        # Get previous unit (k = max_open - 1)
-        cursor = conn.execute("""
-            SELECT id
-            FROM Units
-            WHERE course_id = ? AND order_number = ?
-        """, (course_id, max_open - 1))
-        
-        prev_unit = cursor.fetchone()
+        # Previous unit (k = max_open - 1)
+        prev_unit = by_order.get(max_open - 1)
         if prev_unit:
-            prev_unit_id = prev_unit[0]
-            prev_progress = calc_unit_progress(conn, user_id, prev_unit_id)
+            prev_progress = prev_unit["progress"]
             
             # Both conditions must be met (MASTERED vs SEEN)
             can_unlock = (
@@ -179,24 +222,13 @@ def get_all_units_status(conn: sqlite3.Connection, user_id: int, course_id: int)
     """
     max_open = get_max_open_unit_order(conn, user_id, course_id)
     
-    cursor = conn.execute("""
-        SELECT id, name, order_number
-        FROM Units
-        WHERE course_id = ?
-        ORDER BY order_number
-    """, (course_id,))
-    
-    units = []
-    for unit_id, name, order_num in cursor.fetchall():
-        status = "OPEN" if order_num <= max_open else "LOCKED"
-        progress = calc_unit_progress(conn, user_id, unit_id)
-        
-        units.append({
-            "unit_id": unit_id,
-            "name": name,
-            "order": order_num,
-            "status": status,
-            "progress": progress
-        })
-    
-    return units
+    return [
+        {
+            "unit_id": unit["unit_id"],
+            "name": unit["name"],
+            "order": unit["order"],
+            "status": "OPEN" if unit["order"] <= max_open else "LOCKED",
+            "progress": unit["progress"]
+        }
+        for unit in calc_units_progress(conn, user_id, course_id)
+    ]
@@ -0,0 +1,258 @@
+"""
+Single-Writer Commit Queue
+SQLite has one write lock per database. Instead of every request taking it
+(and the rest waiting on busy_timeout), write endpoints hand their writes to
+one writer thread per database, which runs whatever is queued in ONE
+transaction and commits once (group commit).
+
+A write is a function of a connection; its result (or exception) comes back
+through a per-request Future. Each write runs under its own SAVEPOINT, so a
+failing write is undone without touching the others in its group. Existing
+helpers can run unchanged inside a write: on the writer's connection
+commit() is a no-op (the group commits) and rollback() only undoes that write.
+Writes don't nest: submitting from inside a write raises RuntimeError.
+"""
+
+import queue
+import asyncio
+import sqlite3
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError
+from typing import Any, Callable, Dict, Optional
+
+from backend.connection_pool import get_pool, DB_PATH
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = 256           # Writes per group transaction
+WRITE_TIMEOUT_SECONDS = 60     # How long a request waits for its write
+
+_STOP = object()
+
+
+class _WriteConnection:
+    """
+    The writer's connection as seen by one queued write.
+    Everything is passed through except the transaction control.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    @property
+    def in_transaction(self) -> bool:
+        return True  # Always inside the group transaction
+
+    def commit(self):
+        """No-op: the writer commits the whole group."""
+
+    def rollback(self):
+        """Undo this write only (the savepoint stays open for the rest of it)."""
+        self._conn.execute("ROLLBACK TO write")
+
+
+class WriteQueue:
+    """
+    Dedicated writer thread + queue for one database file.
+
+    The thread starts on the first submit and keeps one pooled connection for
+    its lifetime. Whatever queued up while the previous group was committing
+    becomes the next group (up to max_batch writes), so under load many small
+    writes share one commit, and with no load a write is committed alone.
+    """
+
+    def __init__(self, db_path: str, max_batch: int = MAX_BATCH_SIZE):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._in_write = False  # Writer thread only: a write is running
+        self._stats = {
+            "writes": 0,
+            "failed": 0,
+            "groups": 0,
+            "largest_group": 0,
+        }
+
+    def submit(self, write: Callable[[sqlite3.Connection], Any]) -> Future:
+        """
+        Queue a write; the Future resolves after its group is committed.
+
+        Raises:
+            RuntimeError: called from inside a write (it can't have an outcome of
+                its own there: do the work on the connection the write was given)
+        """
+        if self._in_write and threading.current_thread() is self._thread:
+            raise RuntimeError("Write submitted from inside a write")
+
+        future = Future()
+        self._ensure_started()
+        self._queue.put((write, future))
+        return future
+
+    def run(self, write: Callable[[sqlite3.Connection], Any], timeout: float = WRITE_TIMEOUT_SECONDS) -> Any:
+        """
+        Queue a write and wait for it. Exceptions raised by the write are re-raised here.
+        A write still queued when the wait times out is cancelled (never runs) and
+        TimeoutError is raised; one already running is waited for, since it may commit.
+        """
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("run() on the writer thread would wait for itself")
+        future = self.submit(write)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            if future.cancel():
+                raise
+        return future.result()
+
+    async def run_async(self, write: Callable[[sqlite3.Connection], Any], timeout: float = WRITE_TIMEOUT_SECONDS) -> Any:
+        """run() for async handlers: the event loop awaits the Future instead of blocking on it."""
+        future = self.submit(write)
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+        except asyncio.TimeoutError:
+            if future.cancel():
+                raise
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of writer counters (for /admin diagnostics and benchmarks)."""
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot["queued"] = self._queue.qsize()
+        snapshot["running"] = self._thread is not None and self._thread.is_alive()
+        return snapshot
+
+    def close(self, timeout: Optional[float] = None):
+        """Commit what is queued, then stop the thread."""
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            self._queue.put((_STOP, None))
+            thread.join(timeout)
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._loop, name=f"sqlite-writer:{self.db_path}", daemon=True
+                )
+                self._thread.start()
+
+    def _loop(self):
+        pool = get_pool(self.db_path)
+        self._conn = pool.acquire()
+        try:
+            while True:
+                group, stop = [], False
+                item = self._queue.get()
+                while True:
+                    if item[0] is _STOP:
+                        stop = True
+                        break
+                    group.append(item)
+                    if len(group) >= self.max_batch:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+
+                if group:
+                    self._commit_group(group)
+                if stop:
+                    break
+        finally:
+            with self._lock:
+                self._thread = None
+            pool.release(self._conn)
+
+    def _commit_group(self, group):
+        conn = self._conn
+        results = []
+
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as e:
+            # Lock not acquired within busy_timeout: fail the whole group
+            logger.error(f"Writer {self.db_path}: BEGIN failed for {len(group)} write(s): {e}")
+            for _, future in group:
+                if not future.cancelled():
+                    future.set_exception(e)
+            with self._lock:
+                self._stats["failed"] += len(group)
+            return
+
+        try:
+            for write, future in group:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT write")
+                self._in_write = True
+                try:
+                    result = write(_WriteConnection(conn))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write")
+                    conn.execute("RELEASE write")
+                    results.append((future, None, e))
+                else:
+                    conn.execute("RELEASE write")
+                    results.append((future, result, None))
+                finally:
+                    self._in_write = False
+            conn.commit()
+        except sqlite3.Error as e:
+            # Transaction control or commit failed (disk full, I/O error...): nothing of this group persisted
+            if conn.in_transaction:
+                conn.rollback()
+            logger.error(f"Writer {self.db_path}: group of {len(group)} write(s) failed: {e}")
+            results = [(future, None, e) for _, future in group if not future.cancelled()]
+
+        failed = 0
+        for future, result, error in results:
+            if error is None:
+                future.set_result(result)
+            else:
+                failed += 1
+                future.set_exception(error)
+
+        with self._lock:
+            self._stats["writes"] += len(results)
+            self._stats["failed"] += failed
+            self._stats["groups"] += 1
+            self._stats["largest_group"] = max(self._stats["largest_group"], len(results))
+
+
+_queues: Dict[str, WriteQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_write_queue(db_path: str = DB_PATH) -> WriteQueue:
+    """
+    Get the process-wide write queue for a database file.
+    One queue (one writer thread) per normalized path, created on first use.
+    """
+    key = get_pool(db_path).db_path
+    write_queue = _queues.get(key)
+    if write_queue is None:
+        with _queues_lock:
+            write_queue = _queues.get(key)
+            if write_queue is None:
+                write_queue = WriteQueue(key)
+                _queues[key] = write_queue
+    return write_queue
+
+
+def write_queue_stats() -> Dict[str, Dict[str, int]]:
+    """Statistics for every write queue in this process, keyed by database path."""
+    return {path: write_queue.stats() for path, write_queue in _queues.items()}
@@ -3,10 +3,10 @@ import { CONSTANTS } from './constants.js';
 export const API = {
     baseUrl: CONSTANTS.API_URL,
 
-    async request(endpoint, method = 'GET', body = null) {
+    async request(endpoint, method = 'GET', body = null, headers = {}) {
         const options = {
             method,
-            headers: { 'Content-Type': 'application/json' }
+            headers: { 'Content-Type': 'application/json', ...headers }
         };
 
         // Add Authorization header if token exists
@@ -18,9 +18,20 @@ export const API = {
         if (body) options.body = JSON.stringify(body);
 
         try {
-            const res = await fetch(`${this.baseUrl}${endpoint}`, options);
+            let res;
+            try {
+                res = await fetch(`${this.baseUrl}${endpoint}`, options);
+            } catch (networkErr) {
+                // Flaky network: an Idempotency-Key makes one retry safe (server replays the stored response)
+                if (!options.headers['Idempotency-Key']) throw networkErr;
+                res = await fetch(`${this.baseUrl}${endpoint}`, options);
+            }
             const data = await res.json();
-            if (!res.ok) throw new Error(data.detail || `API Error: ${res.status}`);
+            if (!res.ok) {
+                const apiErr = new Error(data.detail || `API Error: ${res.status}`);
+                apiErr.status = res.status;
+                throw apiErr;
+            }
             return data;
         } catch (err) {
             console.error("API Request Failed:", endpoint, err);
@@ -50,12 +61,12 @@ export const API = {
                 unit_id: unitId
             });
         },
-        async complete(userId, courseId, completedIds) {
+        async complete(userId, courseId, completedIds, idempotencyKey = null) {
             return API.request('/session/complete', 'POST', {
                 user_id: userId,
                 course_id: courseId,
                 completed_word_ids: completedIds
-            });
+            }, idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {});
         },
         async reset(userId, courseId, password) {
             // Backend expects ResetProgressRequest: { course_id, password }
@@ -192,9 +192,11 @@ export const StudyEngine = {
         if (AppState.settings?.auto_play) {
             const trTxt = card.turkish || card.native;
             const trUrl = card.audio_tr_url;
+            // A sentence without Turkish audio shows a placeholder translation: don't read it out
+            const silent = card.is_sentence && !trUrl;
             // Delay slightly to allow UI transition
             setTimeout(() => {
-                if (trTxt) this.playAudio(trTxt, trUrl, 'tr-TR');
+                if (trTxt && !silent) this.playAudio(trTxt, trUrl, 'tr-TR');
             }, 300);
         }
 
@@ -241,10 +243,15 @@ export const StudyEngine = {
 
             // 2. API Call (Bulk)
             if (!AppState.studyMode || AppState.studyMode === 'words') {
+                // One key per batch: a retried upload is applied only once
+                const idempotencyKey = (window.crypto && crypto.randomUUID)
+                    ? crypto.randomUUID()
+                    : `${Date.now()}-${Math.random().toString(16).slice(2)}`;
                 const res = await API.session.complete(
                     AppState.user.id,
                     AppState.courseId,
-                    completed
+                    completed,
+                    idempotencyKey
                 );
 
                 // Update Logic from Solid Ref
@@ -261,6 +268,13 @@ export const StudyEngine = {
             await this.start(AppState.unitId);
 
         } catch (err) {
+            if (err.status === 409) {
+                // Same batch already completed from another tab / double tap: continue from the server's step
+                StateManager.update('sessionCards', []);
+                StateManager.update('sessionCompletedIds', []);
+                await this.start(AppState.unitId);
+                return;
+            }
             console.error("Batch Complete Error:", err);
             alert("Sistem Hatası: " + err.message);
             // On error, better to exit or retry? Solid ref says alert.
@@ -0,0 +1,360 @@
+"""
+Study Loop Benchmark
+Grown from test_sim.py: instead of one user on a 50-word toy schema, a synthetic
+population on the real schema (scripts/synthetic_db.py) studies concurrently.
+
+Phases:
+    direct  worker threads call get_session_content / complete_session on pooled connections
+    api     asyncio students hit /session/start, /session/complete and
+            /courses/{id}/progress on the FastAPI app in-process (httpx ASGI transport)
+
+Reports throughput and p50/p95/p99 latency per operation as JSON, so two
+commits can be compared on the same (seeded) population:
+
+    python scripts/bench_sim.py --json before.json
+    python scripts/bench_sim.py --json after.json --compare before.json
+    python scripts/bench_sim.py --users 10000 --students 1000    # peak-size population
+    python scripts/bench_sim.py --quick                          # smoke run
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import random
+import asyncio
+import logging
+import sqlite3
+import argparse
+import platform
+import tempfile
+import threading
+import contextlib
+import subprocess
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# Add project root to path
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from scripts.synthetic_db import build_database
+from backend.connection_pool import get_pool
+from backend.write_queue import get_write_queue
+from backend.session_manager import get_session_content, complete_session
+
+PERCENTILES = (50, 95, 99)
+
+
+# ============================================================
+# MEASUREMENTS
+# ============================================================
+
+class Recorder:
+    """Latency samples and error counts per operation (thread-safe)."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def add(self, op: str, seconds: float, ok: bool = True):
+        with self._lock:
+            self.samples[op].append(seconds)
+            if not ok:
+                self.errors[op] += 1
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(recorder: Recorder, wall_seconds: float) -> Dict[str, Dict[str, float]]:
+    operations = {}
+    for op, values in sorted(recorder.samples.items()):
+        values = sorted(values)
+        stats = {
+            "count": len(values),
+            "errors": recorder.errors.get(op, 0),
+            "throughput_per_s": round(len(values) / wall_seconds, 2) if wall_seconds else 0.0,
+            "mean_ms": round(sum(values) / len(values) * 1000, 3),
+        }
+        for p in PERCENTILES:
+            stats[f"p{p}_ms"] = round(percentile(values, p) * 1000, 3)
+        stats["max_ms"] = round(values[-1] * 1000, 3)
+        operations[op] = stats
+    return operations
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the per-request print()s and warnings of the app while measuring."""
+    logging.disable(logging.WARNING)
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+# ============================================================
+# PHASES
+# ============================================================
+
+def run_direct(db_path: str, students: List[Tuple[int, int]], concurrency: int,
+               steps: int, recorder: Recorder) -> float:
+    """Each worker thread owns a slice of the students and walks them round robin."""
+    pool = get_pool(db_path)
+
+    def worker(mine: List[Tuple[int, int]]):
+        conn = pool.acquire()
+        try:
+            for _ in range(steps):
+                for user_id, course_id in mine:
+                    start = time.perf_counter()
+                    content = get_session_content(user_id, course_id, conn)
+                    recorder.add("direct.session_start", time.perf_counter() - start)
+
+                    word_ids = [item["word_id"] for item in content["items"]]
+                    if not word_ids:
+                        continue
+
+                    start = time.perf_counter()
+                    result = complete_session(user_id, course_id, word_ids, conn=conn)
+                    conn.commit()
+                    recorder.add("direct.session_complete", time.perf_counter() - start,
+                                 result["status"] == "success")
+        finally:
+            pool.release(conn)
+
+    threads = [
+        threading.Thread(target=worker, args=(students[i::concurrency],))
+        for i in range(concurrency) if students[i::concurrency]
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started
+
+
+def run_api(db_path: str, students: List[Tuple[int, int]], concurrency: int,
+            steps: int, recorder: Recorder) -> float:
+    """Students study concurrently through the real routers (at most `concurrency` requests in flight)."""
+    import httpx
+    from backend.main import app
+    import api.dependencies
+    import backend.api.dependencies
+
+    def bench_db():
+        pool = get_pool(db_path)
+        conn = pool.acquire()
+        try:
+            yield conn
+        finally:
+            pool.release(conn)
+
+    # Routers import the dependencies under both module paths
+    for module in (api.dependencies, backend.api.dependencies):
+        app.dependency_overrides[module.get_db] = bench_db
+        app.dependency_overrides[module.get_writer] = lambda: get_write_queue(db_path)
+
+    async def main() -> float:
+        semaphore = asyncio.Semaphore(concurrency)
+        transport = httpx.ASGITransport(app=app)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def call(op: str, method: str, url: str, **kwargs):
+                async with semaphore:
+                    start = time.perf_counter()
+                    response = await client.request(method, url, **kwargs)
+                    recorder.add(op, time.perf_counter() - start, response.status_code == 200)
+                    return response
+
+            async def student(user_id: int, course_id: int):
+                for _ in range(steps):
+                    response = await call("api.session_start", "POST", "/session/start",
+                                          json={"user_id": user_id, "course_id": course_id})
+                    items = response.json().get("items", []) if response.status_code == 200 else []
+                    word_ids = [item["word_id"] for item in items]
+                    if word_ids:
+                        await call("api.session_complete", "POST", "/session/complete",
+                                   json={"user_id": user_id, "course_id": course_id, "completed_word_ids": word_ids},
+                                   headers={"Idempotency-Key": str(uuid.uuid4())})
+                    await call("api.course_progress", "GET", f"/courses/{course_id}/progress",
+                               params={"user_id": user_id})
+
+            started = time.perf_counter()
+            await asyncio.gather(*(student(user_id, course_id) for user_id, course_id in students))
+            return time.perf_counter() - started
+
+    try:
+        return asyncio.run(main())
+    finally:
+        app.dependency_overrides.clear()
+
+
+# ============================================================
+# REPORT
+# ============================================================
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+            capture_output=True, text=True, timeout=10
+        ).stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def print_table(report: dict, baseline: dict = None):
+    base_ops = (baseline or {}).get("operations", {})
+    print(f"\n📊 Benchmark @ {report['meta']['commit']}"
+          + (f" vs {baseline['meta']['commit']}" if baseline else ""))
+    print(f"{'OPERATION':<26} {'COUNT':>7} {'ERR':>5} {'OPS/S':>9} "
+          + " ".join(f"{f'P{p} ms':>10}" for p in PERCENTILES))
+    print("-" * 84)
+    for op, stats in report["operations"].items():
+        line = (f"{op:<26} {stats['count']:>7} {stats['errors']:>5} {stats['throughput_per_s']:>9.1f} "
+                + " ".join(f"{stats[f'p{p}_ms']:>10.2f}" for p in PERCENTILES))
+        print(line)
+        if op in base_ops:
+            deltas = []
+            for p in PERCENTILES:
+                before, after = base_ops[op][f"p{p}_ms"], stats[f"p{p}_ms"]
+                deltas.append(f"{(after - before) / before * 100:>+9.1f}%" if before else f"{'-':>10}")
+            print(f"{'  vs baseline':<26} {'':>7} {'':>5} {'':>9} " + " ".join(deltas))
+    print()
+    for phase, stats in report["phases"].items():
+        print(f"  {phase}: {stats['operations']} ops in {stats['wall_s']:.2f}s ({stats['ops_per_s']:.1f} ops/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent study-loop benchmark on a synthetic population")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--courses", type=int, default=4)
+    parser.add_argument("--words-per-course", type=int, default=5000)
+    parser.add_argument("--words-per-unit", type=int, default=50)
+    parser.add_argument("--progress-per-user", type=int, default=200, help="Average UserProgress rows per student")
+    parser.add_argument("--students", type=int, default=200, help="Simulated students per phase")
+    parser.add_argument("--concurrency", type=int, default=8, help="Worker threads (direct) / requests in flight (api)")
+    parser.add_argument("--steps", type=int, default=10, help="Study steps per student")
+    parser.add_argument("--phases", default="direct,api", help="Comma separated: direct, api")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--quick", action="store_true", help="Small population, few steps")
+    parser.add_argument("--keep", metavar="PATH", help="Build the database at PATH and keep it")
+    parser.add_argument("--json", metavar="PATH", help="Write the report to PATH ('-' prints it instead of the table)")
+    parser.add_argument("--compare", metavar="PATH", help="Baseline report to show deltas against")
+    args = parser.parse_args()
+
+    if args.quick:
+        args.users, args.words_per_course, args.progress_per_user = 200, 1000, 100
+        args.students, args.steps = 20, 5
+
+    phases = [phase.strip() for phase in args.phases.split(",") if phase.strip()]
+    unknown = set(phases) - {"direct", "api"}
+    if unknown:
+        parser.error(f"unknown phase(s): {', '.join(sorted(unknown))}")
+
+    if args.keep:
+        db_path = args.keep
+        if os.path.exists(db_path):
+            os.remove(db_path)
+    else:
+        fd, db_path = tempfile.mkstemp(suffix=".db", prefix="bench_sim_")
+        os.close(fd)
+
+    try:
+        print("🏗️  Building synthetic database...", file=sys.stderr)
+        counts = build_database(
+            db_path, args.users, args.courses, args.words_per_course,
+            args.words_per_unit, args.progress_per_user, seed=args.seed
+        )
+
+        conn = sqlite3.connect(db_path)
+        population = conn.execute(
+            "SELECT user_id, course_id FROM UserCourseProgress ORDER BY user_id, course_id"
+        ).fetchall()
+        conn.close()
+
+        # Disjoint students per phase, so the second phase doesn't start on warmed-up users
+        rng = random.Random(args.seed)
+        sample = rng.sample(population, min(len(population), args.students * len(phases)))
+        recorder = Recorder()
+        report_phases = {}
+
+        for index, phase in enumerate(phases):
+            students = sample[index::len(phases)]
+            runner = run_direct if phase == "direct" else run_api
+            print(f"⏱️  {phase}: {len(students)} students x {args.steps} steps, concurrency {args.concurrency}",
+                  file=sys.stderr)
+            before = sum(len(values) for values in recorder.samples.values())
+            with quiet():
+                wall = runner(db_path, students, args.concurrency, args.steps, recorder)
+            ops = sum(len(values) for values in recorder.samples.values()) - before
+            report_phases[phase] = {
+                "wall_s": round(wall, 3),
+                "operations": ops,
+                "ops_per_s": round(ops / wall, 2) if wall else 0.0,
+            }
+
+        # Per-operation throughput is relative to the wall time of the phase it ran in
+        operations = {}
+        for phase in phases:
+            prefix = f"{phase}."
+            phase_recorder = Recorder()
+            for op, values in recorder.samples.items():
+                if op.startswith(prefix):
+                    phase_recorder.samples[op] = values
+                    phase_recorder.errors[op] = recorder.errors.get(op, 0)
+            operations.update(summarize(phase_recorder, report_phases[phase]["wall_s"]))
+
+        report = {
+            "meta": {
+                "commit": _git_commit(),
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "platform": platform.platform(),
+                "args": vars(args),
+                "dataset": counts,
+            },
+            "phases": report_phases,
+            "operations": operations,
+        }
+
+        baseline = None
+        if args.compare:
+            with open(args.compare, encoding="utf-8") as f:
+                baseline = json.load(f)
+
+        if args.json == "-":
+            print(json.dumps(report, indent=2))
+        else:
+            print_table(report, baseline)
+            if args.json:
+                with open(args.json, "w", encoding="utf-8") as f:
+                    json.dump(report, f, indent=2)
+                print(f"\n💾 Report written to {args.json}")
+
+        failed = sum(stats["errors"] for stats in operations.values())
+        return 1 if failed else 0
+    finally:
+        get_write_queue(db_path).close()
+        get_pool(db_path).close_all()
+        if not args.keep:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(db_path + suffix):
+                    os.remove(db_path + suffix)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+Async Blocking-Call Check
+Parses every module under backend/ and fails (exit code 1) if an async def
+function talks to SQLite without awaiting it:
+
+- sqlite3 / pool / cursor methods (execute, fetchall, commit, acquire...) called
+  without await - they block the event loop for the whole worker
+- writer.run() / future.result() - waiting on a thread from the loop
+- a parameter that receives a blocking connection (Depends(get_db) or a
+  sqlite3.Connection annotation); async handlers use Depends(get_async_db)
+
+Nested sync functions and lambdas are skipped: they are what gets handed to
+the DB thread pool / writer queue. Run before deploy, next to check_query_plans.py:
+
+    python scripts/check_async_blocking.py
+"""
+
+import os
+import sys
+import ast
+import argparse
+
+# Add project root to path
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+SCAN_DIRS = ["backend"]
+
+# Methods of sqlite3.Connection / Cursor / ConnectionPool / WriteQueue / Future that block
+BLOCKING_METHODS = {
+    "execute", "executemany", "executescript",
+    "fetchone", "fetchall", "fetchmany",
+    "commit", "rollback",
+    "acquire", "release", "connection",
+    "run", "result",
+}
+BLOCKING_CALLS = {"connect"}  # sqlite3.connect(...)
+BLOCKING_DEPENDENCIES = {"get_db"}
+
+# Reviewed exceptions: (module, function) -> reason
+# Remove an entry as soon as the function is fixed, so it can't regress silently.
+KNOWN_BLOCKING = {}
+
+
+def _call_name(call: ast.Call) -> str:
+    func = call.func
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    if isinstance(func, ast.Name):
+        return func.id
+    return ""
+
+
+def _own_nodes(function: ast.AsyncFunctionDef):
+    """Nodes of the function body, without nested functions, lambdas and classes."""
+    nested = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)
+    stack = [node for node in function.body if not isinstance(node, nested)]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(child for child in ast.iter_child_nodes(node) if not isinstance(child, nested))
+
+
+def _blocking_parameters(function: ast.AsyncFunctionDef):
+    args = function.args
+    positional = args.posonlyargs + args.args
+    defaults = [None] * (len(positional) - len(args.defaults)) + list(args.defaults)
+    pairs = list(zip(positional, defaults)) + list(zip(args.kwonlyargs, args.kw_defaults))
+
+    for arg, default in pairs:
+        annotation = ast.unparse(arg.annotation) if arg.annotation is not None else ""
+        if annotation in ("sqlite3.Connection", "Connection"):
+            yield arg.arg, f"parameter '{arg.arg}: {annotation}' is a blocking connection"
+        elif (isinstance(default, ast.Call) and _call_name(default) == "Depends" and default.args
+              and isinstance(default.args[0], ast.Name) and default.args[0].id in BLOCKING_DEPENDENCIES):
+            yield arg.arg, f"parameter '{arg.arg}' uses Depends({default.args[0].id}), use get_async_db"
+
+
+def check_module(module: str):
+    """Yield (line, function, problem) for every blocking call on the loop."""
+    with open(os.path.join(BASE_DIR, module), encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=module)
+
+    for function in ast.walk(tree):
+        if not isinstance(function, ast.AsyncFunctionDef):
+            continue
+
+        for _, problem in _blocking_parameters(function):
+            yield function.lineno, function.name, problem
+
+        nodes = list(_own_nodes(function))
+        awaited = {id(node.value) for node in nodes if isinstance(node, ast.Await)}
+        awaited |= {
+            id(item.context_expr)
+            for node in nodes if isinstance(node, ast.AsyncWith)
+            for item in node.items
+        }
+
+        for node in nodes:
+            if not isinstance(node, ast.Call) or id(node) in awaited:
+                continue
+            name = _call_name(node)
+            if isinstance(node.func, ast.Attribute) and name in BLOCKING_METHODS:
+                yield node.lineno, function.name, f"blocking .{name}() without await"
+            elif name in BLOCKING_CALLS:
+                yield node.lineno, function.name, f"blocking {name}() without await"
+
+
+def modules():
+    for directory in SCAN_DIRS:
+        for root, _, files in os.walk(os.path.join(BASE_DIR, directory)):
+            for name in sorted(files):
+                if name.endswith(".py"):
+                    yield os.path.relpath(os.path.join(root, name), BASE_DIR).replace(os.sep, "/")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find blocking SQLite calls inside async def functions")
+    parser.add_argument("-v", "--verbose", action="store_true", help="List every async function checked")
+    args = parser.parse_args()
+
+    failures, allowed, checked = [], [], 0
+    for module in sorted(modules()):
+        with open(os.path.join(BASE_DIR, module), encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=module)
+        functions = [node for node in ast.walk(tree) if isinstance(node, ast.AsyncFunctionDef)]
+        checked += len(functions)
+        if args.verbose:
+            for function in functions:
+                print(f"  {module}:{function.lineno} {function.name}")
+
+        for line, function, problem in sorted(check_module(module)):
+            reason = KNOWN_BLOCKING.get((module, function))
+            if reason:
+                allowed.append((module, line, function, reason))
+            else:
+                failures.append((module, line, function, problem))
+
+    print(f"\n📋 Checked {checked} async functions ({len(allowed)} allowed blocking calls)")
+    for module, line, function, reason in allowed:
+        print(f"  ⚠️  {module}:{line} {function}() - allowed: {reason}")
+
+    if failures:
+        print(f"\n❌ {len(failures)} blocking call(s) on the event loop:")
+        for module, line, function, problem in failures:
+            print(f"  {module}:{line} {function}(): {problem}")
+        return 1
+
+    print("\n✅ No blocking SQLite calls in async functions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
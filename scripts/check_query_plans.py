@@ -0,0 +1,265 @@
+"""
+Query Plan Regression Check
+Builds a synthetic database from the real schema (SQLAlchemy models + migrations),
+then runs EXPLAIN QUERY PLAN on every SQL statement in the hot-path modules.
+
+Fails (exit code 1) if any statement does a full SCAN of UserProgress or Words
+that is not listed in KNOWN_FULL_SCANS, or that can't be explained at all
+(its plan is unknown). Run before deploy:
+
+    python scripts/check_query_plans.py            # ~2k users, ~20k words, ~1M progress rows
+    python scripts/check_query_plans.py --quick    # small data set, same checks
+"""
+
+import os
+import sys
+import re
+import ast
+import sqlite3
+import argparse
+import tempfile
+
+# Add project root to path
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from scripts.synthetic_db import build_database
+
+# Modules whose SQL runs on every session / dashboard request
+HOT_MODULES = [
+    "backend/session_manager.py",
+    "backend/unit_manager.py",
+    "backend/curriculum.py",
+    "backend/course_stats.py",
+    "backend/idempotency.py",
+    "backend/session_cache.py",
+    "backend/translation_cache.py",
+    "backend/api/endpoints.py",
+    "backend/api/teacher_endpoints.py",
+    "backend/api/practice_endpoints.py",
+]
+
+# Tables that must never be scanned end to end
+WATCHED_TABLES = {"UserProgress", "Words"}
+
+# Reviewed full scans: (module, SQL fragment) -> reason
+# Remove an entry as soon as the statement is fixed, so it can't regress silently.
+KNOWN_FULL_SCANS = {
+    ("backend/api/practice_endpoints.py", "english LIKE ?"):
+        "Image fallback for key words missing from the course curriculum map; "
+        "case-insensitive LIKE can't use the index.",
+}
+
+# Case-sensitive on purpose: SQL in this repo is upper case, docstrings ("Update a word...") are not
+SQL_START = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH|REPLACE)\s")
+TABLE_REF = re.compile(r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+LAZY_TABLE = re.compile(r"^\s*CREATE TABLE IF NOT EXISTS\s")
+SCAN_DETAIL = re.compile(r"^SCAN (\w+)")
+BINDINGS = re.compile(r"uses (\d+)")
+
+SQL_KEYWORDS = {
+    "WHERE", "JOIN", "LEFT", "INNER", "ON", "GROUP", "ORDER", "LIMIT", "SET",
+    "VALUES", "SELECT", "AND", "OR", "UNION", "EXCEPT", "INTERSECT", "HAVING",
+}
+
+
+# ============================================================
+# SQL EXTRACTION
+# ============================================================
+
+def _render(node, constants=None) -> str:
+    """
+    String literal or f-string -> SQL text. Interpolated module-level string
+    constants ({_COUNTERS_SQL}) are inlined, other interpolations become '?'.
+    """
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        parts = []
+        for value in node.values:
+            if isinstance(value, ast.Constant):
+                parts.append(value.value)
+            elif isinstance(value.value, ast.Name) and value.value.id in (constants or {}):
+                parts.append(constants[value.value.id])
+            else:
+                parts.append("?")
+        return "".join(parts)
+    return ""
+
+
+def _string_constants(tree) -> dict:
+    """Module-level NAME = "..." assignments (in order, so constants can build on earlier ones)."""
+    constants = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            if isinstance(node.value, (ast.Constant, ast.JoinedStr)):
+                text = _render(node.value, constants)
+                if text:
+                    constants[node.targets[0].id] = text
+    return constants
+
+
+def extract_statements(module: str, pattern=SQL_START):
+    """Yield (line, sql) for every SQL-looking string in a module."""
+    with open(os.path.join(BASE_DIR, module), encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=module)
+    constants = _string_constants(tree)
+
+    # Literal pieces of an f-string are visited on their own too; only the whole string counts
+    fragments = {
+        id(part)
+        for node in ast.walk(tree) if isinstance(node, ast.JoinedStr)
+        for part in node.values
+    }
+
+    for node in ast.walk(tree):
+        if id(node) in fragments:
+            continue
+        if isinstance(node, ast.JoinedStr):
+            sql = _render(node, constants)
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+            sql = node.value
+        else:
+            continue
+        if pattern.match(sql):
+            yield node.lineno, sql.strip()
+
+
+def _aliases(sql: str):
+    """Map alias/table name -> table name for the tables a statement references."""
+    mapping = {}
+    for table, alias in TABLE_REF.findall(sql):
+        mapping[table] = table
+        if alias and alias.upper() not in SQL_KEYWORDS:
+            mapping[alias] = table
+    return mapping
+
+
+def explain(conn: sqlite3.Connection, sql: str):
+    """EXPLAIN QUERY PLAN with dummy parameters (count taken from sqlite's error)."""
+    params = ()
+    for _ in range(2):
+        try:
+            return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        except sqlite3.ProgrammingError as e:
+            match = BINDINGS.search(str(e))
+            if not match:
+                raise
+            params = (1,) * int(match.group(1))
+    raise sqlite3.ProgrammingError("could not bind parameters")
+
+
+# ============================================================
+# CHECK
+# ============================================================
+
+def check(db_path: str, verbose: bool = False) -> int:
+    conn = sqlite3.connect(db_path)
+    failures, skipped, allowed, checked = [], [], [], 0
+
+    # Tables the routers create on first use (e.g. ClassGoals)
+    for module in HOT_MODULES:
+        for _, ddl in extract_statements(module, LAZY_TABLE):
+            conn.execute(ddl)
+
+    for module in HOT_MODULES:
+        for line, sql in extract_statements(module):
+            try:
+                plan = explain(conn, sql)
+            except sqlite3.Error as e:
+                # Fragment of a larger query, unresolved interpolation, etc.: its plan is unknown
+                skipped.append((module, line, str(e)))
+                continue
+
+            checked += 1
+            aliases = _aliases(sql)
+            scans = []
+            for detail in plan:
+                match = SCAN_DETAIL.match(detail)
+                if match and aliases.get(match.group(1)) in WATCHED_TABLES:
+                    scans.append(detail)
+
+            if verbose:
+                print(f"\n{module}:{line}")
+                for detail in plan:
+                    print(f"    {detail}")
+
+            if not scans:
+                continue
+
+            reason = next(
+                (why for (mod, fragment), why in KNOWN_FULL_SCANS.items()
+                 if mod == module and fragment in sql),
+                None
+            )
+            if reason:
+                allowed.append((module, line, reason))
+            else:
+                failures.append((module, line, sql, plan))
+
+    conn.close()
+
+    print(f"\n📋 Checked {checked} statements ({len(skipped)} skipped, {len(allowed)} allowed full scans)")
+    for module, line, error in skipped:
+        print(f"  ⏭️  {module}:{line} - {error}")
+    for module, line, reason in allowed:
+        print(f"  ⚠️  {module}:{line} - allowed: {reason}")
+
+    if failures:
+        print(f"\n❌ {len(failures)} statement(s) fall back to a full table scan:")
+        for module, line, sql, plan in failures:
+            print(f"\n  {module}:{line}")
+            print("    " + " ".join(sql.split()))
+            for detail in plan:
+                print(f"      {detail}")
+        return 1
+
+    if skipped:
+        # An unexplainable statement in a hot module could hide a full scan
+        print(f"\n❌ {len(skipped)} statement(s) could not be checked (see ⏭️ above)")
+        return 1
+
+    print("\n✅ No full scans on " + ", ".join(sorted(WATCHED_TABLES)))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN QUERY PLAN regression check for hot SQL")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--courses", type=int, default=4)
+    parser.add_argument("--words-per-course", type=int, default=5000)
+    parser.add_argument("--words-per-unit", type=int, default=50)
+    parser.add_argument("--progress-per-user", type=int, default=500, help="Average UserProgress rows per student")
+    parser.add_argument("--quick", action="store_true", help="Small data set (plans may differ on tiny tables)")
+    parser.add_argument("--keep", metavar="PATH", help="Build the database at PATH and keep it")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print every plan")
+    args = parser.parse_args()
+
+    if args.quick:
+        args.users, args.words_per_course, args.progress_per_user = 200, 1000, 100
+
+    if args.keep:
+        db_path = args.keep
+        if os.path.exists(db_path):
+            os.remove(db_path)
+    else:
+        fd, db_path = tempfile.mkstemp(suffix=".db", prefix="query_plans_")
+        os.close(fd)
+
+    try:
+        print("🏗️  Building synthetic database...")
+        counts = build_database(
+            db_path, args.users, args.courses, args.words_per_course,
+            args.words_per_unit, args.progress_per_user
+        )
+        print("   " + ", ".join(f"{table}: {count:,}" for table, count in counts.items()))
+        return check(db_path, args.verbose)
+    finally:
+        if not args.keep:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(db_path + suffix):
+                    os.remove(db_path + suffix)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,375 @@
+"""
+Write Contention Stress Test
+N workers (threads or processes), each with its own connection and its own
+students, run the study loop (get_session_content -> complete_session -> commit)
+against one WAL database for a fixed time. N grows level by level to show where
+SQLite's single write lock saturates.
+
+Per level it reports write/read throughput, write latency percentiles,
+"database is locked" errors, retries and busy-wait time.
+
+Busy-wait: with --begin immediate the write lock is taken up front, so the time
+spent in BEGIN IMMEDIATE is exactly the lock wait. With --begin deferred (what
+the app does) SQLite waits inside the first write statement, so only failed
+attempts and retry back-off are counted and the rest shows up as write latency.
+With --writer queue the writes go through backend/write_queue.py (one writer
+thread per process, group commit) like the write endpoints do, so there is no
+lock to wait for inside a process.
+
+    python scripts/stress_writes.py                            # synthetic DB, 1..32 threads
+    python scripts/stress_writes.py --mode process --levels 1,4,16,64
+    python scripts/stress_writes.py --busy-timeout 100 --begin immediate
+    python scripts/stress_writes.py --writer queue          # writes through the single-writer queue
+    python scripts/stress_writes.py --db copy_of_englishbus.db  # writes progress, use a copy!
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+import threading
+import multiprocessing
+from typing import Dict, List, Tuple
+
+# Add project root to path
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from scripts.synthetic_db import build_database
+from backend.connection_pool import PRAGMAS
+from backend.session_manager import get_session_content, complete_session
+from backend.write_queue import get_write_queue
+
+# A level "saturates" when no larger level beats it by this much write throughput
+SATURATION_GAIN = 0.10
+STUDENTS_PER_WORKER = 4
+RETRY_BACKOFF_SECONDS = 0.01
+
+
+def _is_lock_error(message: str) -> bool:
+    return "locked" in message or "busy" in message
+
+
+def _connect(db_path: str, busy_timeout_ms: int) -> sqlite3.Connection:
+    """Same tuning as the connection pool, with the busy timeout under test."""
+    conn = sqlite3.connect(db_path, timeout=busy_timeout_ms / 1000, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    for name, value in PRAGMAS:
+        if name == "busy_timeout":
+            value = busy_timeout_ms
+        conn.execute(f"PRAGMA {name}={value}")
+    return conn
+
+
+# ============================================================
+# WORKER
+# ============================================================
+
+def _write_direct(conn, user_id, course_id, word_ids, options, stats, rng) -> Dict:
+    """complete_session + commit on the worker's own connection, retrying lock errors."""
+    for attempt in range(options["retries"] + 1):
+        attempt_started = time.perf_counter()
+        try:
+            if options["begin"] == "immediate":
+                conn.execute("BEGIN IMMEDIATE")
+                stats["busy_wait_s"] += time.perf_counter() - attempt_started
+            result = complete_session(user_id, course_id, word_ids, conn=conn)
+            if result["status"] == "success":
+                conn.commit()
+        except sqlite3.OperationalError as e:
+            result = {"status": "error", "error": str(e)}
+
+        if result["status"] != "error" or not _is_lock_error(result["error"]):
+            return result
+
+        # Locked: the whole attempt was wasted waiting
+        if conn.in_transaction:
+            conn.rollback()
+        stats["locked_errors"] += 1
+        stats["busy_wait_s"] += time.perf_counter() - attempt_started
+        if attempt < options["retries"]:
+            stats["retries"] += 1
+            backoff = RETRY_BACKOFF_SECONDS * (2 ** attempt) * (1 + rng.random())
+            time.sleep(backoff)
+            stats["busy_wait_s"] += backoff
+    return result
+
+
+def _write_queued(db_path, user_id, course_id, word_ids, stats) -> Dict:
+    """complete_session through the process's single-writer queue (group commit)."""
+    try:
+        return get_write_queue(db_path).run(
+            lambda conn: complete_session(user_id, course_id, word_ids, conn=conn)
+        )
+    except sqlite3.OperationalError as e:
+        # Whole group failed (writer couldn't get the lock from another process)
+        stats["locked_errors"] += 1
+        return {"status": "error", "error": str(e)}
+
+
+def run_worker(db_path: str, students: List[Tuple[int, int]], options: Dict, barrier) -> Dict:
+    """Study loop for one worker until the level's deadline; returns raw counters."""
+    stats = {
+        "writes": 0, "reads": 0, "write_latencies": [],
+        "locked_errors": 0, "retries": 0, "failed_writes": 0, "read_errors": 0,
+        "conflicts": 0, "busy_wait_s": 0.0,
+    }
+    conn = _connect(db_path, options["busy_timeout"])
+    rng = random.Random(os.getpid() ^ threading.get_ident())
+
+    try:
+        barrier.wait()
+        deadline = time.perf_counter() + options["duration"]
+        index = 0
+
+        while time.perf_counter() < deadline:
+            user_id, course_id = students[index % len(students)]
+            index += 1
+
+            try:
+                content = get_session_content(user_id, course_id, conn)
+                stats["reads"] += 1
+            except sqlite3.OperationalError:
+                conn.rollback()
+                stats["read_errors"] += 1
+                continue
+            if content.get("error"):
+                stats["read_errors"] += 1
+                continue
+
+            word_ids = [item["word_id"] for item in content["items"]]
+            if not word_ids:
+                continue
+
+            started = time.perf_counter()
+            if options["writer"] == "queue":
+                result = _write_queued(db_path, user_id, course_id, word_ids, stats)
+            else:
+                result = _write_direct(conn, user_id, course_id, word_ids, options, stats, rng)
+
+            if result["status"] == "success":
+                stats["writes"] += 1
+                stats["write_latencies"].append(time.perf_counter() - started)
+            elif result["status"] == "conflict":
+                stats["conflicts"] += 1
+            else:
+                stats["failed_writes"] += 1
+    finally:
+        conn.close()
+
+    return stats
+
+
+def _process_worker(db_path, students, options, barrier, results):
+    results.put(run_worker(db_path, students, options, barrier))
+
+
+def run_level(db_path: str, workers: int, students: List[Tuple[int, int]], options: Dict) -> List[Dict]:
+    """Run `workers` concurrent workers (each with its own slice of students)."""
+    slices = [students[i::workers] for i in range(workers)]
+
+    if options["mode"] == "process":
+        ctx = multiprocessing.get_context("spawn")
+        barrier, results = ctx.Barrier(workers), ctx.Queue()
+        processes = [
+            ctx.Process(target=_process_worker, args=(db_path, mine, options, barrier, results))
+            for mine in slices
+        ]
+        for process in processes:
+            process.start()
+        collected = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        return collected
+
+    barrier, collected = threading.Barrier(workers), []
+    threads = [
+        threading.Thread(target=lambda mine=mine: collected.append(run_worker(db_path, mine, options, barrier)))
+        for mine in slices
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return collected
+
+
+# ============================================================
+# REPORT
+# ============================================================
+
+def _percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(1, math.ceil(p / 100 * len(sorted_values))) - 1]
+
+
+def summarize_level(workers: int, results: List[Dict], duration: float) -> Dict:
+    latencies = sorted(value for r in results for value in r["write_latencies"])
+    totals = {
+        key: sum(r[key] for r in results)
+        for key in ("writes", "reads", "locked_errors", "retries", "failed_writes",
+                    "read_errors", "conflicts", "busy_wait_s")
+    }
+    return {
+        "workers": workers,
+        "writes_per_s": round(totals["writes"] / duration, 1),
+        "reads_per_s": round(totals["reads"] / duration, 1),
+        "write_p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "write_p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+        "write_p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+        "write_max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        "locked_errors": totals["locked_errors"],
+        "retries": totals["retries"],
+        "failed_writes": totals["failed_writes"],
+        "read_errors": totals["read_errors"],
+        "conflicts": totals["conflicts"],
+        "busy_wait_s": round(totals["busy_wait_s"], 3),
+        "busy_wait_per_write_ms": round(totals["busy_wait_s"] / totals["writes"] * 1000, 2) if totals["writes"] else 0.0,
+    }
+
+
+def find_saturation(levels: List[Dict]) -> Dict:
+    """
+    Last level that still scaled write throughput, and the first one with lock errors.
+    Gains are measured against the best level so far, so a dip followed by a
+    recovery is not reported as saturation before the peak.
+    """
+    best = levels[0]
+    for level in levels[1:]:
+        if level["writes_per_s"] >= best["writes_per_s"] * (1 + SATURATION_GAIN):
+            best = level
+    saturated_at = best["workers"] if best is not levels[-1] else None
+    first_locked = next((level["workers"] for level in levels if level["locked_errors"]), None)
+    first_failed = next((level["workers"] for level in levels if level["failed_writes"]), None)
+    peak = max(levels, key=lambda level: level["writes_per_s"])
+    return {
+        "saturated_at_workers": saturated_at,
+        "peak_writes_per_s": peak["writes_per_s"],
+        "peak_at_workers": peak["workers"],
+        "first_locked_errors_at_workers": first_locked,
+        "first_failed_writes_at_workers": first_failed,
+    }
+
+
+def print_report(levels: List[Dict], saturation: Dict):
+    print(f"\n{'N':>4} {'WRITE/S':>9} {'READ/S':>9} {'P50 ms':>8} {'P95 ms':>8} {'P99 ms':>9} "
+          f"{'LOCKED':>7} {'RETRY':>6} {'FAILED':>7} {'WAIT/W ms':>10}")
+    print("-" * 88)
+    for level in levels:
+        print(f"{level['workers']:>4} {level['writes_per_s']:>9.1f} {level['reads_per_s']:>9.1f} "
+              f"{level['write_p50_ms']:>8.2f} {level['write_p95_ms']:>8.2f} {level['write_p99_ms']:>9.2f} "
+              f"{level['locked_errors']:>7} {level['retries']:>6} {level['failed_writes']:>7} "
+              f"{level['busy_wait_per_write_ms']:>10.2f}")
+
+    print(f"\n🔒 Peak {saturation['peak_writes_per_s']:.1f} writes/s at N={saturation['peak_at_workers']}")
+    if saturation["saturated_at_workers"]:
+        print(f"   Write lock saturates after N={saturation['saturated_at_workers']} "
+              f"(larger levels add < {SATURATION_GAIN:.0%} throughput)")
+    else:
+        print("   Write throughput still scaling at the largest level")
+    if saturation["first_locked_errors_at_workers"]:
+        print(f"   First 'database is locked' at N={saturation['first_locked_errors_at_workers']}")
+    if saturation["first_failed_writes_at_workers"]:
+        print(f"   ❌ Writes lost after retries from N={saturation['first_failed_writes_at_workers']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite write contention stress test for session completion")
+    parser.add_argument("--db", metavar="PATH", help="Existing database to stress (progress is written - use a copy)")
+    parser.add_argument("--levels", help="Comma separated worker counts (default 1,2,4,8,16,32)")
+    parser.add_argument("--mode", choices=("thread", "process"), default="thread")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per level")
+    parser.add_argument("--busy-timeout", type=int, default=30000, help="ms, 30000 like the app")
+    parser.add_argument("--begin", choices=("deferred", "immediate"), default="deferred",
+                        help="deferred like the app; immediate measures lock wait exactly")
+    parser.add_argument("--retries", type=int, default=3, help="Retries of a locked write (the app does none)")
+    parser.add_argument("--writer", choices=("direct", "queue"), default="direct",
+                        help="direct: commit on the worker's connection; queue: single-writer group commit")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--courses", type=int, default=4)
+    parser.add_argument("--words-per-course", type=int, default=5000)
+    parser.add_argument("--words-per-unit", type=int, default=50)
+    parser.add_argument("--progress-per-user", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--quick", action="store_true", help="Small population, 1s per level (levels 1,2,4,8)")
+    parser.add_argument("--json", metavar="PATH", help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    if args.quick:
+        args.users, args.words_per_course, args.progress_per_user = 200, 1000, 100
+        args.levels, args.duration = args.levels or "1,2,4,8", 1.0
+
+    levels = sorted({int(level) for level in (args.levels or "1,2,4,8,16,32").split(",") if level.strip()})
+    if not levels or levels[0] < 1:
+        parser.error("--levels must be positive integers")
+
+    temporary = args.db is None
+    if temporary:
+        fd, db_path = tempfile.mkstemp(suffix=".db", prefix="stress_writes_")
+        os.close(fd)
+    else:
+        db_path = os.path.abspath(args.db)
+        if not os.path.exists(db_path):
+            parser.error(f"{db_path} does not exist")
+
+    try:
+        if temporary:
+            print("🏗️  Building synthetic database...")
+            build_database(
+                db_path, args.users, args.courses, args.words_per_course,
+                args.words_per_unit, args.progress_per_user, seed=args.seed
+            )
+
+        conn = sqlite3.connect(db_path)
+        population = conn.execute(
+            "SELECT user_id, course_id FROM UserCourseProgress ORDER BY user_id, course_id"
+        ).fetchall()
+        conn.close()
+
+        needed = levels[-1] * STUDENTS_PER_WORKER
+        if len(population) < levels[-1]:
+            parser.error(f"only {len(population)} students for {levels[-1]} workers")
+        students = random.Random(args.seed).sample(population, min(len(population), needed))
+
+        options = {
+            "mode": args.mode, "duration": args.duration, "busy_timeout": args.busy_timeout,
+            "begin": args.begin, "retries": args.retries, "writer": args.writer,
+        }
+        if args.writer == "queue":
+            print(f"⏱️  {args.mode} workers, {args.duration:g}s per level, writes through the writer queue")
+        else:
+            print(f"⏱️  {args.mode} workers, {args.duration:g}s per level, busy_timeout {args.busy_timeout} ms, "
+                  f"BEGIN {args.begin.upper()}, {args.retries} retries")
+
+        report_levels = []
+        for workers in levels:
+            # Same students per worker at every level, so only contention changes
+            level_students = students[:workers * STUDENTS_PER_WORKER]
+            results = run_level(db_path, workers, level_students, options)
+            report_levels.append(summarize_level(workers, results, args.duration))
+            print(f"   N={workers}: {report_levels[-1]['writes_per_s']:.1f} writes/s")
+
+        saturation = find_saturation(report_levels)
+        print_report(report_levels, saturation)
+
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump({"options": vars(args), "levels": report_levels, "saturation": saturation}, f, indent=2)
+            print(f"\n💾 Report written to {args.json}")
+
+        return 1 if saturation["first_failed_writes_at_workers"] else 0
+    finally:
+        if temporary:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(db_path + suffix):
+                    os.remove(db_path + suffix)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
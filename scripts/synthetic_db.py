@@ -0,0 +1,106 @@
+"""
+Synthetic Database Builder
+Real schema (SQLAlchemy models + migrations) filled with a random but realistic
+population: courses split into units, students each walking a prefix of one
+course with Fibonacci-like repetition counts. Shared by the query plan check
+and the benchmark harness.
+"""
+
+import os
+import sys
+import random
+import sqlite3
+
+# Add project root to path
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from sqlalchemy import create_engine
+
+from backend.database import Base
+import backend.teacher_models  # noqa: F401 (registers teacher tables on Base)
+from backend.migrations.runner import run_migrations
+
+
+def build_database(db_path: str, users: int, courses: int, words_per_course: int,
+                   words_per_unit: int, progress_per_user: int, seed: int = 42):
+    """Real schema, realistic cardinalities, fresh statistics (ANALYZE)."""
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    run_migrations(db_path)
+
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+
+    conn.executemany(
+        "INSERT INTO Courses (id, name, total_words, order_number) VALUES (?, ?, ?, ?)",
+        [(c, f"Course {c}", words_per_course, c) for c in range(1, courses + 1)]
+    )
+
+    units, words = [], []
+    unit_id, word_id = 0, 0
+    units_per_course = max(1, words_per_course // words_per_unit)
+    for c in range(1, courses + 1):
+        for u in range(1, units_per_course + 1):
+            unit_id += 1
+            units.append((unit_id, c, f"Unit {u}", u, words_per_unit))
+            for w in range(words_per_unit):
+                word_id += 1
+                order = (u - 1) * words_per_unit + w + 1
+                words.append((word_id, c, unit_id, f"word{word_id}", f"kelime{word_id}", order))
+    conn.executemany(
+        "INSERT INTO Units (id, course_id, name, order_number, word_count) VALUES (?, ?, ?, ?, ?)", units
+    )
+    conn.executemany(
+        "INSERT INTO Words (id, course_id, unit_id, english, turkish, order_number) VALUES (?, ?, ?, ?, ?, ?)", words
+    )
+
+    teachers = max(1, users // 50)
+    conn.executemany(
+        "INSERT INTO Users (id, username, is_teacher, teacher_id, assigned_teacher_id) VALUES (?, ?, ?, ?, ?)",
+        [
+            (i, f"user{i}", 1 if i <= teachers else 0,
+             f"{10000 + i}" if i <= teachers else None,
+             None if i <= teachers else f"{10000 + rng.randint(1, teachers)}")
+            for i in range(1, users + 1)
+        ]
+    )
+
+    # Each student walks a prefix of one course, like the real spaced-repetition flow
+    batch = []
+    for user_id in range(teachers + 1, users + 1):
+        course_id = rng.randint(1, courses)
+        seen = rng.randint(progress_per_user // 2, progress_per_user * 3 // 2)
+        seen = min(seen, words_per_course)
+        step = seen * 3
+        conn.execute(
+            "INSERT INTO UserCourseProgress (user_id, course_id, current_step, max_open_unit_order) VALUES (?, ?, ?, ?)",
+            (user_id, course_id, step, seen // words_per_unit + 1)
+        )
+        first_word = (course_id - 1) * words_per_course + 1
+        for wid in range(first_word, first_word + seen):
+            rep = rng.randint(1, 7)
+            batch.append((user_id, wid, rep, step + rng.randint(-3, 40)))
+        if len(batch) >= 100000:
+            conn.executemany(
+                "INSERT INTO UserProgress (user_id, word_id, repetition_count, next_review_step) VALUES (?, ?, ?, ?)",
+                batch
+            )
+            batch = []
+    conn.executemany(
+        "INSERT INTO UserProgress (user_id, word_id, repetition_count, next_review_step) VALUES (?, ?, ?, ?)",
+        batch
+    )
+
+    conn.execute("UPDATE UserProgress SET last_updated = datetime('now'), first_learned_at = date('now')")
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.commit()
+
+    counts = {
+        table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in ("Users", "Words", "UserProgress")
+    }
+    conn.close()
+    return counts
@@ -7,6 +7,7 @@ import json
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from backend.session_manager import get_session_content, complete_session
+from backend.migrations.runner import run_migrations
 # from backend.database import get_db
 
 DB_PATH = "sim_test.db"
@@ -20,7 +21,7 @@ def setup_sim_db():
     # Minimal Schema for Test
     conn.execute("CREATE TABLE Users (id INTEGER PRIMARY KEY, username TEXT)")
     conn.execute("CREATE TABLE Courses (id INTEGER PRIMARY KEY, name TEXT)")
-    conn.execute("CREATE TABLE Units (id INTEGER PRIMARY KEY, course_id INTEGER, order_number INTEGER)")
+    conn.execute("CREATE TABLE Units (id INTEGER PRIMARY KEY, course_id INTEGER, name TEXT, order_number INTEGER, word_count INTEGER)")
     conn.execute("CREATE TABLE Words (id INTEGER PRIMARY KEY, course_id INTEGER, unit_id INTEGER, order_number INTEGER, english TEXT, turkish TEXT, image_url TEXT, audio_en_url TEXT, audio_tr_url TEXT)")
     conn.execute("CREATE TABLE UserCourseProgress (user_id INTEGER, course_id INTEGER, current_step INTEGER, max_open_unit_order INTEGER, last_activity TIMESTAMP)")
     conn.execute("CREATE TABLE UserProgress (user_id INTEGER, word_id INTEGER, repetition_count INTEGER, next_review_step INTEGER, last_updated TIMESTAMP, first_learned_at DATE)")
@@ -36,6 +37,9 @@ def setup_sim_db():
         
     conn.commit()
     conn.close()
+    
+    # Indexes / unique keys the session code relies on (UPSERT)
+    run_migrations(DB_PATH)
     print("✅ Test DB Created")
 
 def run_simulation(steps=30):